@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+
+"""python -m benchmarks [OPTIONS]
+python -m benchmarks --compare OLD NEW
+Benchmarks - Time filters and generators at sizes of input, and record the
+throughput and peak memory of each.
+
+Options:
+  -n N,..., --sizes N,...
+                    time each case with N samples, where N is a list of
+                      sizes such as '1e3,1e8' [Default: 1e3,1e4,1e5]
+  -c P,..., --cases P,...
+                    time only cases whose names match a shell-style pattern
+                      P, such as 'convolve*' [Default: all cases]
+  -k K,..., --kernels K,...
+                    time convolution with kernels of K taps, where K is
+                      a positive integer [Default: 3,9,257]
+  --backend NAME    filter and generate by NAME, where NAME is one of
+                      'python' or 'numpy' [Default: python]
+  --format FORMAT   read and write data of filters and generators as FORMAT,
+                      where FORMAT is 'text' or 'f64le' [Default: f64le]
+  -r N, --repeat N  time each case N times, keeping the fastest [Default: 3]
+  --seed N          generate inputs from seed N [Default: 0]
+  --data-dir DIR    keep generated inputs in DIR, and reuse them in later
+                      runs [Default: a temporary directory]
+  -o FILE, --output FILE
+                    write results as JSON to FILE [Default: stdout]
+  --list-cases      list the names of cases
+  --compare OLD NEW
+                    compare two results files, and exit with status 1 if
+                      any case is slower or larger than before
+  --tolerance P     with --compare, ignore changes of less than P percent
+                      [Default: 10]
+
+Results record the commit of the working tree, the environment, and for each
+case and size: the fastest time in seconds, samples per second, and the peak
+resident memory in KiB, of the command alone. Peak memory is unknown on
+platforms without `os.wait4`.
+
+Startup cases also record the time spent importing modules beyond those of a
+bare interpreter, and exit with status 1 if startup imports a module that
+should be deferred or takes longer than its budget.
+"""
+
+import os
+import sys
+import json
+import shutil
+import platform
+import tempfile
+import datetime
+import subprocess
+from typing import Dict, Optional
+
+from . import cli
+from . import compare
+from . import internals
+from . import startup
+from . import suite
+
+def main():
+    _config, _positionals = cli.main(sys.argv[1:])
+
+    if "help" in _config.keys():
+        sys.stdout.write(__doc__)
+        sys.exit(0)
+    elif "list-cases" in _config.keys():
+        internals._print_cases(*startup.CASES, *suite.CASES)
+        sys.exit(0)
+    elif len(_positionals) > 0:
+        internals._print_usage()
+        sys.exit(1)
+
+    if "compare" in _config.keys():
+        _tolerance = internals._try_get_float(_config, "tolerance", default=10)
+        _old, _new = (compare.load(f) for f in _config["compare"])
+        if _old is None or _new is None:
+            sys.exit(1)
+        _regressions = compare.compare(_old, _new, _tolerance)
+        sys.exit(1 if _regressions > 0 else 0)
+
+    try:
+        _sizes = internals._try_get_list_int(
+            _config, "sizes", default=[1000, 10000, 100000],
+        )
+        _kernels = internals._try_get_list_int(
+            _config, "kernels", default=[3, 9, 257],
+        )
+        _repeat = internals._try_get_int(_config, "repeat", default=3)
+        _seed = internals._try_get_int(_config, "seed", default=0)
+    except ValueError:
+        internals._print_invalid_number()
+        sys.exit(1)
+
+    _backend = _config.get("backend", "python")
+    if _backend not in ("python", "numpy"):
+        internals._print_invalid_backend(_backend)
+        sys.exit(1)
+    _format = _config.get("format", "f64le")
+    if _format not in ("text", "f64le"):
+        internals._print_invalid_format(_format)
+        sys.exit(1)
+    for _taps in _kernels:
+        if _taps < 1:
+            internals._print_invalid_kernel(_taps)
+            sys.exit(1)
+
+    _patterns = _config["cases"].split(",") if "cases" in _config else None
+    _cases = suite.select(suite.cases(_kernels, _backend, _format), _patterns)
+    _startup = [
+        name for name in startup.CASES if suite.matches(name, _patterns)
+    ]
+    if len(_cases) == 0 and len(_startup) == 0:
+        internals._print_no_cases()
+        sys.exit(1)
+
+    _directory = _config.get("data-dir", None)
+    _temporary = _directory is None
+    if _temporary:
+        _directory = tempfile.mkdtemp(prefix="benchmarks-")
+    else:
+        os.makedirs(_directory, exist_ok=True)
+    try:
+        _results = startup.run(_startup, _directory, _seed, _repeat)
+        if len(_cases) > 0:
+            _results.extend(
+                suite.run(_cases, _sizes, _directory, _seed, _repeat),
+            )
+    finally:
+        if _temporary:
+            shutil.rmtree(_directory, ignore_errors=True)
+
+    _document = _describe()
+    _document["options"] = {
+        "backend": _backend,
+        "format": _format,
+        "kernels": _kernels,
+        "repeat": _repeat,
+        "seed": _seed,
+        "sizes": _sizes,
+    }
+    _document["results"] = _results
+    _output = json.dumps(_document, indent=2) + "\n"
+
+    if "output" in _config.keys():
+        try:
+            with open(_config["output"], "w") as f:
+                f.write(_output)
+        except OSError:
+            internals._print_invalid_file(_config["output"])
+            sys.exit(1)
+    else:
+        sys.stdout.write(_output)
+
+    _failed = any("error" in result for result in _results)
+    for _result in _results:
+        for _problem in startup.check(_result):
+            internals._print_startup_regression(_result["case"], _problem)
+            _failed = True
+    sys.exit(1 if _failed else 0)
+
+def _describe() -> Dict:
+    """Describe the working tree and environment that results come from."""
+    return {
+        "commit": _git("rev-parse", "HEAD"),
+        "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "date": datetime.datetime.now(datetime.timezone.utc).isoformat(
+            timespec="seconds",
+        ),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "numpy": _numpy_version(),
+        "bytecode_cache": not sys.flags.dont_write_bytecode,
+    }
+
+def _git(*arguments: str) -> Optional[str]:
+    try:
+        output = subprocess.run(
+            ["git"] + list(arguments),
+            cwd=suite.ROOT,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            check=True,
+        ).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return output.decode().strip()
+
+def _numpy_version() -> Optional[str]:
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy.__version__
+
+if __name__ == "__main__":
+    main()
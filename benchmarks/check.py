@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+
+"""python -m benchmarks.check
+Check that the suite measures what it reports, and that the engines it times
+agree. Exits with status 1 if any check fails:
+  peak             while this process holds BALLAST KiB, a bare interpreter
+                     reports a peak of less than half of it, and one that
+                     allocates BALLAST KiB reports at least that
+  engines          each group of `ENGINES` writes the same estimates of
+                     SAMPLES values by every engine and backend; NumPy is
+                     skipped if it cannot be imported
+"""
+
+__all__ = ['BALLAST', 'CHECKS', 'ENGINES', 'SAMPLES', 'engines', 'peak']
+
+import os
+import sys
+import tempfile
+from typing import Callable, Dict, List, Tuple
+
+from filter import vectorized
+
+from . import internals
+from . import suite
+
+BALLAST = 64 * 1024
+
+def peak() -> List[str]:
+    """Describe each way in which peak memory is not that of the command."""
+    problems = list()
+    ballast = bytearray(BALLAST * 1024)
+    for index in range(0, len(ballast), 4096):
+        ballast[index] = 1
+
+    allocate = (
+        "b = bytearray({0})\n"
+        "for i in range(0, len(b), 4096): b[i] = 1"
+    ).format(BALLAST * 1024)
+    for command, low, high in (
+        ([sys.executable, "-c", "pass"], 0, BALLAST // 2),
+        ([sys.executable, "-c", allocate], BALLAST, None),
+    ):
+        status, _, _peak, _ = internals._run(command, suite.ROOT)
+        if status != 0:
+            problems.append("'{0}' failed with status {1}".format(
+                command[-1], status,
+            ))
+        elif _peak is not None and (
+            _peak < low or (high is not None and _peak >= high)
+        ):
+            problems.append("'{0}' reports {1} KiB".format(
+                command[-1].splitlines()[0], _peak,
+            ))
+    del ballast
+    return problems
+
+#NOTE: more than one chunk of `filter.parallel`, so that jobs split the data
+SAMPLES = 40000
+
+#NOTE: a method and its options, alongside the options of every engine;
+#      '--multi-column' groups read rows of two columns. Kernels sum to an
+#      odd number, so that no estimate of 4 decimal places lies exactly on a
+#      rounding tie
+ENGINES: List[Tuple[List[str], List[List[str]]]] = [
+    (["ab"], [[], ["--engine", "iir"], ["--backend", "numpy"]]),
+    (["ab", "--delta", "0.01"], [[], ["--engine", "iir"]]),
+    (["kalman", "--delta", "0.01", "--delta-sigma", "0.01"], [
+        [], ["--engine", "gain"],
+    ]),
+    (["kalman", "--multi-column", "--delta-sigma", "0.01"], [
+        [], ["--engine", "gain"], ["--backend", "numpy"],
+    ]),
+    (["convolve", "--kernel", "1", "2", "3", "2", "1"], [
+        [], ["--engine", "fft"], ["--jobs", "2"], ["--backend", "numpy"],
+    ]),
+    (["convolve", "--boundary", "reflect", "--kernel", "1", "2", "3", "1"], [
+        [], ["--engine", "fft"], ["--jobs", "2"], ["--backend", "numpy"],
+    ]),
+    (["sweep", "ab", "--alpha", "0.01:0.5:5", "--beta", "0.001:0.05:5"], [
+        [], ["--backend", "numpy"],
+    ]),
+    (["sweep", "kalman", "--variance", "0.5:12.5:5"], [
+        [], ["--backend", "numpy"],
+    ]),
+]
+
+def engines() -> List[str]:
+    """Describe each engine whose estimates differ from those of the first
+    engine of its group.
+    """
+    problems = list()
+    numpy = vectorized.available()
+    with tempfile.TemporaryDirectory(prefix="benchmarks-") as directory:
+        series = suite.generate(directory, SAMPLES, 0)["text"]
+        rows = os.path.join(directory, "rows.text")
+        with open(series) as f, open(rows, "w") as g:
+            values = f.read().split()
+            for pair in zip(values[0::2], values[1::2]):
+                g.write("\t".join(pair) + "\n")
+
+        for group, options in ENGINES:
+            filename = rows if "--multi-column" in group else series
+            expected = None
+            for _options in options:
+                if "numpy" in _options and not numpy:
+                    continue
+                #NOTE: the kernel consumes all values up to '--', so engine
+                #      options follow the method
+                command = [sys.executable, "-m", "filter", group[0]] + (
+                    _options + group[1:] + ["--", filename]
+                )
+                status, _, _, output = internals._run(
+                    command, suite.ROOT, capture=True,
+                )
+                if status != 0:
+                    problems.append("'{0}' failed with status {1}".format(
+                        " ".join(command[3:-2]), status,
+                    ))
+                elif expected is None:
+                    expected = output
+                elif output != expected:
+                    problems.append("'{0}' differs from '{1}'".format(
+                        " ".join(command[3:-2]), " ".join(group),
+                    ))
+    return problems
+
+CHECKS: Dict[str, Callable[[], List[str]]] = {
+    "peak": peak,
+    "engines": engines,
+}
+
+def main() -> None:
+    failed = False
+    for name, check in CHECKS.items():
+        for problem in check():
+            internals._print_failed_check(name, problem)
+            failed = True
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+
+OPTIONS={
+	"--backend":("backend",1),
+	"--cases":("cases",1),
+	"-c":("cases",1),
+	"--compare":("compare",(2, 2)),
+	"--data-dir":("data-dir",1),
+	"--format":("format",1),
+	"--help":("help",0),
+	"-h":("help",0),
+	"-x":("help",0),
+	"--kernels":("kernels",1),
+	"-k":("kernels",1),
+	"--list-cases":("list-cases",0),
+	"--output":("output",1),
+	"-o":("output",1),
+	"--repeat":("repeat",1),
+	"-r":("repeat",1),
+	"--seed":("seed",1),
+	"--sizes":("sizes",1),
+	"-n":("sizes",1),
+	"--tolerance":("tolerance",1),
+}
+
+def main(arguments):
+	config=dict()
+	positional=[]
+	consuming,needing,wanting=None,0,0
+	while len(arguments) and arguments[0]!="--":
+		if consuming is not None:
+			if config[consuming] is None:
+				config[consuming]=arguments.pop(0)
+			else:
+				config[consuming].append(arguments.pop(0))
+			needing-=1
+			if wanting is not None:
+				wanting-=1
+			if wanting==0:
+				consuming,needing,wanting=None,0,0
+		elif arguments[0].split("=",1)[0] in OPTIONS:
+			option,_,attached_value=arguments.pop(0).partition("=")
+			if not _:
+				attached_value=None
+			name,number=OPTIONS[option]
+			if number==0:
+				if attached_value is not None:
+					message=(
+						f'unexpected value while parsing "{name}"'
+						' (expected 0 values)'
+					)
+					raise ValueError(message) from None
+				config[name]=True
+			elif number==1:
+				config[name]=attached_value
+				if attached_value is None:
+					consuming,needing,wanting=name,1,1
+				else:
+					consuming,needing,wanting=None,0,0
+			else:
+				minimum,maximum=number
+				if attached_value is not None:
+					config[name]=[attached_value]
+					if maximum is not None:
+						maximum-=1
+					consuming,needing,wanting=name,minimum-1,maximum
+				else:
+					config[name]=[]
+					consuming,needing,wanting=name,minimum,maximum
+		else:
+			positional.append(arguments.pop(0))
+	if needing>0:
+		message=(
+			f'unexpected end while parsing "{consuming}"'
+			f' (expected {needing} values)'
+		)
+		raise ValueError(message) from None
+	for argument in arguments[1:]:
+		positional.append(argument)
+	return config,positional
+
+if __name__=="__main__":
+	import sys
+	cfg,pos = main(sys.argv[1:])
+	cfg = {k:v for k,v in cfg.items() if v is not None}
+	if len(cfg):
+		print("Options:")
+		for k,v in cfg.items():
+			print(f"{k:20} = {v}")
+	if len(pos):
+		print("Positional arguments:", ", ".join(pos))
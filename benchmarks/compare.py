@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+
+"""Compare two results files of the benchmark suite, such as the results of
+two commits.
+
+A case is a regression if its throughput fell, or its peak memory rose, by
+more than the tolerance.
+"""
+
+__all__ = ['compare', 'load']
+
+import sys
+import json
+from typing import Dict, Optional, Tuple
+
+from . import internals
+
+def load(
+    filename: str,
+) -> Optional[Dict]:
+    try:
+        with open(filename, "r") as f:
+            results = json.load(f)
+    except OSError:
+        internals._print_invalid_file(filename)
+        return None
+    except ValueError:
+        internals._print_invalid_results(filename)
+        return None
+    if not isinstance(results, dict) or "results" not in results:
+        internals._print_invalid_results(filename)
+        return None
+    return results
+
+def compare(
+    old: Dict,
+    new: Dict,
+    tolerance: float,
+) -> int:
+    """Write a table comparing each case and size found in both results.
+    Returns the number of regressions.
+    """
+    _old = _index(old)
+    _new = _index(new)
+    sys.stdout.write("old: {0}\nnew: {1}\n".format(
+        _describe(old), _describe(new),
+    ))
+    if old.get("options") != new.get("options"):
+        sys.stdout.write("Warning: results were run with different options\n")
+    sys.stdout.write(
+        "{0:<20} {1:>10}  {2:>14}  {3:>14}  {4:>8}  {5:>8}\n".format(
+            "Case:", "Samples:", "Old /s:", "New /s:", "Speed:", "Memory:",
+        )
+    )
+
+    regressions = 0
+    for key in sorted(_old.keys() & _new.keys(), key=_order(new)):
+        before, after = _old[key], _new[key]
+        speed = _ratio(after["samples_per_second"],
+                       before["samples_per_second"])
+        memory = _ratio(after["peak_rss_kib"], before["peak_rss_kib"])
+
+        flag = ""
+        if speed is not None and speed < 1 - (tolerance / 100):
+            flag = "  slower"
+        if memory is not None and memory > 1 + (tolerance / 100):
+            flag += "  larger"
+        regressions += 1 if flag else 0
+
+        sys.stdout.write(
+            "{0:<20} {1:>10}  {2:>14}  {3:>14}  {4:>8}  {5:>8}{6}\n".format(
+                key[0],
+                key[1],
+                _format_rate(before["samples_per_second"]),
+                _format_rate(after["samples_per_second"]),
+                _format_ratio(speed),
+                _format_ratio(memory),
+                flag,
+            )
+        )
+
+    for name, only in (("old", _old.keys() - _new.keys()),
+                       ("new", _new.keys() - _old.keys())):
+        if len(only) > 0:
+            sys.stdout.write(
+                "{0} cases only in {1} results\n".format(len(only), name),
+            )
+    return regressions
+
+def _index(
+    results: Dict,
+) -> Dict[Tuple[str, int], Dict]:
+    """Index successful results by case and size."""
+    return {
+        (result["case"], result["samples"]): result
+        for result in results["results"]
+        if "error" not in result
+    }
+
+def _order(results: Dict):
+    """Order cases as they were run."""
+    order = {
+        (result["case"], result["samples"]): index
+        for index, result in enumerate(results["results"])
+    }
+    return lambda key: order.get(key, len(order))
+
+def _describe(results: Dict) -> str:
+    commit = (results.get("commit") or "unknown commit")[:12]
+    if results.get("dirty"):
+        commit += " (modified)"
+    return "{0}, {1}".format(commit, results.get("date", "unknown date"))
+
+def _ratio(
+    numerator: Optional[float],
+    denominator: Optional[float],
+) -> Optional[float]:
+    if numerator is None or not denominator:
+        return None
+    return numerator / denominator
+
+def _format_rate(rate: Optional[float]) -> str:
+    return "-" if rate is None else "{0:,.0f}".format(rate)
+
+def _format_ratio(ratio: Optional[float]) -> str:
+    return "-" if ratio is None else "{0:.2f}x".format(ratio)
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import subprocess
+from typing import Dict, List, Optional, Tuple
+
+#NOTE: run by path, so as not to depend on the working directory
+PEAK = os.path.join(os.path.dirname(os.path.abspath(__file__)), "peak.py")
+
+def _try_get_int(
+    mapping: Dict,
+    key: str,
+    *,
+    default: Optional[int] = None,
+) -> Optional[int]:
+    if key in mapping:
+        return int(mapping[key])
+    else:
+        return default
+
+def _try_get_float(
+    mapping: Dict,
+    key: str,
+    *,
+    default: Optional[float] = None,
+) -> Optional[float]:
+    if key in mapping:
+        return float(mapping[key])
+    else:
+        return default
+
+def _try_get_list_int(
+    mapping: Dict,
+    key: str,
+    *,
+    default: Optional[List[int]] = None,
+) -> Optional[List[int]]:
+    """Get a comma-separated list of integers, which may be written in
+    scientific notation such as '1e6'.
+    """
+    if key in mapping:
+        return [int(float(value)) for value in mapping[key].split(",")]
+    else:
+        return default
+
+def _run(
+    command: List[str],
+    cwd: str,
+    capture: bool = False,
+) -> Tuple[int, float, Optional[int], bytes]:
+    """Run a command to completion. Returns the exit status, the elapsed
+    seconds, the peak resident memory in KiB, and the output if captured.
+
+    The command is run by `benchmarks.peak`, so that its peak memory does not
+    include that of this process. Peak memory is only known where `os.wait4`
+    is available.
+    """
+    read, write = os.pipe()
+    try:
+        process = subprocess.Popen(
+            [sys.executable, "-S", PEAK, str(write)] + command,
+            cwd=cwd,
+            stdout=subprocess.PIPE if capture else subprocess.DEVNULL,
+            pass_fds=(write, ),
+        )
+    finally:
+        os.close(write)
+    with os.fdopen(read, "rb") as f:
+        output = process.stdout.read() if capture else b""  # type: ignore
+        status = process.wait()
+        report = f.read().split()
+    if process.stdout is not None:
+        process.stdout.close()
+    if len(report) != 2:
+        #NOTE: the command could not be started
+        return status, 0.0, None, output
+    elapsed, peak = float(report[0]), report[1]
+    return status, elapsed, int(peak) if peak != b"-" else None, output
+
+def _print_usage() -> None:
+    _msg = (
+        "Usage: python -m benchmarks [OPTIONS]",
+        "       python -m benchmarks --compare OLD NEW",
+        "Try `python -m benchmarks --help`",
+    )
+    sys.stderr.write("\n".join(_msg) + "\n")
+
+def _print_cases(*cases: str) -> None:
+    _msg = "Cases: {0}\n".format(", ".join(cases))
+    sys.stdout.write(_msg)
+
+def _print_progress(result: Dict) -> None:
+    if "error" in result:
+        _msg = "{0:<20} {1:>10}  failed with status {2}\n".format(
+            result["case"], result["samples"], result["error"],
+        )
+    else:
+        _msg = "{0:<20} {1:>10}  {2:10.4f}s  {3:>14,.0f}/s  {4} KiB\n"
+        _msg = _msg.format(
+            result["case"],
+            result["samples"],
+            result["seconds"],
+            result["samples_per_second"],
+            result["peak_rss_kib"],
+        )
+    sys.stderr.write(_msg)
+
+def _print_invalid_number() -> None:
+    _msg = "{0}: Invalid number of samples, taps, runs, or seed\n".format(
+        sys.argv[0],
+    )
+    sys.stderr.write(_msg)
+
+def _print_invalid_backend(backend: str) -> None:
+    _msg = "{0}: Invalid backend '{1}'\n".format(sys.argv[0], backend)
+    sys.stderr.write(_msg)
+
+def _print_invalid_format(data_format: str) -> None:
+    _msg = "{0}: Invalid format '{1}'\n".format(sys.argv[0], data_format)
+    sys.stderr.write(_msg)
+
+def _print_invalid_kernel(taps: int) -> None:
+    _msg = (
+        "{0}: Invalid kernel size '{1}' (expected a positive integer)\n"
+    ).format(sys.argv[0], taps)
+    sys.stderr.write(_msg)
+
+def _print_invalid_results(filename: str) -> None:
+    _msg = "{0}: Invalid results file '{1}'\n".format(sys.argv[0], filename)
+    sys.stderr.write(_msg)
+
+def _print_invalid_file(filename: str) -> None:
+    _msg = "{0}: Invalid file '{1}'\n".format(sys.argv[0], filename)
+    sys.stderr.write(_msg)
+
+def _print_no_cases() -> None:
+    _msg = "{0}: No cases match; try `--list-cases`\n".format(sys.argv[0])
+    sys.stderr.write(_msg)
+
+def _print_startup_regression(case: str, problem: str) -> None:
+    _msg = "{0}: Startup of '{1}' {2}\n".format(sys.argv[0], case, problem)
+    sys.stderr.write(_msg)
+
+def _print_failed_check(check: str, problem: str) -> None:
+    _msg = "{0}: Check '{1}' failed: {2}\n".format(sys.argv[0], check, problem)
+    sys.stderr.write(_msg)
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+
+"""python -m benchmarks.peak FD COMMAND [ARGUMENTS...]
+Run a command to completion, and write its elapsed seconds and peak resident
+memory in KiB to the file descriptor FD. Exits with the status of the
+command.
+
+On Linux, the peak memory of a process starts from that of the process it was
+forked from, and is carried through exec, so a command run directly by the
+suite would report at least the memory held by the suite. This process holds
+little beyond a bare interpreter, so commands run from it report their own
+peak, or that of a bare interpreter if it is higher.
+"""
+
+import os
+import sys
+import time
+import subprocess
+
+def main() -> None:
+    if len(sys.argv) < 3:
+        sys.stderr.write(__doc__.splitlines()[0] + "\n")
+        sys.exit(2)
+    fd = int(sys.argv[1])
+
+    start = time.perf_counter()
+    process = subprocess.Popen(sys.argv[2:])
+    if not hasattr(os, "wait4"):
+        status = process.wait()
+        os.write(fd, "{0!r} -\n".format(time.perf_counter() - start).encode())
+        sys.exit(status)
+
+    _, wait_status, usage = os.wait4(process.pid, 0)
+    elapsed = time.perf_counter() - start
+    if os.WIFEXITED(wait_status):
+        status = os.WEXITSTATUS(wait_status)
+    else:
+        status = 128 + os.WTERMSIG(wait_status)
+    process.returncode = status
+
+    #NOTE: peak memory is reported in bytes on macOS, in KiB elsewhere
+    peak = usage.ru_maxrss
+    if sys.platform == "darwin":
+        peak //= 1024
+    os.write(fd, "{0!r} {1}\n".format(elapsed, peak).encode())
+    sys.exit(status)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+
+"""python -m benchmarks.stage STAGE FORMAT FILE
+Time one stage of `filter` in this process, and print the elapsed seconds.
+
+Stages are:
+  parse  read FILE as FORMAT, block by block, as filters consume it lazily
+  write  write the values of FILE, an f64le file, as FORMAT to /dev/null
+"""
+
+import os
+import sys
+import time
+import array
+import functools
+
+from filter import formats
+from filter import internals
+
+def parse(
+    data_format: str,
+    filename: str,
+) -> float:
+    if data_format == "text":
+        decoder = internals._line_decoder
+    else:
+        decoder = functools.partial(formats.decoder, data_format)
+    start = time.perf_counter()
+    for _ in internals._get_raw_blocks([filename], decoder):
+        pass
+    return time.perf_counter() - start
+
+def write(
+    data_format: str,
+    filename: str,
+) -> float:
+    values = array.array("d")
+    with open(filename, "rb") as f:
+        values.frombytes(f.read())
+    if sys.byteorder != "little":
+        values.byteswap()
+
+    stdout = sys.stdout
+    sys.stdout = open(os.devnull, "w")
+    try:
+        start = time.perf_counter()
+        internals._write_values(values, data_format)
+        sys.stdout.flush()
+        return time.perf_counter() - start
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+
+def main():
+    if len(sys.argv) != 4 or sys.argv[1] not in ("parse", "write"):
+        sys.stderr.write(__doc__.splitlines()[0] + "\n")
+        sys.exit(1)
+    _stage, _format, _file = sys.argv[1:]
+    if _stage == "parse":
+        _seconds = parse(_format, _file)
+    else:
+        _seconds = write(_format, _file)
+    sys.stdout.write("{0!r}\n".format(_seconds))
+    sys.exit(0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+
+"""Startup of `filter` and `rng`, as launched on short series.
+
+Each command is timed as a whole, alongside a bare interpreter for reference.
+It is then run once more with `python -X importtime`, to check that:
+  - no module of DEFERRED is imported before it is needed
+  - modules imported beyond those of a bare interpreter take no more than
+      IMPORT_BUDGET seconds in total
+
+Without a cache of bytecode, such as with PYTHONDONTWRITEBYTECODE set, import
+times include compiling each module, so are not comparable.
+"""
+
+__all__ = ['CASES', 'DEFERRED', 'IMPORT_BUDGET', 'check', 'run']
+
+import sys
+import subprocess
+from typing import Dict, List, Optional, Tuple
+
+from . import internals
+from . import suite
+
+CASES = (
+    "startup-python", "startup-filter-version", "startup-filter-ab",
+    "startup-rng-uniform",
+)
+
+DEFERRED = (
+    "typing", "re", "ast", "multiprocessing", "subprocess", "select", "numpy",
+)
+
+IMPORT_BUDGET = 0.015
+
+def run(
+    names: List[str],
+    directory: str,
+    seed: int,
+    repeat: int,
+) -> List[Dict]:
+    """Time the startup of each named case, and the imports of each."""
+    files = suite.generate(directory, 10, seed)
+    commands: List[Tuple[str, List[str], int]] = [
+        ("startup-python", ["-c", "pass"], 1),
+        ("startup-filter-version", ["-m", "filter", "--version"], 1),
+        ("startup-filter-ab", ["-m", "filter", "ab", "--", files["text"]], 10),
+        ("startup-rng-uniform", ["-m", "rng", "uniform", "-n", "10"], 10),
+    ]
+    baseline = importtime(["-c", "pass"], repeat) or {}
+
+    results = list()
+    for name, arguments, number in commands:
+        if name not in names:
+            continue
+        result = suite.measure(
+            name, [sys.executable] + arguments, number, repeat, False,
+        )
+        imports = importtime(arguments, repeat)
+        if "error" not in result and imports is not None:
+            extra = {
+                module: seconds for module, seconds in imports.items()
+                if module not in baseline
+            }
+            result["import_seconds"] = sum(extra.values())
+            result["imports"] = len(extra)
+            result["deferred_imports"] = [
+                module for module in DEFERRED if module in imports
+            ]
+        internals._print_progress(result)
+        results.append(result)
+    return results
+
+def importtime(
+    arguments: List[str],
+    repeat: int,
+) -> Optional[Dict[str, float]]:
+    """Run the interpreter with `-X importtime`. Returns the seconds spent
+    importing each module itself, from the run with the least time in total.
+    """
+    best: Optional[Dict[str, float]] = None
+    for _ in range(max(1, repeat)):
+        process = subprocess.run(
+            [sys.executable, "-X", "importtime"] + arguments,
+            cwd=suite.ROOT,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+        )
+        if process.returncode != 0:
+            return None
+        imports = dict()
+        for line in process.stderr.decode(errors="replace").splitlines():
+            if not line.startswith("import time:"):
+                continue
+            fields = line[len("import time:"):].split("|")
+            if len(fields) != 3 or not fields[0].strip().isdigit():
+                continue
+            imports[fields[2].strip()] = int(fields[0]) / 1000000
+        if best is None or sum(imports.values()) < sum(best.values()):
+            best = imports
+    return best
+
+def check(result: Dict) -> List[str]:
+    """Describe each way in which startup exceeds its budget."""
+    problems = list()
+    for module in result.get("deferred_imports", []):
+        problems.append("imports '{0}' at startup".format(module))
+    if result.get("import_seconds", 0) > IMPORT_BUDGET:
+        problems.append("imports take {0:.1f} ms of {1:.1f} ms".format(
+            result["import_seconds"] * 1000, IMPORT_BUDGET * 1000,
+        ))
+    return problems
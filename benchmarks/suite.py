@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+
+"""Inputs and cases of the benchmark suite.
+
+Inputs are series drawn from the normal distribution of `rng`, with a fixed
+seed, so that every run of the suite filters the same data.
+
+Cases are timed in a separate process each, so that the peak memory of one
+case does not carry into the next:
+  rng-*            generate samples with `rng`
+  parse-*          read and decode an input file, without filtering
+  write-*          format and write values, without filtering
+  ab*, kalman*,    filter an input file with `filter`
+    convolve*
+  sweep-*          score a grid of 25 configurations with `filter sweep`
+  startup-*        start `filter` or `rng` on a short series; see `startup`
+
+Generators and filters are timed as a whole command, including the start of
+the interpreter. The parsing and output stages are timed within the process.
+"""
+
+__all__ = ['CASES', 'cases', 'generate', 'matches', 'run', 'select']
+
+import os
+import sys
+import array
+import random
+import fnmatch
+import itertools
+from typing import Callable, Dict, List, Optional, Tuple
+
+from rng import formats as rng_formats
+from rng import internals as rng_internals
+from rng import normal
+
+from . import internals
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CASES = (
+    "rng-normal", "rng-uniform", "rng-notrandom", "rng-normal-jobs",
+    "parse-text", "parse-f64le", "write-text", "write-f64le",
+    "ab", "ab-iir", "kalman", "kalman-gain", "kalman-gain-steady",
+    "kalman-bank", "kalman-smooth",
+    "convolve-kN", "convolve-fft-kN", "convolve-jobs-kN", "sweep-ab",
+    "sweep-kalman",
+)
+
+#NOTE: a command is built from the sample count and the input files by format
+Command = Callable[[int, Dict[str, str]], List[str]]
+
+def cases(
+    kernels: List[int],
+    backend: str,
+    data_format: str,
+) -> List[Tuple[str, Command, bool]]:
+    """List each case by name, alongside its command and whether the command
+    reports its own timing on stdout.
+    """
+    _rng = [sys.executable, "-m", "rng"]
+    _filter = [sys.executable, "-m", "filter"]
+    _stage = [sys.executable, "-m", "benchmarks.stage"]
+    _options = [
+        "--backend", backend,
+        "--input-format", data_format,
+        "--output-format", data_format,
+    ]
+
+    def generator(distribution: str, *arguments: str) -> Command:
+        return lambda number, files: _rng + [
+            distribution, "-n", str(number), "--backend", backend,
+            "--output-format", data_format,
+        ] + list(arguments)
+
+    def stage(name: str, source: str, target: str) -> Command:
+        return lambda number, files: _stage + [name, target, files[source]]
+
+    def method(name: str, *arguments: str) -> Command:
+        #NOTE: the kernel consumes all values up to '--', so options go first
+        return lambda number, files: _filter + [name] + _options + list(
+            arguments,
+        ) + ["--", files[data_format]]
+
+    _cases = [
+        ("rng-normal", generator("normal"), False),
+        ("rng-uniform", generator("uniform"), False),
+        ("rng-notrandom", generator("notrandom"), False),
+        ("rng-normal-jobs", generator(
+            "normal", "--jobs", str(os.cpu_count() or 1),
+        ), False),
+        ("parse-text", stage("parse", "text", "text"), True),
+        ("parse-f64le", stage("parse", "f64le", "f64le"), True),
+        ("write-text", stage("write", "f64le", "text"), True),
+        ("write-f64le", stage("write", "f64le", "f64le"), True),
+        ("ab", method("ab"), False),
+        ("ab-iir", method("ab", "--engine", "iir"), False),
+        ("kalman", method("kalman"), False),
+        ("kalman-gain", method("kalman", "--engine", "gain"), False),
+        ("kalman-gain-steady", method(
+            "kalman", "--engine", "gain", "--delta-sigma", "0.01",
+        ), False),
+        ("kalman-bank", method("kalman", "--process-noise", "0.01"), False),
+        ("kalman-smooth", method("kalman", "--smooth"), False),
+        ("sweep-ab", method(
+            "sweep", "ab", "--alpha", "0.01:0.5:5", "--beta", "0.001:0.05:5",
+        ), False),
+        ("sweep-kalman", method(
+            "sweep", "kalman", "--variance", "0.5:12.5:25",
+        ), False),
+    ]
+    for taps in kernels:
+        _kernel = ["--kernel"] + ["1"] * taps
+        _cases.append((
+            "convolve-k{0}".format(taps),
+            method("convolve", *_kernel),
+            False,
+        ))
+        _cases.append((
+            "convolve-fft-k{0}".format(taps),
+            method("convolve", "--engine", "fft", *_kernel),
+            False,
+        ))
+        #NOTE: each process also filters a halo of the kernel's length
+        _cases.append((
+            "convolve-jobs-k{0}".format(taps),
+            method("convolve", "--jobs", str(os.cpu_count() or 1), *_kernel),
+            False,
+        ))
+    return _cases
+
+def select(
+    _cases: List[Tuple[str, Command, bool]],
+    patterns: Optional[List[str]],
+) -> List[Tuple[str, Command, bool]]:
+    """Keep the cases whose names match any of the shell-style patterns."""
+    return [case for case in _cases if matches(case[0], patterns)]
+
+def matches(
+    name: str,
+    patterns: Optional[List[str]],
+) -> bool:
+    if not patterns:
+        return True
+    return any(fnmatch.fnmatchcase(name, pattern) for pattern in patterns)
+
+def generate(
+    directory: str,
+    number: int,
+    seed: int,
+) -> Dict[str, str]:
+    """Write an input of `number` samples as both text and f64le, unless it
+    was already written. Returns the filename of each format.
+    """
+    files = {
+        data_format: os.path.join(
+            directory, "normal-{0}-{1}.{2}".format(number, seed, data_format),
+        )
+        for data_format in ("text", "f64le")
+    }
+    if all(os.path.exists(filename) for filename in files.values()):
+        return files
+
+    random.seed(seed)
+    samples = itertools.islice(
+        normal.distribution(0.0, 1.0, 0.001, lambda x: x), number,
+    )
+    line = rng_internals._value_format() + "\n"
+    partial = {key: value + ".partial" for key, value in files.items()}
+    with open(partial["text"], "w") as text, \
+            open(partial["f64le"], "wb") as binary:
+        while True:
+            block = array.array("d", itertools.islice(samples, 1 << 16))
+            if len(block) == 0:
+                break
+            text.write(line * len(block) % tuple(block))
+            rng_formats.write(binary, block, "f64le")
+    for data_format, filename in files.items():
+        os.replace(partial[data_format], filename)
+    return files
+
+def run(
+    _cases: List[Tuple[str, Command, bool]],
+    sizes: List[int],
+    directory: str,
+    seed: int,
+    repeat: int,
+) -> List[Dict]:
+    """Time every case at every size. Each case is run `repeat` times; the
+    fastest run and the highest peak memory are kept.
+    """
+    results = list()
+    for number in sizes:
+        files = generate(directory, number, seed)
+        for name, command, reports in _cases:
+            result = measure(name, command(number, files), number, repeat,
+                             reports)
+            internals._print_progress(result)
+            results.append(result)
+    return results
+
+def measure(
+    name: str,
+    command: List[str],
+    number: int,
+    repeat: int,
+    reports: bool,
+) -> Dict:
+    runs: List[float] = list()
+    peak: Optional[int] = None
+    for _ in range(max(1, repeat)):
+        status, elapsed, _peak, output = internals._run(command, ROOT,
+                                                        reports)
+        if status != 0:
+            return {"case": name, "samples": number, "error": status}
+        if reports:
+            elapsed = float(output)
+        runs.append(elapsed)
+        if _peak is not None:
+            peak = max(peak or 0, _peak)
+
+    seconds = min(runs)
+    return {
+        "case": name,
+        "samples": number,
+        "seconds": seconds,
+        "samples_per_second": number / seconds if seconds > 0 else None,
+        "peak_rss_kib": peak,
+        "runs": runs,
+    }
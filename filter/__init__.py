@@ -0,0 +1,36 @@
+"""Filters of noisy measurements, for use as a library.
+
+  AlphaBetaFilter    alpha-beta filter; see `filter.ab`
+  KalmanFilter       Kalman filter; see `filter.kalman`
+  ConvolutionFilter  causal convolution filter; see `filter.convolve`
+  KalmanBank         Kalman filters of many tracks; see `filter.bank`
+
+Each filter holds the state of one series. `update(x)` takes one measurement
+and returns its estimate, and `update_batch(buffer)` takes the measurements
+of any object of the buffer protocol, such as `array('d')`, `bytes` of
+native doubles, or a NumPy array, and returns an `array('d')` of estimates.
+`KalmanBank` instead holds many series, updated together by `update`.
+
+Filters are imported from their modules when first used, so that starting the
+command line does not import every method.
+"""
+
+__all__ = [
+    'AlphaBetaFilter', 'ConvolutionFilter', 'KalmanBank', 'KalmanFilter',
+]
+
+_MODULES = {
+    "AlphaBetaFilter": "ab",
+    "ConvolutionFilter": "convolve",
+    "KalmanBank": "bank",
+    "KalmanFilter": "kalman",
+}
+
+def __getattr__(name):
+    if name not in _MODULES:
+        raise AttributeError(
+            "module {0!r} has no attribute {1!r}".format(__name__, name),
+        )
+    import importlib
+    module = importlib.import_module("." + _MODULES[name], __name__)
+    return getattr(module, name)
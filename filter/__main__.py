@@ -1,9 +1,12 @@
 #!/usr/bin/env python3
 
 import sys
+import atexit
 
 from . import cli
+from . import formats
 from . import internals
+from . import metrics
 
 def main():
     _config, _positionals = cli.main(sys.argv[1:])
@@ -25,6 +28,26 @@ def main():
         internals._print_usage()
         sys.exit(1)
 
+    #NOTE: a sweep filters by another method, with grids of its parameters
+    _grids = None
+    if _method == "sweep":
+        if "help" in _config.keys():
+            from . import sweep
+            sys.stdout.write(sweep.__doc__)
+            sys.exit(0)
+        elif len(_positionals) == 0:
+            internals._print_usage()
+            sys.exit(1)
+        _method = _positionals.pop(0)
+        _grids = dict()
+        for _name in ("alpha", "beta", "variance"):
+            try:
+                _grids[_name] = internals._try_get_grid(_config, _name)
+            except ValueError:
+                internals._print_invalid_grid("--" + _name, _config[_name])
+                sys.exit(1)
+            _config.pop(_name, None)
+
     _init_estimate = 0
     _init_deviation = 1
     if "initial" in _config.keys():
@@ -37,17 +60,48 @@ def main():
 
     _data = {
         "alpha": internals._try_get_float(_config, "alpha"),
+        "auto_sigma": "auto-sigma" in _config.keys(),
+        "auto_variance": (
+            "auto-variance" in _config.keys() or "auto-sigma" in _config.keys()
+        ),
+        "backend": _config.get("backend", "python"),
+        "bank": "keyed" in _config.keys() or "process-noise" in _config.keys(),
         "beta": internals._try_get_float(_config, "beta"),
+        "boundary": _config.get("boundary", None),
+        "columns": "multi-column" in _config.keys(),
+        "delimiter": _config.get("delimiter", None),
         "delta": internals._try_get_float(_config, "delta"),
+        "delta_sigma": internals._try_get_float(_config, "delta-sigma"),
+        "engine": _config.get("engine", None),
+        "flush": internals._try_get_int(_config, "flush"),
+        "flush_interval": internals._try_get_float(_config, "flush-interval"),
+        "grid": _grids,
         "initial_estimate": _init_estimate,
+        "input_format": _config.get("input-format", "text"),
+        "interval": internals._try_get_float(_config, "interval"),
+        "jobs": internals._try_get_int(_config, "jobs"),
         "initial_std_deviation": _init_deviation,
         "kernel": internals._try_get_list_float(_config, "kernel"),
+        "keyed": "keyed" in _config.keys(),
+        "lag": internals._try_get_int(_config, "lag"),
+        "load_state": _config.get("load-state", None),
         "method": _method,
+        "metrics": _config.get("metrics", None),
+        "output_format": _config.get("output-format", "text"),
+        "per_file": "per-file" in _config.keys(),
+        "precision": _config.get("precision", None),
+        "process_noise": internals._try_get_float(_config, "process-noise"),
         "report": "report" in _config.keys(),
+        "save_state": _config.get("save-state", None),
+        "smooth": "smooth" in _config.keys() or "lag" in _config.keys(),
+        "stream": "stream" in _config.keys(),
+        "timestamps": "timestamps" in _config.keys(),
         "variance": internals._try_get_float(_config, "variance"),
     }
 
-    if _method == "ab":
+    if _grids is not None and _method in ("ab", "kalman"):
+        from . import sweep as implementation
+    elif _method == "ab":
         from . import ab as implementation
     elif _method == "kalman":
         from . import kalman as implementation
@@ -58,14 +112,156 @@ def main():
         internals._print_usage()
         sys.exit(1)
 
+    if _grids is not None:
+        if _method not in ("ab", "kalman"):
+            internals._print_incompatible_options("sweep", _method)
+            sys.exit(1)
+        for _option in (
+            "multi-column", "per-file", "stream", "timestamps", "load-state",
+            "save-state", "engine", "keyed", "process-noise", "smooth", "lag",
+            "auto-variance", "auto-sigma",
+        ):
+            if _option in _config.keys():
+                internals._print_incompatible_options("sweep", "--" + _option)
+                sys.exit(1)
+
     if "help" in _config.keys():
         sys.stdout.write(implementation.__doc__)
         sys.exit(0)
 
+    if _data["timestamps"]:
+        if _method == "convolve":
+            internals._print_incompatible_options("--timestamps", _method)
+            sys.exit(1)
+        for _option in ("multi-column", "load-state", "save-state"):
+            if _option in _config.keys():
+                internals._print_incompatible_options(
+                    "--timestamps", "--" + _option,
+                )
+                sys.exit(1)
+
+    if _data["bank"]:
+        _option = "--keyed" if _data["keyed"] else "--process-noise"
+        if _method != "kalman":
+            internals._print_incompatible_options(_option, _method)
+            sys.exit(1)
+        _incompatible = [
+            "timestamps", "load-state", "save-state", "engine", "delta-sigma",
+        ]
+        if _data["keyed"]:
+            _incompatible.append("multi-column")
+        for _other in _incompatible:
+            if _other in _config.keys():
+                internals._print_incompatible_options(_option, "--" + _other)
+                sys.exit(1)
+        #NOTE: keys are text, so keyed data is only read and written as text
+        for _format in (_data["input_format"], _data["output_format"]):
+            if _data["keyed"] and _format != "text":
+                internals._print_incompatible_options(_option, _format)
+                sys.exit(1)
+
+    if _data["smooth"]:
+        _option = "--lag" if _data["lag"] is not None else "--smooth"
+        if _method != "kalman":
+            internals._print_incompatible_options(_option, _method)
+            sys.exit(1)
+        _incompatible = [
+            "timestamps", "load-state", "save-state", "engine", "keyed",
+        ]
+        if _data["lag"] is None:
+            #NOTE: the last measurement is needed to smooth the first
+            _incompatible.append("stream")
+        for _other in _incompatible:
+            if _other in _config.keys():
+                internals._print_incompatible_options(_option, "--" + _other)
+                sys.exit(1)
+        if _data["lag"] is not None and _data["lag"] < 0:
+            internals._print_invalid_lag(_data["lag"])
+            sys.exit(1)
+
+    if _data["auto_variance"]:
+        _option = (
+            "--auto-sigma" if _data["auto_sigma"] else "--auto-variance"
+        )
+        if _method != "kalman":
+            internals._print_incompatible_options(_option, _method)
+            sys.exit(1)
+        #NOTE: the variance is estimated from all data before filtering any
+        for _other in (
+            "variance", "stream", "timestamps", "load-state", "keyed",
+            "process-noise", "delta-sigma",
+        ):
+            if _other in _config.keys():
+                internals._print_incompatible_options(_option, "--" + _other)
+                sys.exit(1)
+
+    if _data["backend"] == "numpy" and _method == "kalman" and not (
+        _data["columns"] or _data["bank"]
+    ):
+        #NOTE: NumPy only vectorizes the Kalman filter across columns, so a
+        #      single series is filtered by the gain engine instead
+        _data["backend"] = "python"
+        if _data["engine"] is None:
+            _data["engine"] = "gain"
+
+    if _data["backend"] == "numpy":
+        from . import vectorized
+        if not vectorized.available():
+            internals._print_missing_backend(_data["backend"])
+            _data["backend"] = "python"
+        elif _data["stream"] or _data["timestamps"] or _data["smooth"]:
+            _data["backend"] = "python"
+    elif _data["backend"] != "python":
+        internals._print_invalid_backend(_data["backend"])
+        sys.exit(1)
+
+    for _format in (_data["input_format"], _data["output_format"]):
+        if _format not in formats.FORMATS:
+            internals._print_invalid_format(_format)
+            sys.exit(1)
+
+    if _data["precision"] not in (None, "repr"):
+        if not _data["precision"].isdigit():
+            internals._print_invalid_precision(_data["precision"])
+            sys.exit(1)
+
+    if _data["metrics"] is not None:
+        _interval = internals._try_get_float(
+            _config, "metrics-interval", default=10000.0,
+        )
+        _collector = metrics.enable(
+            _data["metrics"], _interval / 1000, _method,
+        )
+        if not _collector.write():
+            internals._print_invalid_file(_data["metrics"])
+            sys.exit(1)
+        #NOTE: metrics are written one last time on any exit
+        atexit.register(_collector.write)
+
     _files = _config.get("file", [])
     _files.extend(_positionals)
-    _data["data_raw"] = internals._get_raw_data(_files)
-    implementation.cli_wrapper(**_data)
+    if _data["per_file"] and (
+        _data["load_state"] is not None or _data["save_state"] is not None
+    ):
+        #NOTE: files are separate series, but would share one state file
+        internals._print_per_file_state()
+        sys.exit(1)
+    if _data["per_file"]:
+        #NOTE: each file is a whole series, so is never streamed
+        _data["stream"] = False
+        from . import parallel
+        _status = parallel.filter_files(
+            implementation.__name__,
+            _files,
+            _data,
+            _data["jobs"],
+            _config.get("output-suffix", None),
+        )
+        sys.exit(_status)
+
+    with metrics.timing():
+        _data["data_raw"] = internals._get_data_raw(_files, _data)
+        implementation.cli_wrapper(**_data)
 
     sys.exit(0)
 
@@ -9,16 +9,95 @@ Options:
   -d N, --delta N  initial velocity of state per time unit [Default: 0]
   -i M N,          initial state; M is the estimate and N is the std. deviation
     --initial M N    [Note: std. deviation unused] [Default: 0 0]
+  --backend NAME   filter by NAME, where NAME is one of 'python' or 'numpy'
+                     [Default: python]
+  --engine ENGINE  compute estimates by ENGINE, where ENGINE is one of
+                     'direct' or 'iir' [Default: direct]
+  --input-format FORMAT
+                   read data as FORMAT, where FORMAT is one of 'text',
+                     'f64le', 'f32le', or 'npy' [Default: text]
+  --output-format FORMAT
+                   write estimates as FORMAT [Default: text]
+  --precision N    write estimates with N decimal places, or as the
+                     shortest exact representation if N is 'repr'
+                     [Default: 4]
+  --multi-column   filter each column of input as a separate series
+  --delimiter D    with --multi-column, columns are separated by D
+                     [Default: whitespace]
+  --per-file       filter each file as a separate series, in parallel
+  -j N, --jobs N   with --per-file, filter N files at once
+                     [Default: number of CPUs]
+  --output-suffix S
+                   with --per-file, write estimates of each file to a
+                     file of the same name with suffix S, rather than
+                     to stdout
+  --metrics FILE   write runtime metrics to FILE in the Prometheus text
+                     format
+  --metrics-interval T
+                   with --metrics, rewrite FILE every T milliseconds
+                     [Default: 10000]
+  --stream         filter each measurement as soon as it is read
+  --flush N        in stream mode, flush output every N estimates
+                     [Default: 1]
+  --flush-interval T
+                   in stream mode, flush output every T milliseconds
+  --timestamps     read each line as the time of a measurement and the
+                     measurement, and predict by the time elapsed since the
+                     last; estimates are written after their time
+  --interval T     with --timestamps, predict an estimate every T time
+                     units after the last, until a measurement arrives
+                     within T/2 of the next prediction
+  --load-state FILE
+                   continue filtering from the state saved in FILE, in
+                     place of the initial state
+  --save-state FILE
+                   save the state after the last measurement to FILE
 
 Currently assumed that acceleration is 0 and the time unit is 1.
+
+The 'iir' engine evaluates the filter as the equivalent second-order IIR
+filter, one block of input at a time, so that memory use is constant.
+
+With --timestamps, the initial state is one interval, or without
+--interval one time unit, before the first measurement. Input of a binary
+format holds times and measurements as consecutive values. Timestamps
+cannot be used with --multi-column or state.
+
+With --interval T, estimates are predicted at T, 2T, and so on after the last
+measurement, for as long as the next measurement is more than T/2 after the
+prediction; it is otherwise taken as on time, despite jitter. For example,
+after a measurement at 5.5 and with T=1, a measurement at 9 is preceded by
+predictions at 6.5 and 7.5, but not 8.5.
+
+The state of the filter is the estimate and velocity after the last
+measurement. Filtering new measurements from a saved state gives the same
+estimates as filtering them after all earlier measurements. With either
+--load-state or --save-state, the 'direct' engine and 'python' backend are
+used.
 """
 
-__all__ = ['cli_wrapper', 'filter', 'report']
+from __future__ import annotations
+
+__all__ = [
+    'AlphaBetaFilter', 'cli_wrapper', 'filter', 'filter_iir', 'filter_timed',
+    'report',
+]
 
 import sys
-from typing import Callable, List, Dict, Iterator
+import array
+import itertools
+import functools
+from collections.abc import Sequence
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import (
+        Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple,
+    )
 
-def cli_wrapper(**data: Dict):
+from . import internals
+
+def cli_wrapper(**data: Any):
     """Handler for the alpha-beta filter. Checks and cleans given options,
     and performs optional reporting.
     """
@@ -31,15 +110,142 @@ def cli_wrapper(**data: Dict):
     _time = 1.0 #constant time unit
     _acceleration = lambda x: x #constant acceleration
 
-    _filter = filter(
-        _raw,
-        _alpha,
-        _beta,
-        _init_state,
-        _init_velocity,
-        _acceleration,
-        _time,
+    _engine = data["engine"] if data["engine"] is not None else "direct"
+    if _engine not in ("direct", "iir"):
+        internals._print_invalid_engine(_engine)
+        sys.exit(1)
+
+    if data["timestamps"]:
+        _timed = filter_timed(
+            internals._timed_measurements(_raw, data["input_format"]),
+            _alpha,
+            _beta,
+            _init_state,
+            _init_velocity,
+            data["interval"],
+        )
+        if data["report"]:
+            sys.stdout.write(
+                report_header(
+                    _alpha,
+                    _beta,
+                    _init_state,
+                    _init_velocity,
+                    _acceleration,
+                    _time,
+                    timed=True,
+                )
+            )
+            internals._write_timed_report(_timed)
+        else:
+            internals._write_rows(
+                ((data_time, estimated) for data_time, _, estimated in _timed),
+                data["delimiter"],
+                data["output_format"],
+                data["stream"],
+                data["precision"],
+            )
+        return
+
+    _states = None
+    if data["load_state"] is not None:
+        _states = internals._load_state(data["load_state"], "ab")
+        if _states is None:
+            sys.exit(1)
+    _filters: List[AlphaBetaFilter] = list()
+    _stateful = (
+        data["load_state"] is not None or data["save_state"] is not None
     )
+    if _stateful:
+        #NOTE: state is carried by the direct engine in Python only
+        _engine = "direct"
+
+    if _engine == "iir" and data["stream"]:
+        _raw = ([data_point] for data_point in _raw)
+    if _engine == "iir" and data["columns"] and data["backend"] != "numpy":
+        #NOTE: columns are filtered lazily, so memory use is still constant
+        _raw = itertools.chain.from_iterable(_raw)
+        _engine = "direct"
+
+    if _stateful:
+        _measured = _raw
+        if data["report"] and not isinstance(_raw, Sequence):
+            _raw, _measured = itertools.tee(_raw)
+        try:
+            _filter: Iterable[Any] = internals._filter_stateful(
+                _raw,
+                functools.partial(
+                    AlphaBetaFilter,
+                    _alpha,
+                    _beta,
+                    _init_state,
+                    _init_velocity,
+                    _time,
+                ),
+                _states,
+                data["columns"],
+                data["stream"],
+                _filters,
+            )
+        except ValueError as err:
+            internals._print_invalid_state(data["load_state"], str(err))
+            sys.exit(1)
+    elif _engine == "iir":
+        _blocks, _estimated_blocks = itertools.tee(
+            filter_iir(
+                _raw,
+                _alpha,
+                _beta,
+                _init_state,
+                _init_velocity,
+                _time,
+                vectorize=(data["backend"] == "numpy"),
+            )
+        )
+        _measured = itertools.chain.from_iterable(
+            block for block, _ in _blocks
+        )
+        _filter = itertools.chain.from_iterable(
+            estimated for _, estimated in _estimated_blocks
+        )
+    else:
+        _measured = _raw
+        if data["report"] and not isinstance(_raw, Sequence):
+            _raw, _measured = itertools.tee(_raw)
+
+        if data["backend"] == "numpy":
+            from . import vectorized
+            _filter = vectorized.ab_filter(
+                _raw,
+                _alpha,
+                _beta,
+                _init_state,
+                _init_velocity,
+                _time,
+            )
+        elif data["columns"]:
+            _filter = internals._filter_columns(
+                _raw,
+                functools.partial(
+                    filter,
+                    alpha=_alpha,
+                    beta=_beta,
+                    init_state=_init_state,
+                    init_velocity=_init_velocity,
+                    acceleration=_acceleration,
+                    time=_time,
+                ),
+            )
+        else:
+            _filter = filter(
+                _raw,
+                _alpha,
+                _beta,
+                _init_state,
+                _init_velocity,
+                _acceleration,
+                _time,
+            )
 
     if data["report"]:
         sys.stdout.write(
@@ -52,11 +258,34 @@ def cli_wrapper(**data: Dict):
                 _time,
             )
         )
-        for measured, estimated in zip(_raw, _filter):
-            sys.stdout.write("{0:8.4f}  {1:8.4f}\n".format(measured, estimated))
+        if data["columns"]:
+            internals._write_report_rows(zip(_measured, _filter))
+        else:
+            for measured, estimated in zip(_measured, _filter):
+                sys.stdout.write(
+                    "{0:8.4f}  {1:8.4f}\n".format(measured, estimated),
+                )
+    elif data["columns"]:
+        internals._write_rows(
+            _filter,
+            data["delimiter"],
+            data["output_format"],
+            data["stream"],
+            data["precision"],
+        )
     else:
-        for estimated in _filter:
-            sys.stdout.write("{0:.4f}\n".format(estimated))
+        internals._write_values(
+            _filter,
+            data["output_format"],
+            data["stream"],
+            data["precision"],
+        )
+
+    if data["save_state"] is not None and not internals._save_state(
+        data["save_state"], "ab", _filters, _states,
+    ):
+        internals._print_invalid_file(data["save_state"])
+        sys.exit(1)
 
 def filter(
     data: List[float],
@@ -95,6 +324,206 @@ def filter(
 
         yield estimated
 
+def filter_timed(
+    data: Iterable[Tuple[float, float]],
+    alpha: float,
+    beta: float,
+    init_state: float,
+    init_velocity: float,
+    interval: Optional[float] = None,
+) -> Iterator[Tuple[float, Optional[float], float]]:
+    """Iterate over timestamped data, passing it through an alpha-beta filter
+    that predicts by the time elapsed since the last measurement. Yields the
+    time, the measurement, and the estimate.
+
+    Given an interval, an estimate is also predicted at every interval
+    without a measurement, and yielded with no measurement.
+
+    Arguments:
+      data           pairs of time and measurement, in increasing time
+      alpha          correction to estimated state
+      beta           correction to estimated velocity
+      init_state     initial estimate of state, one interval or one time
+                       unit before the first measurement
+      init_velocity  initial estimate of velocity
+      interval       expected time between measurements
+    """
+    last_estimated = init_state
+    last_velocity = init_velocity
+    last_time: Optional[float] = None
+    for data_time, data_point in data:
+        if last_time is None:
+            elapsed = interval if interval is not None else 1.0
+        else:
+            for predicted_time in internals._missing_times(
+                last_time, data_time, interval,
+            ):
+                last_estimated += (
+                    (predicted_time - last_time) * last_velocity
+                )
+                last_time = predicted_time
+                yield predicted_time, None, last_estimated
+            elapsed = data_time - last_time
+
+        #estimate given last values
+        estimated = last_estimated + (elapsed * last_velocity)
+
+        #correct for residual
+        residual = (data_point - estimated)
+        estimated += (alpha * residual)
+        last_velocity += ( (beta * residual) / elapsed )
+
+        last_estimated = estimated
+        last_time = data_time
+        yield data_time, data_point, estimated
+
+class AlphaBetaFilter:
+    """Alpha-beta filter of one series, updated a measurement at a time.
+    Estimates are those of `filter` with constant velocity.
+
+    Arguments:
+      alpha          correction to estimated state
+      beta           correction to estimated velocity
+      init_state     initial estimate of state
+      init_velocity  initial estimate of velocity
+      time           time unit
+    """
+
+    __slots__ = ('alpha', 'beta', 'time', 'estimate', 'velocity')
+
+    def __init__(
+        self,
+        alpha: float = 0.05,
+        beta: float = 0.005,
+        init_state: float = 0.0,
+        init_velocity: float = 0.0,
+        time: float = 1.0,
+    ) -> None:
+        self.alpha = alpha
+        self.beta = beta
+        self.time = time
+        self.estimate = init_state
+        self.velocity = init_velocity
+
+    def update(
+        self,
+        measured: float,
+    ) -> float:
+        """Correct the state by one measurement. Returns the estimate."""
+        estimated = self.estimate + (self.time * self.velocity)
+        residual = (measured - estimated)
+        self.estimate = estimated + (self.alpha * residual)
+        self.velocity += ( (self.beta * residual) / self.time )
+        return self.estimate
+
+    def update_batch(
+        self,
+        buffer: Any,
+    ) -> array.array:
+        """Correct the state by each measurement of a buffer in turn.
+        Returns the estimates.
+        """
+        estimates = internals._buffer_array(buffer)
+        alpha, beta, time = self.alpha, self.beta, self.time
+        last_estimated, last_velocity = self.estimate, self.velocity
+        for index, data_point in enumerate(estimates):
+            estimated = last_estimated + (time * last_velocity)
+            residual = (data_point - estimated)
+            last_estimated = estimated + (alpha * residual)
+            last_velocity += ( (beta * residual) / time )
+            estimates[index] = last_estimated
+        self.estimate, self.velocity = last_estimated, last_velocity
+        return estimates
+
+    def get_state(self) -> Dict[str, Any]:
+        """Draw the state after the latest measurement, such that filtering
+        can continue from it by `set_state`.
+        """
+        return {"estimate": self.estimate, "velocity": self.velocity}
+
+    def set_state(
+        self,
+        state: Dict[str, Any],
+    ) -> None:
+        self.estimate = float(state["estimate"])
+        self.velocity = float(state["velocity"])
+
+def filter_iir(
+    blocks: Iterable[List[float]],
+    alpha: float,
+    beta: float,
+    init_state: float,
+    init_velocity: float,
+    time: float,
+    vectorize: bool = False,
+) -> Iterator[Tuple[List[float], List[float]]]:
+    """Iterate over blocks of data, passing each through an alpha-beta filter
+    and yielding the block alongside its estimates. State is carried from one
+    block to the next.
+
+    With constant velocity, the filter is linear and time-invariant. The
+    estimates follow the difference equation:
+      x[k] = (2-α-β) x[k-1] - (1-α) x[k-2] + α z[k] + (β-α) z[k-1]
+
+    Arguments:
+      blocks         measurements from consecutive time intervals
+      alpha          correction to estimated state
+      beta           correction to estimated velocity
+      init_state     initial estimate of state
+      init_velocity  initial estimate of velocity
+      time           time unit
+      vectorize      evaluate each block with NumPy
+    """
+    if vectorize:
+        from . import vectorized
+        state, velocity = init_state, init_velocity
+        for block in blocks:
+            estimated, (state, velocity) = vectorized.ab_filter(
+                block, alpha, beta, state, velocity, time, final_state=True,
+            )
+            yield block, estimated.tolist()
+        return
+
+    a1 = 2.0 - alpha - beta
+    a2 = 1.0 - alpha
+    b0 = alpha
+    b1 = beta - alpha
+
+    #the first estimate is the only one to depend on initial velocity
+    blocks = iter(blocks)
+    for block in blocks:
+        if len(block) == 0:
+            continue
+        last_measured = block[0]
+        last_estimated = init_state + (time * init_velocity)
+        last_estimated += alpha * (last_measured - last_estimated)
+        prior_estimated = init_state
+        estimated = [last_estimated]
+        for measured in block[1:]:
+            _estimated = (
+                (a1 * last_estimated) - (a2 * prior_estimated)
+                + (b0 * measured) + (b1 * last_measured)
+            )
+            estimated.append(_estimated)
+            prior_estimated = last_estimated
+            last_estimated = _estimated
+            last_measured = measured
+        yield block, estimated
+        break
+
+    for block in blocks:
+        estimated = list()
+        for measured in block:
+            _estimated = (
+                (a1 * last_estimated) - (a2 * prior_estimated)
+                + (b0 * measured) + (b1 * last_measured)
+            )
+            estimated.append(_estimated)
+            prior_estimated = last_estimated
+            last_estimated = _estimated
+            last_measured = measured
+        yield block, estimated
+
 def report_header(
     alpha: float,
     beta: float,
@@ -102,6 +531,7 @@ def report_header(
     init_velocity: float,
     acceleration: Callable[[float], float],
     time: float,
+    timed: bool = False,
 ) -> str:
     """Draw a report header summarizing the filter.
 
@@ -113,7 +543,8 @@ def report_header(
     Raw:      Est.:
     ========  ========
     ```
-    The estimates then should be printed alongside the raw measurements.
+    The estimates then should be printed alongside the raw measurements, and
+    if `timed` is set, after the time of each.
     """
     _msg = (
         "Alpha-beta filter",
@@ -121,8 +552,8 @@ def report_header(
         "  Initial estimate: {0:.4f} changing {1:.4f} per time unit".format(
             init_state, init_velocity,
         ),
-        "Raw:      Est.:",
-        "========  ========",
+        ("Time:     " if timed else "") + "Raw:      Est.:",
+        ("========  " if timed else "") + "========  ========",
     )
     return "\n".join(_msg) + "\n"
 
@@ -0,0 +1,461 @@
+#!/usr/bin/env python3
+
+"""Kalman filters of many tracks at once, each with a position and velocity.
+
+Each track follows s[k] = F s[k-1] + w, where s is the position and velocity,
+F = [[1, T], [0, 1]] for a time unit T, and w is the effect of random
+acceleration with variance `process_noise`:
+  Q = process_noise * [[T⁴/4, T³/2], [T³/2, T²]]
+Measurements are of position alone, with variance `variance`.
+
+The position, velocity, and the covariances p00, p01, and p11 of every track
+are held in one contiguous array each. All tracks measured at one time are
+updated together: by one vectorized operation with NumPy, or by a loop over
+the arrays otherwise.
+
+Input is either rows with one column per track, updating every track at each
+row, or rows of a key and a measurement, updating the track of that key.
+
+A single track can also be smoothed, by a Rauch-Tung-Striebel pass backward
+over the position, velocity, and covariances of the forward pass, which are
+held for every measurement; or by a fixed-lag smoother, which holds only
+those of the latest measurements.
+"""
+
+from __future__ import annotations
+
+__all__ = [
+    'KalmanBank', 'filter_columns', 'filter_keyed', 'filter_track', 'smooth',
+    'smooth_lagged',
+]
+
+import array
+import collections
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import (
+        Any, Deque, Dict, Iterable, Iterator, List, Optional, Sequence,
+        Tuple,
+    )
+
+    #position, velocity, and covariances p00, p01, and p11 of a track
+    State = Tuple[float, float, float, float, float]
+
+class KalmanBank:
+    """Bank of Kalman filters with full covariance of position and velocity.
+    Tracks are indexed from 0 in the order they are added.
+
+    Arguments:
+      tracks               count of tracks to start with
+      variance             variance of measurements; must be positive
+      process_noise        variance of acceleration per time unit
+      init_state_mu        initial estimate of position
+      init_state_sigma     std. deviation of position
+      init_velocity_mu     initial estimate of velocity
+      init_velocity_sigma  std. deviation of velocity
+      time                 time unit
+      vectorize            hold state in NumPy arrays, and update by
+                             vectorized operations
+    """
+
+    __slots__ = (
+        'variance', 'noise', 'time', 'initial', 'state', 'tracks',
+        'vectorize',
+    )
+
+    def __init__(
+        self,
+        tracks: int = 0,
+        variance: float = 1.0,
+        process_noise: float = 0.0,
+        init_state_mu: float = 0.0,
+        init_state_sigma: float = 1.0,
+        init_velocity_mu: float = 0.0,
+        init_velocity_sigma: float = 0.0,
+        time: float = 1.0,
+        vectorize: bool = False,
+    ) -> None:
+        if not variance > 0:
+            raise ValueError("variance of measurements must be positive")
+        self.variance = variance
+        self.noise = _noise(process_noise, time)
+        self.time = time
+        self.initial = (
+            init_state_mu,
+            init_velocity_mu,
+            init_state_sigma**2,
+            0.0,
+            init_velocity_sigma**2,
+        )
+        self.vectorize = vectorize
+        self.tracks = 0
+        self.state: Any = None
+        self.add_tracks(tracks)
+
+    def add_tracks(
+        self,
+        count: int,
+    ) -> None:
+        """Add tracks in the initial state."""
+        self.tracks += count
+        if self.vectorize:
+            from . import vectorized
+            self.state = vectorized.bank_state(
+                self.initial, self.tracks, self.state,
+            )
+        elif self.state is None:
+            self.state = [
+                array.array("d", [value]) * count for value in self.initial
+            ]
+        else:
+            for quantity, value in zip(self.state, self.initial):
+                quantity.extend(array.array("d", [value]) * count)
+
+    def update(
+        self,
+        measured: Sequence[float],
+        tracks: Optional[Sequence[int]] = None,
+    ) -> Tuple[Any, Any]:
+        """Predict and correct tracks by one measurement each: every track in
+        order, or those indexed by `tracks`, each at most once. Returns arrays
+        of the estimates of position and their variances.
+        """
+        if self.vectorize:
+            from . import vectorized
+            return vectorized.bank_update(
+                self.state,
+                measured,
+                tracks,
+                self.variance,
+                self.noise,
+                self.time,
+            )
+
+        position, velocity, p00, p01, p11 = self.state
+        q00, q01, q11 = self.noise
+        time, variance = self.time, self.variance
+        estimates = array.array("d")
+        variances = array.array("d")
+        if tracks is None:
+            tracks = range(self.tracks)
+        for index, data_point in zip(tracks, measured):
+            #predict
+            estimated = position[index] + (time * velocity[index])
+            _p11 = p11[index] + q11
+            _p01 = p01[index] + ((time * p11[index]) + q01)
+            _p00 = p00[index] + (
+                (time * ((2.0 * p01[index]) + (time * p11[index]))) + q00
+            )
+
+            #correct by the residual
+            gain0 = _p00 / (_p00 + variance)
+            gain1 = _p01 / (_p00 + variance)
+            residual = data_point - estimated
+            position[index] = estimated + (gain0 * residual)
+            velocity[index] += gain1 * residual
+            p11[index] = _p11 - (gain1 * _p01)
+            p01[index] = _p01 * (1.0 - gain0)
+            p00[index] = _p00 * (1.0 - gain0)
+
+            estimates.append(position[index])
+            variances.append(p00[index])
+        return estimates, variances
+
+def filter_columns(
+    blocks: Iterable[Sequence[Sequence[float]]],
+    bank: KalmanBank,
+) -> Iterator[Tuple[List[float], float]]:
+    """Iterate over blocks of rows, where each column is a track, updating
+    every track by each row. Yields the estimates of each row alongside the
+    variance of the first track.
+    """
+    if bank.vectorize:
+        from . import vectorized
+    for block in blocks:
+        if len(block) == 0:
+            continue
+        if bank.tracks == 0:
+            bank.add_tracks(len(block[0]))
+        rows: Iterable[Sequence[float]] = block
+        if bank.vectorize:
+            #NOTE: converted once per block, rather than once per row
+            rows = vectorized.numpy.asarray(block, dtype=float)
+        for row in rows:
+            estimated, variances = bank.update(row)
+            yield estimated.tolist(), float(variances[0])
+
+def filter_keyed(
+    blocks: Iterable[Sequence[Tuple[Any, float]]],
+    bank: KalmanBank,
+) -> Iterator[Tuple[Any, float, float, float]]:
+    """Iterate over blocks of rows of a key and a measurement, updating the
+    track of each key, which is added the first time the key is seen. Yields
+    the key, the measurement, the estimate, and its variance, in the order of
+    rows.
+
+    Within a block, the first measurement of each key is applied by one
+    update of the bank, then the second of each key, and so on.
+    """
+    keys: Dict[Any, int] = dict()
+    for block in blocks:
+        tracks = [keys.setdefault(key, len(keys)) for key, _ in block]
+        if len(keys) > bank.tracks:
+            bank.add_tracks(len(keys) - bank.tracks)
+
+        #rounds[r] holds the rows of the (r+1)th measurement of each track
+        rounds: List[List[int]] = list()
+        seen: Dict[int, int] = dict()
+        for row, track in enumerate(tracks):
+            count = seen.get(track, 0)
+            seen[track] = count + 1
+            if count == len(rounds):
+                rounds.append(list())
+            rounds[count].append(row)
+
+        estimates = [0.0] * len(block)
+        variances = [0.0] * len(block)
+        for rows in rounds:
+            _estimates, _variances = bank.update(
+                [block[row][1] for row in rows],
+                [tracks[row] for row in rows],
+            )
+            for row, estimated, variance in zip(
+                rows, _estimates.tolist(), _variances.tolist(),
+            ):
+                estimates[row] = estimated
+                variances[row] = variance
+        for (key, measured), estimated, variance in zip(
+            block, estimates, variances,
+        ):
+            yield key, measured, estimated, variance
+
+def filter_track(
+    data: Iterable[float],
+    variance: float,
+    process_noise: float,
+    init_state_mu: float,
+    init_state_sigma: float,
+    init_velocity_mu: float,
+    init_velocity_sigma: float,
+    time: float,
+) -> Iterator[State]:
+    """Iterate over data, passing it through a Kalman filter of one track,
+    by the same arithmetic as `KalmanBank.update` without NumPy. Yields the
+    position, velocity, and covariances p00, p01, and p11 after each
+    measurement.
+
+    Arguments:
+      data                 measurement from each time interval
+      variance             variance of measurements; must be positive
+      process_noise        variance of acceleration per time unit
+      init_state_mu        initial estimate of position
+      init_state_sigma     std. deviation of position
+      init_velocity_mu     initial estimate of velocity
+      init_velocity_sigma  std. deviation of velocity
+      time                 time unit
+    """
+    q00, q01, q11 = _noise(process_noise, time)
+    position, velocity = init_state_mu, init_velocity_mu
+    p00, p01, p11 = init_state_sigma**2, 0.0, init_velocity_sigma**2
+    for measurement in data:
+        #predict
+        estimated = position + (time * velocity)
+        _p11 = p11 + q11
+        _p01 = p01 + ((time * p11) + q01)
+        _p00 = p00 + ((time * ((2.0 * p01) + (time * p11))) + q00)
+
+        #correct by the residual
+        gain0 = _p00 / (_p00 + variance)
+        gain1 = _p01 / (_p00 + variance)
+        residual = measurement - estimated
+        position = estimated + (gain0 * residual)
+        velocity += gain1 * residual
+        p11 = _p11 - (gain1 * _p01)
+        p01 = _p01 * (1.0 - gain0)
+        p00 = _p00 * (1.0 - gain0)
+
+        yield position, velocity, p00, p01, p11
+
+def smooth(
+    data: Iterable[float],
+    variance: float,
+    process_noise: float,
+    init_state_mu: float,
+    init_state_sigma: float,
+    init_velocity_mu: float,
+    init_velocity_sigma: float,
+    time: float,
+) -> Iterator[Tuple[float,float]]:
+    """Iterate over data, passing it through a Rauch-Tung-Striebel smoother
+    of one track: the forward pass of `filter_track`, then a backward pass
+    that corrects the position and velocity of each step by all later
+    measurements. Yields the smoothed positions and their variances.
+
+    The state of every step of the forward pass is held, in five arrays, and
+    smoothed in place.
+
+    Arguments:
+      data                 measurement from each time interval
+      variance             variance of measurements; must be positive
+      process_noise        variance of acceleration per time unit
+      init_state_mu        initial estimate of position
+      init_state_sigma     std. deviation of position
+      init_velocity_mu     initial estimate of velocity
+      init_velocity_sigma  std. deviation of velocity
+      time                 time unit
+    """
+    noise = _noise(process_noise, time)
+    states = [array.array("d") for _ in range(5)]
+    for state in filter_track(
+        data,
+        variance,
+        process_noise,
+        init_state_mu,
+        init_state_sigma,
+        init_velocity_mu,
+        init_velocity_sigma,
+        time,
+    ):
+        for quantity, value in zip(states, state):
+            quantity.append(value)
+    if len(states[0]) == 0:
+        return
+
+    position, velocity, p00, p01, p11 = states
+    smoothed = (position[-1], velocity[-1], p00[-1], p01[-1], p11[-1])
+    for index in range(len(position) - 2, -1, -1):
+        smoothed = _smooth_step(
+            (
+                position[index], velocity[index],
+                p00[index], p01[index], p11[index],
+            ),
+            smoothed,
+            noise,
+            time,
+        )
+        position[index], velocity[index] = smoothed[0], smoothed[1]
+        p00[index], p01[index], p11[index] = smoothed[2:]
+    yield from zip(position, p00)
+
+def smooth_lagged(
+    data: Iterable[float],
+    variance: float,
+    process_noise: float,
+    init_state_mu: float,
+    init_state_sigma: float,
+    init_velocity_mu: float,
+    init_velocity_sigma: float,
+    time: float,
+    lag: int,
+) -> Iterator[Tuple[float,float]]:
+    """Iterate over data, passing it through a fixed-lag smoother of one
+    track: each state of `filter_track` is corrected by up to `lag` later
+    measurements, and its position and variance are yielded as soon as those
+    are read. The last states are corrected by the measurements that remain.
+
+    Arguments:
+      data                 measurement from each time interval
+      variance             variance of measurements; must be positive
+      process_noise        variance of acceleration per time unit
+      init_state_mu        initial estimate of position
+      init_state_sigma     std. deviation of position
+      init_velocity_mu     initial estimate of velocity
+      init_velocity_sigma  std. deviation of velocity
+      time                 time unit
+      lag                  count of later measurements to smooth by
+    """
+    noise = _noise(process_noise, time)
+    window: Deque[State] = collections.deque(maxlen=lag + 1)
+
+    def smoothed() -> List[Tuple[float, float]]:
+        _window = reversed(window)
+        _smoothed = [next(_window)]
+        for filtered in _window:
+            _smoothed.append(
+                _smooth_step(filtered, _smoothed[-1], noise, time),
+            )
+        _smoothed.reverse()
+        return [(state[0], state[2]) for state in _smoothed]
+
+    for filtered in filter_track(
+        data,
+        variance,
+        process_noise,
+        init_state_mu,
+        init_state_sigma,
+        init_velocity_mu,
+        init_velocity_sigma,
+        time,
+    ):
+        window.append(filtered)
+        if len(window) > lag:
+            yield smoothed()[0]
+    if len(window) > lag:
+        #NOTE: the oldest state was yielded with the last measurement
+        yield from smoothed()[1:]
+    elif len(window) > 0:
+        yield from smoothed()
+
+def _noise(
+    process_noise: float,
+    time: float,
+) -> Tuple[float, float, float]:
+    """Covariances q00, q01, and q11 of the effect of random acceleration
+    over one time unit.
+    """
+    return (
+        process_noise * time**4 / 4,
+        process_noise * time**3 / 2,
+        process_noise * time**2,
+    )
+
+def _smooth_step(
+    filtered: State,
+    smoothed: State,
+    noise: Tuple[float, float, float],
+    time: float,
+) -> State:
+    """Smooth a filtered state by the smoothed state of the next step.
+
+    The gain is C = P Fᵀ M, where M inverts the covariance of the prediction
+    of the next step. Where that covariance is singular, as when velocity has
+    no variance, M is its pseudo-inverse, which for a covariance of rank 1 is
+    the covariance divided by the square of its trace; components predicted
+    exactly are then kept as filtered.
+    """
+    position, velocity, p00, p01, p11 = filtered
+    q00, q01, q11 = noise
+
+    #predict the next step, as in `filter_track`
+    a = p00 + ((time * ((2.0 * p01) + (time * p11))) + q00)
+    b = p01 + ((time * p11) + q01)
+    d = p11 + q11
+    determinant = (a * d) - (b * b)
+    if determinant > 0:
+        m00, m01, m11 = d / determinant, -b / determinant, a / determinant
+    elif a + d > 0:
+        scale = 1.0 / ((a + d) * (a + d))
+        m00, m01, m11 = a * scale, b * scale, d * scale
+    else:
+        m00, m01, m11 = 0.0, 0.0, 0.0
+
+    #gain C = P Fᵀ M
+    f00, f10 = p00 + (time * p01), p01 + (time * p11)
+    c00 = (f00 * m00) + (p01 * m01)
+    c01 = (f00 * m01) + (p01 * m11)
+    c10 = (f10 * m00) + (p11 * m01)
+    c11 = (f10 * m01) + (p11 * m11)
+
+    r0 = smoothed[0] - (position + (time * velocity))
+    r1 = smoothed[1] - velocity
+    d00, d01, d11 = smoothed[2] - a, smoothed[3] - b, smoothed[4] - d
+    e00, e01 = (c00 * d00) + (c01 * d01), (c00 * d01) + (c01 * d11)
+    e10, e11 = (c10 * d00) + (c11 * d01), (c10 * d01) + (c11 * d11)
+    return (
+        position + (c00 * r0) + (c01 * r1),
+        velocity + (c10 * r0) + (c11 * r1),
+        p00 + (e00 * c00) + (e01 * c01),
+        p01 + (e00 * c10) + (e01 * c11),
+        p11 + (e10 * c10) + (e11 * c11),
+    )
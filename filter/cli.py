@@ -1,13 +1,63 @@
 #!/usr/bin/env python3
 
-import re
+OPTIONS={
+	"--alpha":("alpha",1),
+	"-a":("alpha",1),
+	"--auto-sigma":("auto-sigma",0),
+	"--auto-variance":("auto-variance",0),
+	"--backend":("backend",1),
+	"--beta":("beta",1),
+	"-b":("beta",1),
+	"--boundary":("boundary",1),
+	"--delimiter":("delimiter",1),
+	"--delta":("delta",1),
+	"-d":("delta",1),
+	"--delta-sigma":("delta-sigma",1),
+	"--engine":("engine",1),
+	"--file":("file",(1, 9)),
+	"-f":("file",(1, 9)),
+	"--flush":("flush",1),
+	"--flush-interval":("flush-interval",1),
+	"--help":("help",0),
+	"-h":("help",0),
+	"-x":("help",0),
+	"--initial":("initial",(1, 2)),
+	"-i":("initial",(1, 2)),
+	"--input-format":("input-format",1),
+	"--interval":("interval",1),
+	"--jobs":("jobs",1),
+	"-j":("jobs",1),
+	"--kernel":("kernel",(1, None)),
+	"-k":("kernel",(1, None)),
+	"--keyed":("keyed",0),
+	"--lag":("lag",1),
+	"--list-methodologies":("list-methodologies",0),
+	"--load-state":("load-state",1),
+	"--methodology":("methodology",1),
+	"--metrics":("metrics",1),
+	"--metrics-interval":("metrics-interval",1),
+	"--multi-column":("multi-column",0),
+	"--output-format":("output-format",1),
+	"--output-suffix":("output-suffix",1),
+	"--per-file":("per-file",0),
+	"--precision":("precision",1),
+	"--process-noise":("process-noise",1),
+	"--report":("report",0),
+	"-r":("report",0),
+	"--save-state":("save-state",1),
+	"--smooth":("smooth",0),
+	"--stream":("stream",0),
+	"--timestamps":("timestamps",0),
+	"--variance":("variance",1),
+	"-v":("variance",1),
+	"--version":("version",0),
+	"-V":("version",0),
+}
 
 def main(arguments):
 	config=dict()
 	positional=[]
-	pattern=re.compile(r"(?:-(?:a|b|d|f|h|x|i|k|r|v|V)|--(?:alpha|beta|delta|file|help|initial|kernel|list-methodologies|methodology|report|variance|version))(?:=.*)?$")
 	consuming,needing,wanting=None,0,0
-	attached_value=None
 	while len(arguments) and arguments[0]!="--":
 		if consuming is not None:
 			if config[consuming] is None:
@@ -15,197 +65,39 @@ def main(arguments):
 			else:
 				config[consuming].append(arguments.pop(0))
 			needing-=1
-			wanting-=1
+			if wanting is not None:
+				wanting-=1
 			if wanting==0:
 				consuming,needing,wanting=None,0,0
-		elif pattern.match(arguments[0]):
-			option = arguments.pop(0).lstrip('-')
-			if '=' in option:
-				option,attached_value=option.split('=',1)
-			if option=="alpha":
-				if attached_value is not None:
-					config["alpha"]=attached_value
-					attached_value=None
-					consuming,needing,wanting=None,0,0
-				else:
-					config["alpha"]=None
-					consuming,needing,wanting="alpha",1,1
-			elif option=="beta":
-				if attached_value is not None:
-					config["beta"]=attached_value
-					attached_value=None
-					consuming,needing,wanting=None,0,0
-				else:
-					config["beta"]=None
-					consuming,needing,wanting="beta",1,1
-			elif option=="delta":
-				if attached_value is not None:
-					config["delta"]=attached_value
-					attached_value=None
-					consuming,needing,wanting=None,0,0
-				else:
-					config["delta"]=None
-					consuming,needing,wanting="delta",1,1
-			elif option=="file":
-				if attached_value is not None:
-					config["file"]=[attached_value]
-					consuming,needing,wanting="file",0,8
-					attached_value=None
-				else:
-					config["file"]=[]
-					consuming,needing,wanting="file",1,9
-			elif option=="help":
-				if attached_value is not None:
-					message=(
-						'unexpected value while parsing "help"'
-						' (expected 0 values)'
-					)
-					raise ValueError(message) from None
-				config["help"]=True
-			elif option=="initial":
-				if attached_value is not None:
-					config["initial"]=[attached_value]
-					consuming,needing,wanting="initial",0,1
-					attached_value=None
-				else:
-					config["initial"]=[]
-					consuming,needing,wanting="initial",1,2
-			elif option=="kernel":
-				if attached_value is not None:
-					config["kernel"]=[attached_value]
-					consuming,needing,wanting="kernel",0,8
-					attached_value=None
-				else:
-					config["kernel"]=[]
-					consuming,needing,wanting="kernel",1,9
-			elif option=="list-methodologies":
-				if attached_value is not None:
-					message=(
-						'unexpected value while parsing "list-methodologies"'
-						' (expected 0 values)'
-					)
-					raise ValueError(message) from None
-				config["list-methodologies"]=True
-			elif option=="methodology":
-				if attached_value is not None:
-					config["methodology"]=attached_value
-					attached_value=None
-					consuming,needing,wanting=None,0,0
-				else:
-					config["methodology"]=None
-					consuming,needing,wanting="methodology",1,1
-			elif option=="report":
+		elif arguments[0].split("=",1)[0] in OPTIONS:
+			option,_,attached_value=arguments.pop(0).partition("=")
+			if not _:
+				attached_value=None
+			name,number=OPTIONS[option]
+			if number==0:
 				if attached_value is not None:
 					message=(
-						'unexpected value while parsing "report"'
+						f'unexpected value while parsing "{name}"'
 						' (expected 0 values)'
 					)
 					raise ValueError(message) from None
-				config["report"]=True
-			elif option=="variance":
-				if attached_value is not None:
-					config["variance"]=attached_value
-					attached_value=None
-					consuming,needing,wanting=None,0,0
+				config[name]=True
+			elif number==1:
+				config[name]=attached_value
+				if attached_value is None:
+					consuming,needing,wanting=name,1,1
 				else:
-					config["variance"]=None
-					consuming,needing,wanting="variance",1,1
-			elif option=="version":
-				if attached_value is not None:
-					message=(
-						'unexpected value while parsing "version"'
-						' (expected 0 values)'
-					)
-					raise ValueError(message) from None
-				config["version"]=True
-			elif option=="a":
-				if attached_value is not None:
-					config["alpha"]=attached_value
-					attached_value=None
 					consuming,needing,wanting=None,0,0
-				else:
-					config["alpha"]=None
-					consuming,needing,wanting="alpha",1,1
-			elif option=="b":
-				if attached_value is not None:
-					config["beta"]=attached_value
-					attached_value=None
-					consuming,needing,wanting=None,0,0
-				else:
-					config["beta"]=None
-					consuming,needing,wanting="beta",1,1
-			elif option=="d":
-				if attached_value is not None:
-					config["delta"]=attached_value
-					attached_value=None
-					consuming,needing,wanting=None,0,0
-				else:
-					config["delta"]=None
-					consuming,needing,wanting="delta",1,1
-			elif option=="f":
-				if attached_value is not None:
-					config["file"]=[attached_value]
-					consuming,needing,wanting="file",0,8
-					attached_value=None
-				else:
-					config["file"]=[]
-					consuming,needing,wanting="file",1,9
-			elif option=="h":
-				if attached_value is not None:
-					message=(
-						'unexpected value while parsing "help"'
-						' (expected 0 values)'
-					)
-					raise ValueError(message) from None
-				config["help"]=True
-			elif option=="x":
-				if attached_value is not None:
-					message=(
-						'unexpected value while parsing "help"'
-						' (expected 0 values)'
-					)
-					raise ValueError(message) from None
-				config["help"]=True
-			elif option=="i":
-				if attached_value is not None:
-					config["initial"]=[attached_value]
-					consuming,needing,wanting="initial",0,1
-					attached_value=None
-				else:
-					config["initial"]=[]
-					consuming,needing,wanting="initial",1,2
-			elif option=="k":
-				if attached_value is not None:
-					config["kernel"]=[attached_value]
-					consuming,needing,wanting="kernel",0,8
-					attached_value=None
-				else:
-					config["kernel"]=[]
-					consuming,needing,wanting="kernel",1,9
-			elif option=="r":
-				if attached_value is not None:
-					message=(
-						'unexpected value while parsing "report"'
-						' (expected 0 values)'
-					)
-					raise ValueError(message) from None
-				config["report"]=True
-			elif option=="v":
+			else:
+				minimum,maximum=number
 				if attached_value is not None:
-					config["variance"]=attached_value
-					attached_value=None
-					consuming,needing,wanting=None,0,0
+					config[name]=[attached_value]
+					if maximum is not None:
+						maximum-=1
+					consuming,needing,wanting=name,minimum-1,maximum
 				else:
-					config["variance"]=None
-					consuming,needing,wanting="variance",1,1
-			elif option=="V":
-				if attached_value is not None:
-					message=(
-						'unexpected value while parsing "version"'
-						' (expected 0 values)'
-					)
-					raise ValueError(message) from None
-				config["version"]=True
+					config[name]=[]
+					consuming,needing,wanting=name,minimum,maximum
 		else:
 			positional.append(arguments.pop(0))
 	if needing>0:
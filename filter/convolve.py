@@ -6,15 +6,90 @@ Convolution filter - Filter out noise of measurements to estimate data.
 Options:
   -k KERNEL,         filter data through KERNEL, where KERNEL is one or more
     --kernel KERNEL    numeric factors [Default: 1.0]
+  --engine ENGINE    compute convolution by ENGINE, where ENGINE is one of
+                       'direct' or 'fft' [Default: direct]
+  --backend NAME     filter by NAME, where NAME is one of 'python' or 'numpy'
+                       [Default: python]
+  --boundary MODE    extend data beyond its ends by MODE, where MODE is one of
+                       'circular', 'reflect', 'nearest', 'zero', 'valid', or
+                       'causal' [Default: circular]
+  --input-format FORMAT
+                     read data as FORMAT, where FORMAT is one of 'text',
+                       'f64le', 'f32le', or 'npy' [Default: text]
+  --output-format FORMAT
+                     write estimates as FORMAT [Default: text]
+  --precision N      write estimates with N decimal places, or as the
+                       shortest exact representation if N is 'repr'
+                       [Default: 4]
+  --multi-column     filter each column of input as a separate series
+  --delimiter D      with --multi-column, columns are separated by D
+                       [Default: whitespace]
+  --per-file         filter each file as a separate series, in parallel
+  -j N, --jobs N     filter N chunks of data at once, or with --per-file, N
+                       files at once [Default: 1, or with --per-file, the
+                       number of CPUs]
+  --output-suffix S
+                     with --per-file, write estimates of each file to a
+                       file of the same name with suffix S, rather than
+                       to stdout
+  --metrics FILE     write runtime metrics to FILE in the Prometheus text
+                       format
+  --metrics-interval T
+                     with --metrics, rewrite FILE every T milliseconds
+                       [Default: 10000]
+  --stream           filter each measurement as soon as it is read
+  --load-state FILE  continue filtering from the state saved in FILE
+  --save-state FILE  save the state after the last measurement to FILE
+
+A kernel takes any number of factors, up to `--`, so should be given after
+other options. The 'fft' engine computes the same convolution by
+overlap-save, and is much faster for large kernels.
+
+Boundary modes extend data as follows:
+  circular  wrap around to the opposite end      (d e | a b c d e | a b)
+  reflect   reflect about the end points         (c b | a b c d e | d c)
+  nearest   repeat the end points                (a a | a b c d e | e e)
+  zero      pad with zeros                       (0 0 | a b c d e | 0 0)
+  valid     do not extend; only estimate where the kernel fits entirely
+  causal    align the kernel to end at each measurement, repeating the
+              first measurement as needed
+
+With more than one job, data is split into chunks that are filtered in
+parallel, each reading the measurements around it from shared memory.
+
+All modes except 'circular' can stream, holding only as many measurements as
+the kernel is long. Estimates lag measurements by half the kernel length,
+except in 'causal' mode.
+
+The state of the filter is the window of the last measurements, as many as
+the kernel is long. State can only be saved or loaded in 'causal' mode, which
+is then the default, and the 'direct' engine and 'python' backend are used.
 """
 
-__all__ = ['cli_wrapper', 'filter', 'report']
+from __future__ import annotations
+
+__all__ = [
+    'ConvolutionFilter', 'cli_wrapper', 'filter', 'filter_fft',
+    'filter_stream', 'report',
+]
 
 import sys
-from typing import List, Dict, Iterator
+import array
+import cmath
+import itertools
+import functools
+import collections
+import operator
+from collections.abc import Sequence
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from . import internals
 
 def cli_wrapper(
-        **data: Dict,
+        **data: Any,
 ) -> None:
     """Handler for the convolution filter. Checks and cleans given options,
     and performs optional reporting.
@@ -24,21 +99,128 @@ def cli_wrapper(
     )
     _raw = data["data_raw"]
 
-    _filter = filter(
-        _raw,
-        _kernel,
+    _engine = data["engine"] if data["engine"] is not None else "direct"
+    if _engine not in ("direct", "fft"):
+        internals._print_invalid_engine(_engine)
+        sys.exit(1)
+
+    _states = None
+    if data["load_state"] is not None:
+        _states = internals._load_state(data["load_state"], "convolve")
+        if _states is None:
+            sys.exit(1)
+    _filters: List[ConvolutionFilter] = list()
+    _stateful = (
+        data["load_state"] is not None or data["save_state"] is not None
+    )
+
+    if data["boundary"] is not None:
+        _boundary = data["boundary"]
+    else:
+        _boundary = "causal" if _stateful else "circular"
+    if _boundary not in BOUNDARIES:
+        internals._print_invalid_boundary(_boundary)
+        sys.exit(1)
+    if _stateful and _boundary != "causal":
+        #NOTE: only causal estimates can be completed without later data
+        internals._print_invalid_state_boundary(_boundary)
+        sys.exit(1)
+
+    _jobs = data["jobs"] if data["jobs"] is not None else 1
+    _parallel = (
+        _jobs > 1 and not data["columns"] and not data["stream"]
+        and not _stateful
     )
 
+    if not isinstance(_raw, Sequence) and (
+        _boundary == "circular" or _parallel
+    ):
+        #NOTE: circular wraparound and chunking need the full series
+        _raw = list(_raw)
+
+    _measured = _raw
+    if data["report"] and not isinstance(_raw, Sequence):
+        _raw, _measured = itertools.tee(_raw)
+    if data["report"] and _boundary == "valid":
+        #NOTE: first estimate is aligned to the middle of the kernel
+        _measured = itertools.islice(_measured, len(_kernel) // 2, None)
+
+    if _stateful:
+        try:
+            _filter: Iterable[Any] = internals._filter_stateful(
+                _raw,
+                functools.partial(ConvolutionFilter, _kernel, normalize=False),
+                _states,
+                data["columns"],
+                data["stream"],
+                _filters,
+            )
+        except ValueError as err:
+            internals._print_invalid_state(data["load_state"], str(err))
+            sys.exit(1)
+    elif _parallel:
+        from . import parallel
+        _filter = parallel.map_chunks(
+            _filter_chunk,
+            _raw,
+            _count(len(_raw), len(_kernel), _boundary),
+            _jobs,
+            (_kernel, _boundary, _engine, data["backend"]),
+        )
+    elif data["backend"] == "numpy":
+        from . import vectorized
+        _filter = vectorized.convolve_filter(
+            _raw,
+            _kernel,
+            boundary=_boundary,
+            fft=(_engine == "fft"),
+        )
+    elif data["columns"]:
+        _filter = internals._filter_columns(
+            _raw,
+            functools.partial(
+                _filter_series,
+                kernel=_kernel,
+                boundary=_boundary,
+                engine=_engine,
+            ),
+        )
+    else:
+        _filter = _filter_series(_raw, _kernel, _boundary, _engine)
+
     if data["report"]:
         sys.stdout.write(report_header(_kernel))
-        for measured, estimated in zip(_raw, _filter):
-            sys.stdout.write("{0:8.4f}  {1:8.4f}\n".format(measured, estimated))
+        if data["columns"]:
+            internals._write_report_rows(zip(_measured, _filter))
+        else:
+            for measured, estimated in zip(_measured, _filter):
+                sys.stdout.write(
+                    "{0:8.4f}  {1:8.4f}\n".format(measured, estimated),
+                )
+    elif data["columns"]:
+        internals._write_rows(
+            _filter,
+            data["delimiter"],
+            data["output_format"],
+            data["stream"],
+            data["precision"],
+        )
     else:
-        for estimated in _filter:
-            sys.stdout.write("{0:.4f}\n".format(estimated))
+        internals._write_values(
+            _filter,
+            data["output_format"],
+            data["stream"],
+            data["precision"],
+        )
+
+    if data["save_state"] is not None and not internals._save_state(
+        data["save_state"], "convolve", _filters, _states,
+    ):
+        internals._print_invalid_file(data["save_state"])
+        sys.exit(1)
 
 def filter(
-    data: List[float],
+    data: Sequence[float],
     kernel: List[float]
 ) -> Iterator[float]:
     """Iterate over data, passing it through the kernel.
@@ -58,6 +240,152 @@ def filter(
             _sum += data[target] * kernel_point
         yield _sum
 
+def filter_stream(
+    data: Iterable[float],
+    kernel: List[float],
+    boundary: str,
+) -> Iterator[float]:
+    """Iterate over data, passing it through the kernel. Data is consumed
+    lazily and only the last `len(kernel)` measurements are held.
+
+    Arguments:
+      data      measurements
+      kernel    measurement adjustments
+      boundary  mode of extending data; any of `BOUNDARIES` except 'circular'
+    """
+    window: collections.deque = collections.deque(maxlen=len(kernel))
+    for data_point in _extend(data, len(kernel), boundary):
+        window.append(data_point)
+        if len(window) == len(kernel):
+            yield sum(map(operator.mul, window, kernel))
+
+class ConvolutionFilter:
+    """Causal convolution filter of one series, updated a measurement at a
+    time. Estimates are those of `filter_stream` with the 'causal' boundary,
+    such that each depends only on the last `len(kernel)` measurements, and
+    the first measurement stands in for those before it.
+
+    Arguments:
+      kernel     measurement adjustments, the last of which applies to the
+                   latest measurement
+      normalize  scale the kernel to sum to 1, as `filter convolve` does
+    """
+
+    __slots__ = ('kernel', 'window')
+
+    def __init__(
+        self,
+        kernel: List[float],
+        normalize: bool = True,
+    ) -> None:
+        if len(kernel) == 0:
+            raise ValueError("kernel must have at least one factor")
+        self.kernel = _normalize(list(kernel)) if normalize else list(kernel)
+        self.window: collections.deque = collections.deque(
+            maxlen=len(kernel),
+        )
+
+    def update(
+        self,
+        measured: float,
+    ) -> float:
+        """Add one measurement to the window. Returns the estimate."""
+        if len(self.window) == 0:
+            self.window.extend([measured] * (len(self.kernel) - 1))
+        self.window.append(measured)
+        return sum(map(operator.mul, self.window, self.kernel))
+
+    def update_batch(
+        self,
+        buffer: Any,
+    ) -> array.array:
+        """Add each measurement of a buffer to the window in turn. Returns
+        the estimates.
+        """
+        estimates = internals._buffer_array(buffer)
+        window, kernel = self.window, self.kernel
+        if len(window) == 0 and len(estimates) > 0:
+            window.extend([estimates[0]] * (len(kernel) - 1))
+        for index, measured in enumerate(estimates):
+            window.append(measured)
+            estimates[index] = sum(map(operator.mul, window, kernel))
+        return estimates
+
+    def get_state(self) -> Dict[str, Any]:
+        """Draw the window of latest measurements, such that filtering can
+        continue from it by `set_state`.
+        """
+        return {"window": list(self.window)}
+
+    def set_state(
+        self,
+        state: Dict[str, Any],
+    ) -> None:
+        window = [float(value) for value in state["window"]]
+        if len(window) not in (0, len(self.kernel)):
+            raise ValueError("window does not match the kernel")
+        self.window.clear()
+        self.window.extend(window)
+
+def filter_fft(
+    data: Iterable[float],
+    kernel: List[float],
+    boundary: str = "circular",
+) -> Iterator[float]:
+    """Iterate over data, passing it through the kernel. Equivalent to
+    `filter` or `filter_stream` but computed by overlap-save FFT convolution,
+    which is O(N log K) rather than O(N*K).
+
+    Arguments:
+      data      measurements
+      kernel    measurement adjustments
+      boundary  mode of extending data; any of `BOUNDARIES`
+    """
+    taps = len(kernel)
+
+    #extend data such that output[i] is the dot product of
+    # extended[i:i+taps] and kernel
+    if boundary == "circular":
+        if not isinstance(data, Sequence):
+            data = list(data)
+        length = len(data)
+        if length == 0:
+            return
+        offset = taps // 2
+        extended = [
+            data[(index - offset) % length]
+            for index in range(length + taps - 1)
+        ]
+    else:
+        extended = list(_extend(data, taps, boundary))
+        length = len(extended) - taps + 1
+        if length <= 0:
+            return
+
+    size = 1
+    while size < 4 * taps:
+        size *= 2
+    step = size - taps + 1
+
+    #correlation is convolution by the reversed kernel
+    reversed_kernel: List[complex] = list(reversed(kernel))
+    response = _fft(reversed_kernel + [0.0] * (size - taps))
+
+    #two real blocks are packed into one complex transform
+    for start in range(0, length, 2 * step):
+        first = extended[start:start + size]
+        second = extended[start + step:start + step + size]
+        first.extend([0.0] * (size - len(first)))
+        second.extend([0.0] * (size - len(second)))
+        packed = _fft([complex(a, b) for a, b in zip(first, second)])
+        packed = _ifft([x * h for x, h in zip(packed, response)])
+
+        valid = packed[taps - 1:]
+        for value in valid[:min(step, length - start)]:
+            yield value.real
+        for value in valid[:max(0, min(step, length - start - step))]:
+            yield value.imag
+
 def report_header(
     kernel: List[float],
 ) -> str:
@@ -81,6 +409,147 @@ def report_header(
     )
     return "\n".join(_msg) + "\n"
 
+def _filter_series(
+    data: Iterable[float],
+    kernel: List[float],
+    boundary: str,
+    engine: str,
+) -> Iterator[float]:
+    """Pass a series through the kernel, by the named engine."""
+    if engine == "fft":
+        return filter_fft(data, kernel, boundary)
+    elif boundary == "circular":
+        if not isinstance(data, Sequence):
+            data = list(data)
+        return filter(data, kernel)
+    else:
+        return filter_stream(data, kernel, boundary)
+
+def _filter_chunk(
+    data: Sequence[float],
+    start: int,
+    stop: int,
+    kernel: List[float],
+    boundary: str,
+    engine: str,
+    backend: str,
+) -> Sequence[float]:
+    """Compute the estimates from `start` up to `stop`. Only the measurements
+    that those estimates depend on are read, extending data beyond its ends
+    as needed.
+    """
+    length = len(data)
+    taps = len(kernel)
+    if boundary == "valid":
+        before, after = 0, taps - 1
+    elif boundary == "causal":
+        before, after = taps - 1, 0
+    else:
+        before = taps // 2
+        after = taps - 1 - before
+
+    first, last = start - before, stop + after
+    window = [
+        _boundary_value(data, index, length, boundary)
+        for index in range(first, min(0, last))
+    ]
+    window.extend(data[max(0, first):max(0, min(length, last))])
+    window.extend(
+        _boundary_value(data, index, length, boundary)
+        for index in range(max(length, first), last)
+    )
+
+    if backend == "numpy":
+        from . import vectorized
+        #NOTE: arrays are copied to shared memory without conversion
+        return vectorized.convolve_filter(  # type: ignore
+            window, kernel, boundary="valid", fft=(engine == "fft"),
+        )
+    return list(_filter_series(window, kernel, "valid", engine))
+
+def _count(
+    length: int,
+    taps: int,
+    boundary: str,
+) -> int:
+    """Count the estimates of `length` measurements."""
+    if boundary == "valid":
+        return max(0, length - taps + 1)
+    return length
+
+BOUNDARIES = ("circular", "reflect", "nearest", "zero", "valid", "causal")
+
+def _extend(
+    data: Iterable[float],
+    taps: int,
+    boundary: str,
+) -> Iterator[float]:
+    """Iterate over data, extended beyond each end as needed for a kernel of
+    `taps` factors. Only the first and the last few measurements are held.
+    """
+    if boundary == "valid":
+        yield from data
+        return
+    elif boundary == "causal":
+        before, after = taps - 1, 0
+    else:
+        before = taps // 2
+        after = taps - 1 - before
+
+    #NOTE: reflecting needs the first measurements; when data is shorter
+    # than that, head holds all of it and may be reflected more than once
+    data = iter(data)
+    head = list(itertools.islice(
+        data, before + 1 if boundary == "reflect" else 1,
+    ))
+    if len(head) == 0:
+        return
+    for index in range(-before, 0):
+        yield _boundary_value(head, index, len(head), boundary)
+    yield from head
+
+    tail: collections.deque = collections.deque(head, maxlen=after + 1)
+    for data_point in data:
+        tail.append(data_point)
+        yield data_point
+
+    #NOTE: likewise, tail holds either the last measurements or all of them
+    held = list(tail)
+    for index in range(len(held), len(held) + after):
+        yield _boundary_value(held, index, len(held), boundary)
+
+def _boundary_value(
+    data: Sequence[float],
+    index: int,
+    length: int,
+    boundary: str,
+) -> float:
+    """Look up the value at an index beyond the ends of data, which has
+    `length` measurements.
+    """
+    _index = _boundary_index(index, length, boundary)
+    return data[_index] if _index is not None else 0.0
+
+def _boundary_index(
+    index: int,
+    length: int,
+    boundary: str,
+) -> Optional[int]:
+    if 0 <= index < length:
+        return index
+    elif boundary == "circular":
+        return index % length
+    elif boundary == "reflect":
+        if length == 1:
+            return 0
+        period = 2 * (length - 1)
+        index %= period
+        return index if index < length else period - index
+    elif boundary in ("nearest", "causal"):
+        return 0 if index < 0 else length - 1
+    else:
+        return None
+
 def _normalize(kernel: List[float]) -> List[float]:
     _sum = sum(kernel)
     if _sum == 1:
@@ -89,3 +558,34 @@ def _normalize(kernel: List[float]) -> List[float]:
         weight = 1.0/_sum
         return [factor * weight for factor in kernel]
 
+
+_TWIDDLES: Dict[int, List[complex]] = dict()
+
+def _fft(values: List[complex]) -> List[complex]:
+    """Compute the discrete Fourier transform of values by recursive radix-2
+    decimation in time. The length of values must be a power of 2.
+    """
+    length = len(values)
+    if length == 1:
+        return values
+    half = length // 2
+
+    even = _fft(values[0::2])
+    odd = _fft(values[1::2])
+
+    if length not in _TWIDDLES:
+        _TWIDDLES[length] = [
+            cmath.exp(-2j * cmath.pi * index / length) for index in range(half)
+        ]
+    odd = [w * x for w, x in zip(_TWIDDLES[length], odd)]
+
+    return (
+        [x + y for x, y in zip(even, odd)]
+        + [x - y for x, y in zip(even, odd)]
+    )
+
+def _ifft(values: List[complex]) -> List[complex]:
+    """Compute the inverse discrete Fourier transform of values."""
+    length = len(values)
+    values = _fft([x.conjugate() for x in values])
+    return [x.conjugate() / length for x in values]
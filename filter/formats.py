@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+
+"""Binary formats of measurements and estimates.
+
+Formats are:
+  text   one value, or one row of delimited values, per line
+  f64le  little-endian 64-bit floats
+  f32le  little-endian 32-bit floats
+  npy    NumPy array file of 64-bit or 32-bit floats; a file with two
+           dimensions holds one row of columns per time interval
+
+Binary formats are converted in bulk through the buffer protocol of
+`array.array`, so NumPy is not required.
+"""
+
+from __future__ import annotations
+
+__all__ = ['FORMATS', 'decoder', 'view', 'write']
+
+import sys
+import time
+import array
+import itertools
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import (
+        Any, BinaryIO, Callable, Iterable, Iterator, Optional, Sequence, Tuple,
+    )
+
+FORMATS = ("text", "f64le", "f32le", "npy")
+
+NPY_MAGIC = b"\x93NUMPY"
+
+_TYPECODES = {"f64le": "d", "f32le": "f", "npy": "d"}
+_DESCRIPTIONS = {"d": "f8", "f": "f4"}
+
+def decoder(
+    input_format: str,
+    columns: bool = False,
+) -> Callable[[bytes], Sequence[Any]]:
+    """Create a decoder of a binary format. The decoder is called with each
+    chunk of input in order, and returns the values of all records completed
+    by that chunk. An empty chunk marks the end of input.
+
+    Values are an array of floats or, if `columns` is set, a list of rows.
+    Only an npy file with two dimensions has more than one column. Raises
+    ValueError on an invalid header or a partial record.
+    """
+    typecode: Optional[str] = None
+    swap = sys.byteorder != "little"
+    width = 1
+    if input_format != "npy":
+        typecode = _TYPECODES[input_format]
+    remainder = b""
+
+    def decode(chunk: bytes) -> Sequence[Any]:
+        nonlocal typecode, swap, width, remainder
+        data = remainder + chunk
+        offset = 0
+        if typecode is None:
+            header = _parse_npy_header(data)
+            if header is None:
+                if len(chunk) == 0 and len(data) > 0:
+                    raise ValueError("truncated header")
+                remainder = data
+                return array.array("d")
+            offset, typecode, swap, width = header
+            if width > 1 and not columns:
+                raise ValueError("multiple columns")
+
+        size = array.array(typecode).itemsize * width
+        end = len(data) - ((len(data) - offset) % size)
+        if len(chunk) == 0 and end < len(data):
+            raise ValueError("partial record")
+        remainder = data[end:]
+
+        values: array.array = array.array(typecode)
+        values.frombytes(memoryview(data)[offset:end])
+        if swap:
+            values.byteswap()
+        if typecode != "d":
+            values = array.array("d", values)
+        if not columns:
+            return values
+        return list(zip(*(values[index::width] for index in range(width))))
+
+    return decode
+
+def view(
+    buffer: Any,
+    input_format: str,
+) -> Optional[memoryview]:
+    """View the values of a buffer in place, such as a memory-mapped file.
+    Returns None if the values cannot be viewed as they are, because they
+    must be byte-swapped, have more than one column, or end in a partial
+    record. Raises ValueError on an invalid header.
+    """
+    offset = 0
+    typecode = _TYPECODES[input_format]
+    swap = sys.byteorder != "little"
+    width = 1
+    if input_format == "npy":
+        header = _parse_npy_header(buffer)
+        if header is None:
+            raise ValueError("truncated header")
+        offset, typecode, swap, width = header
+    if swap or width != 1:
+        return None
+
+    length = len(buffer) - offset
+    if length % array.array(typecode).itemsize != 0:
+        return None
+    return memoryview(buffer)[offset:].cast(typecode)  # type: ignore
+
+def _parse_npy_header(
+    data: Any,
+) -> Optional[Tuple[int, str, bool, int]]:
+    """Parse the header of an npy file. Returns the length of the header,
+    the array typecode of values, whether values must be byte-swapped, and
+    the number of columns; or None if data does not yet hold the header.
+    """
+    if len(data) < 10:
+        return None
+    if data[:6] != NPY_MAGIC:
+        raise ValueError("not an npy file")
+    if data[6] == 1:
+        start = 10
+    elif data[6] in (2, 3):
+        start = 12
+    else:
+        raise ValueError("unsupported npy version")
+    if len(data) < start:
+        return None
+    length = start + int.from_bytes(data[8:start], "little")
+    if len(data) < length:
+        return None
+
+    import ast
+    try:
+        header = ast.literal_eval(data[start:length].decode("latin1"))
+        order, description = header["descr"][0], header["descr"][1:]
+        fortran_order, shape = header["fortran_order"], header["shape"]
+    except (SyntaxError, ValueError, KeyError, IndexError, TypeError):
+        raise ValueError("invalid npy header")
+
+    typecodes = {value: key for key, value in _DESCRIPTIONS.items()}
+    if description not in typecodes or order not in "<>=":
+        raise ValueError("unsupported npy data type")
+    if order == "<":
+        swap = sys.byteorder != "little"
+    else:
+        swap = order == ">" and sys.byteorder != "big"
+
+    if len(shape) == 1:
+        width = 1
+    elif len(shape) == 2 and shape[1] > 0 and not fortran_order:
+        width = shape[1]
+    else:
+        raise ValueError("unsupported npy shape")
+    return length, typecodes[description], swap, width
+
+def write(
+    stream: BinaryIO,
+    values: Iterable[Any],
+    output_format: str,
+    batch: int = 1 << 16,
+    observe: Optional[Callable[[int, float], None]] = None,
+) -> None:
+    """Write values in a binary format. Values are floats or rows of floats,
+    or an object that exports 64-bit floats through the buffer protocol.
+
+    Values are packed and written `batch` at a time. The npy format requires
+    the count of values in its header, so is written only after all values.
+    If given, `observe` is called with the count of records and the seconds
+    spent packing and writing them.
+    """
+    typecode = _TYPECODES[output_format]
+    swap = sys.byteorder != "little"
+
+    try:
+        view: Optional[memoryview] = memoryview(values)  # type: ignore
+    except TypeError:
+        view = None
+    if view is not None and view.format == "d" and view.ndim in (1, 2):
+        width = view.shape[1] if view.ndim == 2 else 1  # type: ignore
+        packed = array.array("d")
+        packed.frombytes(view.tobytes())
+        blocks: Iterable[array.array] = [packed]
+    else:
+        values = iter(values)
+        first = next(values, None)
+        width = 1
+        if first is not None:
+            values = itertools.chain([first], values)
+            if not isinstance(first, (int, float)):
+                width = len(first)
+                values = itertools.chain.from_iterable(values)
+        blocks = _batches(values, batch * width)
+
+    if output_format == "npy":
+        collected = array.array(typecode)
+        for block in blocks:
+            collected.extend(_convert(block, typecode))
+        shape: Tuple[int, ...] = (len(collected) // width, )
+        if width > 1:
+            shape += (width, )
+        stream.write(_npy_header(typecode, shape))
+        blocks = [collected]
+
+    for block in blocks:
+        start = time.perf_counter() if observe is not None else 0.0
+        block = _convert(block, typecode)
+        if swap:
+            block.byteswap()
+        stream.write(block.tobytes())
+        if observe is not None:
+            observe(len(block) // width, time.perf_counter() - start)
+
+def _batches(
+    values: Iterable[float],
+    size: int,
+) -> Iterator[array.array]:
+    values = iter(values)
+    while True:
+        block = array.array("d", itertools.islice(values, size))
+        if len(block) == 0:
+            break
+        yield block
+
+def _convert(
+    values: array.array,
+    typecode: str,
+) -> array.array:
+    if values.typecode == typecode:
+        return values
+    return array.array(typecode, values)
+
+def _npy_header(
+    typecode: str,
+    shape: Tuple[int, ...],
+) -> bytes:
+    """Draw a version 1.0 npy header, padded such that data is aligned to 64
+    bytes.
+    """
+    header = "{{'descr': '<{0}', 'fortran_order': False, 'shape': {1}, }}"
+    header = header.format(_DESCRIPTIONS[typecode], repr(shape))
+    header += " " * (-(len(header) + 11) % 64) + "\n"
+    return NPY_MAGIC + b"\x01\x00" + len(header).to_bytes(2, "little") + (
+        header.encode("latin1")
+    )
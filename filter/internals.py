@@ -1,7 +1,28 @@
 #!/usr/bin/env python3
 
+from __future__ import annotations
+
+import os
 import sys
-from typing import *
+import mmap
+import time
+import array
+import itertools
+import functools
+import operator
+
+#NOTE: typing is slow to import, so is only imported by type checkers
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import (
+        Any, BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional,
+        Sequence, Tuple,
+    )
+
+    Decoder = Callable[[bytes], Sequence[Any]]
+
+from . import formats
+from . import metrics
 
 VERSION = (1,0,3,)
 
@@ -16,6 +37,17 @@ def _try_get_float(
     else:
         return default
 
+def _try_get_int(
+    mapping: Dict,
+    key: str,
+    *,
+    default: Optional[int] = None,
+) -> Optional[int]:
+    if key in mapping:
+        return int(mapping[key])
+    else:
+        return default
+
 def _try_get_list_float(
     mapping: Dict,
     key: str,
@@ -33,46 +65,677 @@ def _try_get_list_float(
     else:
         return default
 
-def _read_stdin() -> Iterator[float]:
+def _try_get_grid(
+    mapping: Dict,
+    key: str,
+) -> Optional[List[float]]:
+    """Parse a grid of comma-separated values, each either a number or
+    START:STOP:N for N evenly spaced numbers from START to STOP. Raises
+    ValueError on an invalid grid.
+    """
+    if key not in mapping:
+        return None
+    _grid: List[float] = list()
+    for value in mapping[key].split(","):
+        if ":" not in value:
+            _grid.append(float(value))
+            continue
+        start, stop, count = value.split(":")
+        _start, _stop, _count = float(start), float(stop), int(count)
+        if _count < 1:
+            raise ValueError(value)
+        elif _count == 1:
+            _grid.append(_start)
+            continue
+        _step = (_stop - _start) / (_count - 1)
+        _grid.extend(_start + (index * _step) for index in range(_count - 1))
+        _grid.append(_stop)
+    return _grid
+
+BLOCK_SIZE = 1 << 20
+
+def _line_decoder(
+    parse: Optional[Callable[[bytes], Any]] = None,
+) -> Decoder:
+    """Create a decoder of lines. The decoder is called with each chunk of
+    input in order, and returns the values of all lines completed by that
+    chunk. An empty chunk marks the end of input.
+
+    Lines are converted by `parse` if given, and otherwise into an array of
+    floats.
+    """
+    remainder = b""
+
+    def decode(chunk: bytes) -> Sequence[Any]:
+        nonlocal remainder
+        lines = (remainder + chunk).split(b"\n")
+        remainder = lines.pop() if len(chunk) > 0 else b""
+        if parse is None:
+            return array.array("d", _parse_lines(lines, float))
+        return _parse_lines(lines, parse)
+
+    return decode
+
+def _parse_lines(
+    lines: List[bytes],
+    parse: Callable[[bytes], Any],
+) -> List[Any]:
+    """Convert lines by `parse` in bulk. Only if there are blank or invalid
+    lines does this fall back to converting line by line.
+    """
     try:
-        for line in sys.stdin.readlines():
-            line = line.strip()
-            if len(line) == 0:
-                continue
-            try:
-                yield float(line.strip())
-            except:
-                _print_invalid_data(line)
+        return list(map(parse, lines))
+    except ValueError:
+        pass
+
+    values: List[Any] = list()
+    for line in lines:
+        line = line.strip()
+        if len(line) == 0:
+            continue
+        try:
+            values.append(parse(line))
+        except:
+            _print_invalid_data(line.decode(errors="replace"))
+    return values
+
+def _parse_row(
+    delimiter: Optional[str],
+) -> Callable[[bytes], Tuple[float, ...]]:
+    """Create a parser of delimited lines, where each line must have as many
+    fields as the first.
+    """
+    separator = delimiter.encode() if delimiter is not None else None
+    width: List[int] = list()
+
+    def parse(line: bytes) -> Tuple[float, ...]:
+        row = tuple(map(float, line.split(separator)))
+        if len(width) == 0 and len(row) > 0:
+            width.append(len(row))
+        elif len(width) == 0 or len(row) != width[0]:
+            raise ValueError(line)
+        return row
+
+    return parse
+
+def _parse_keyed(
+    delimiter: Optional[str],
+) -> Callable[[bytes], Tuple[str, float]]:
+    """Create a parser of lines of a key and a measurement, separated by
+    `delimiter`, or the first whitespace if none is given.
+    """
+    separator = delimiter.encode() if delimiter is not None else None
+
+    def parse(line: bytes) -> Tuple[str, float]:
+        key, value = line.strip().split(separator, 1)
+        return key.decode(), float(value)
+
+    return parse
+
+def _read_blocks(
+    f: BinaryIO,
+    decoder: Callable[[], Decoder] = _line_decoder,
+) -> Iterator[Sequence[Any]]:
+    """Read a binary stream in large blocks, yielding the decoded values of
+    each block.
+    """
+    decode = decoder()
+    while True:
+        start = time.perf_counter()
+        chunk = f.read(BLOCK_SIZE)
+        if metrics.active is not None:
+            metrics.active.waited(time.perf_counter() - start)
+        values = decode(chunk)
+        if len(values) > 0:
+            yield values
+        if len(chunk) == 0:
+            break
+
+def _read_stdin(
+    decoder: Callable[[], Decoder] = _line_decoder,
+) -> Iterator[Sequence[Any]]:
+    try:
+        yield from _read_blocks(sys.stdin.buffer, decoder)
     except KeyboardInterrupt:
         sys.stdout.write("\n")
+    except ValueError as err:
+        _print_invalid_encoding("-", str(err))
 
-def _read_file(filename: str) -> Iterator[float]:
+def _read_file(
+    filename: str,
+    decoder: Callable[[], Decoder] = _line_decoder,
+) -> Iterator[Sequence[Any]]:
     try:
-        with open(filename, 'r') as f:
-            for line in f.readlines():
-                line = line.strip()
-                if len(line) == 0:
-                    continue
-                try:
-                    yield float(line)
-                except:
-                    _print_invalid_data(line)
+        with open(filename, 'rb') as f:
+            yield from _read_blocks(f, decoder)
     except OSError:
         _print_invalid_file(filename)
+    except ValueError as err:
+        _print_invalid_encoding(filename, str(err))
+
+def _read_stream(
+    fd: int,
+    every: Optional[int],
+    interval: Optional[float],
+    decoder: Callable[[], Decoder] = _line_decoder,
+) -> Iterator[Any]:
+    """Read a file descriptor chunk by chunk, yielding each value as soon as
+    it arrives.
+
+    Output is flushed once `every` values have been consumed or `interval`
+    seconds have elapsed, and always before a read that would block.
+    """
+    decode = decoder()
+    pending = 0
+    deadline = time.monotonic() + (interval or 0.0)
+    try:
+        while True:
+            if pending and not _is_readable(fd):
+                sys.stdout.flush()
+                pending = 0
+            start = time.perf_counter()
+            chunk = os.read(fd, 65536)
+            if metrics.active is not None:
+                metrics.active.waited(time.perf_counter() - start)
+            for value in decode(chunk):
+                yield value
+
+                pending += 1
+                if every is not None and pending >= every:
+                    sys.stdout.flush()
+                    pending = 0
+                elif interval and time.monotonic() >= deadline:
+                    sys.stdout.flush()
+                    pending = 0
+                    deadline = time.monotonic() + interval
+            if len(chunk) == 0:
+                break
+    except KeyboardInterrupt:
+        sys.stdout.write("\n")
+
+def _is_readable(fd: int) -> bool:
+    #NOTE: only polled with --flush-interval, so imported here
+    try:
+        import select
+    except ImportError:
+        return False
+    try:
+        return len(select.select([fd], [], [], 0)[0]) > 0
+    except (OSError, ValueError):
+        return False
 
-def _get_raw_data(filenames: List[str]) -> List[float]:
-    raw_data: List[float] = list()
+def _stream_raw_data(
+    filenames: List[str],
+    every: Optional[int],
+    interval: Optional[float],
+    decoder: Callable[[], Decoder] = _line_decoder,
+) -> Iterator[Any]:
+    if len(filenames) == 0:
+        filenames = ['-']
+
+    for filename in filenames:
+        if filename == '-':
+            fd = sys.stdin.fileno()
+        else:
+            try:
+                fd = os.open(filename, os.O_RDONLY)
+            except OSError:
+                _print_invalid_file(filename)
+                continue
+        try:
+            yield from _read_stream(fd, every, interval, decoder)
+        except ValueError as err:
+            _print_invalid_encoding(filename, str(err))
+        finally:
+            if filename != '-':
+                os.close(fd)
 
+def _get_raw_blocks(
+    filenames: List[str],
+    decoder: Callable[[], Decoder] = _line_decoder,
+) -> Iterator[Sequence[Any]]:
     if len(filenames) == 0:
-        raw_data.extend(list(_read_stdin()))
+        filenames = ['-']
+
+    for filename in filenames:
+        if filename == '-':
+            yield from _read_stdin(decoder)
+        else:
+            yield from _read_file(filename, decoder)
+
+def _get_raw_data(
+    filenames: List[str],
+    decoder: Callable[[], Decoder] = _line_decoder,
+    input_format: str = "text",
+) -> Sequence[Any]:
+    """Read all values. A single file of a binary format is memory-mapped and
+    viewed in place where possible; otherwise values are held in an array of
+    floats, or a list of rows.
+    """
+    if len(filenames) == 1 and filenames[0] != '-' and input_format != "text":
+        start = time.perf_counter()
+        mapped = _map_file(filenames[0], input_format)
+        if mapped is not None:
+            if metrics.active is not None:
+                metrics.active.decoded(
+                    len(mapped), time.perf_counter() - start,
+                )
+            return mapped
+
+    raw_data: Optional[Any] = None
+    for block in _get_raw_blocks(filenames, decoder):
+        if raw_data is None:
+            raw_data = block
+        else:
+            raw_data.extend(block)
+    return raw_data if raw_data is not None else list()
+
+def _get_data_raw(
+    filenames: List[str],
+    data: Dict,
+) -> Any:
+    """Read data from files in the form that the filter consumes: a stream of
+    values, blocks of values, an iterator over values, or all values at once.
+    """
+    #NOTE: smoothed tracks of the bank are read as any other series
+    bank = data["bank"] and not data["smooth"]
+    if data["input_format"] != "text":
+        decoder: Callable[[], Decoder] = functools.partial(
+            formats.decoder,
+            data["input_format"],
+            data["columns"] or data["timestamps"] or bank,
+        )
+    elif data["keyed"]:
+        decoder = functools.partial(
+            _line_decoder, _parse_keyed(data["delimiter"]),
+        )
+    elif data["columns"] or data["timestamps"] or bank:
+        decoder = functools.partial(
+            _line_decoder, _parse_row(data["delimiter"]),
+        )
+    else:
+        decoder = _line_decoder
+    if metrics.active is not None:
+        decoder = metrics.decoder(decoder)
+
+    if data["stream"]:
+        every = data["flush"]
+        interval = data["flush_interval"]
+        if every is None and interval is None:
+            every = 1
+        if interval is not None:
+            interval /= 1000
+        stream = _stream_raw_data(filenames, every, interval, decoder)
+        if bank:
+            #NOTE: the bank filters by blocks, here of each row as it arrives
+            return ([row] for row in stream)
+        return stream
+    elif bank or (
+        data["engine"] == "iir" and not data["timestamps"]
+    ):
+        #NOTE: these filters consume data block by block in constant memory
+        return _get_raw_blocks(filenames, decoder)
+    elif data["backend"] == "python" and not (
+        data["method"] == "convolve"
+        and (data["boundary"] in (None, "circular") or (data["jobs"] or 1) > 1)
+    ):
+        #NOTE: these filters consume data lazily, so need not hold all of it
+        return itertools.chain.from_iterable(
+            _get_raw_blocks(filenames, decoder),
+        )
+    else:
+        return _get_raw_data(filenames, decoder, data["input_format"])
+
+def _map_file(
+    filename: str,
+    input_format: str,
+) -> Optional[Sequence[float]]:
+    """Memory-map a file of a binary format, and view its values in place.
+    Returns None if the file cannot be mapped or its values must be
+    converted.
+    """
+    try:
+        with open(filename, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    try:
+        return formats.view(mapped, input_format)
+    except ValueError as err:
+        _print_invalid_encoding(filename, str(err))
+        return list()
+
+def _filter_columns(
+    rows: Iterable[Sequence[float]],
+    series_filter: Callable[[Iterator[float]], Iterator[Any]],
+) -> Iterator[Tuple[Any, ...]]:
+    """Pass each column of rows through a filter of a single series, and
+    iterate over rows of the results. Rows are consumed lazily.
+    """
+    rows = iter(rows)
+    first = next(rows, None)
+    if first is None:
+        return iter(())
+    rows = itertools.chain([first], rows)
+    columns = itertools.tee(rows, len(first))
+    return zip(*(
+        series_filter(map(operator.itemgetter(index), column))
+        for index, column in enumerate(columns)
+    ))
+
+def _buffer_array(buffer: Any) -> array.array:
+    """Copy the numbers of any object of the buffer protocol into an array
+    of doubles, such that filters can overwrite measurements with estimates
+    in place. Buffers of bytes are read as native doubles, and buffers of
+    more than one dimension are read in C order.
+    """
+    view = memoryview(buffer)
+    if view.format in ("B", "b", "c"):
+        view = view.cast("B").cast("d")  # type: ignore
+    elif view.ndim != 1:
+        view = view.cast("B").cast(view.format)  # type: ignore
+    if view.format == "d":
+        return array.array("d", view.tobytes())
+    return array.array("d", view)
+
+def _timed_measurements(
+    rows: Iterable[Sequence[float]],
+    input_format: str,
+) -> Iterator[Tuple[float, float]]:
+    """Pair each time with its measurement. Rows of text and of npy with two
+    columns hold both; other binary formats hold them as consecutive values.
+    Rows that are not pairs, and times that do not increase, are reported and
+    skipped.
+    """
+    rows = iter(rows)
+    first = next(rows, None)
+    if first is None:
+        return
+    rows = itertools.chain([first], rows)
+    if len(first) == 1 and input_format != "text":
+        values = itertools.chain.from_iterable(rows)
+        rows = zip(values, values)
+
+    last_time: Optional[float] = None
+    for row in rows:
+        if len(row) != 2:
+            _print_invalid_data(" ".join(str(value) for value in row))
+            continue
+        data_time, measured = row
+        if last_time is not None and not data_time > last_time:
+            _print_invalid_timestamp(data_time)
+            continue
+        last_time = data_time
+        yield data_time, measured
+
+def _missing_times(
+    last_time: float,
+    data_time: float,
+    interval: Optional[float],
+) -> Iterator[float]:
+    """Iterate over the times, every interval since `last_time`, at which a
+    measurement was missed before `data_time`. A measurement is missed if
+    none arrived within half an interval after its time, so that one arriving
+    late by jitter is not taken as missing.
+    """
+    if interval is None:
+        return
+    step = 1
+    while last_time + (step * interval) < data_time - (interval / 2):
+        yield last_time + (step * interval)
+        step += 1
+
+STATE_BATCH = 1 << 12
+
+def _filter_stateful(
+    data: Iterable[Any],
+    create: Callable[[], Any],
+    states: Optional[List[Dict[str, Any]]],
+    columns: bool,
+    stream: bool,
+    filters: List[Any],
+    update: Optional[Callable[[Any], Callable[[float], Any]]] = None,
+) -> Iterator[Any]:
+    """Pass a series, or with `columns` each column of rows, through a
+    filter with state, such as `ab.AlphaBetaFilter`. The filter of each
+    column is made by `create`, restored from the state of that column if
+    any, and appended to `filters` so that its state can be saved once data
+    is exhausted.
+
+    Measurements are filtered in batches, unless streaming or given a
+    function from each filter to a function of one measurement.
+
+    Raises ValueError if states do not fit the filters.
+    """
+    def series_filter(series: Iterable[float]) -> Iterator[Any]:
+        _filter = create()
+        if states:
+            if len(filters) >= len(states):
+                raise ValueError("state has fewer columns than input")
+            try:
+                _filter.set_state(states[len(filters)])
+            except (KeyError, TypeError) as err:
+                raise ValueError(
+                    "missing or invalid value {0}".format(err),
+                ) from None
+        filters.append(_filter)
+        if update is not None:
+            return map(update(_filter), series)
+        elif stream:
+            return map(_filter.update, series)
+        return _update_batches(_filter, series)
+
+    if not columns:
+        return series_filter(data)
+    rows = _filter_columns(data, series_filter)
+    if states and len(filters) not in (0, len(states)):
+        raise ValueError("state has more columns than input")
+    return rows
+
+def _update_batches(
+    state_filter: Any,
+    series: Iterable[float],
+) -> Iterator[float]:
+    series = iter(series)
+    while True:
+        block = array.array("d", itertools.islice(series, STATE_BATCH))
+        if len(block) == 0:
+            return
+        yield from state_filter.update_batch(block)
+
+def _load_state(
+    filename: str,
+    method: str,
+) -> Optional[List[Dict[str, Any]]]:
+    """Read the state of each column saved by `_save_state`. Returns None if
+    the file cannot be read or is not a state of the method.
+    """
+    #NOTE: json imports re, so is only imported when needed
+    import json
+    try:
+        with open(filename) as f:
+            document = json.load(f)
+    except OSError:
+        _print_invalid_file(filename)
+        return None
+    except ValueError:
+        _print_invalid_state(filename, "not JSON")
+        return None
+    if not isinstance(document, dict) or document.get("method") != method:
+        _print_invalid_state(
+            filename, "not a state of '{0}'".format(method),
+        )
+        return None
+    states = document.get("columns")
+    if not isinstance(states, list) or not all(
+        isinstance(state, dict) for state in states
+    ):
+        _print_invalid_state(filename, "no state of columns")
+        return None
+    return states
+
+def _save_state(
+    filename: str,
+    method: str,
+    filters: List[Any],
+    states: Optional[List[Dict[str, Any]]],
+) -> bool:
+    """Replace a state file with the state of each filter or, if no data was
+    filtered, with the states that were loaded. Returns False if the file
+    cannot be written.
+    """
+    import json
+    if len(filters) > 0 or states is None:
+        states = [state_filter.get_state() for state_filter in filters]
+    partial = filename + ".partial"
+    try:
+        with open(partial, "w") as f:
+            json.dump({"method": method, "columns": states}, f)
+            f.write("\n")
+        os.replace(partial, filename)
+    except OSError:
+        return False
+    return True
+
+WRITE_BATCH = 1 << 12
+
+def _value_format(
+    precision: Optional[str] = None,
+) -> str:
+    """Draw the printf-style format of a value with `precision` decimal
+    places, or of its shortest representation that converts back exactly if
+    `precision` is 'repr'.
+    """
+    if precision is None:
+        return "%.4f"
+    elif precision == "repr":
+        return "%r"
     else:
-        for filename in filenames:
-            if filename == '-':
-                raw_data.extend(list(_read_stdin()))
-            else:
-                raw_data.extend(list(_read_file(filename)))
+        return "%.{0}f".format(int(precision))
 
-    return raw_data
+def _write_values(
+    values: Iterable[float],
+    output_format: str = "text",
+    stream: bool = False,
+    precision: Optional[str] = None,
+) -> None:
+    """Write estimates, one per line or packed in a binary format.
+
+    Text is formatted and written `WRITE_BATCH` lines at a time. In stream
+    mode, each estimate is written as soon as it is available.
+    """
+    observe = metrics.active.written if metrics.active is not None else None
+    if output_format != "text":
+        sys.stdout.flush()
+        formats.write(
+            sys.stdout.buffer,
+            values,
+            output_format,
+            batch=1 if stream else 1 << 16,
+            observe=observe,
+        )
+        return
+    if hasattr(values, "tolist"):
+        values = values.tolist()  # type: ignore
+    line = _value_format(precision) + "\n"
+    _write_lines(values, line, 1 if stream else WRITE_BATCH, observe=observe)
+
+def _write_rows(
+    rows: Iterable[Sequence[float]],
+    delimiter: Optional[str],
+    output_format: str = "text",
+    stream: bool = False,
+    precision: Optional[str] = None,
+) -> None:
+    if output_format != "text":
+        _write_values(rows, output_format, stream)  # type: ignore
+        return
+    if hasattr(rows, "tolist"):
+        rows = rows.tolist()  # type: ignore
+    rows = iter(rows)
+    first = next(rows, None)
+    if first is None:
+        return
+    separator = delimiter if delimiter is not None else "\t"
+    separator = separator.replace("%", "%%")
+    line = separator.join([_value_format(precision)] * len(first)) + "\n"
+    _write_lines(
+        itertools.chain.from_iterable(itertools.chain([first], rows)),
+        line,
+        1 if stream else WRITE_BATCH,
+        len(first),
+        metrics.active.written if metrics.active is not None else None,
+    )
+
+def _write_lines(
+    values: Iterable[Any],
+    line: str,
+    batch: int,
+    width: int = 1,
+    observe: Optional[Callable[[int, float], None]] = None,
+) -> None:
+    """Format values into lines of `width` values each, and write `batch`
+    lines at a time. If given, `observe` is called with the count of lines
+    and the seconds spent formatting and writing them.
+    """
+    values = iter(values)
+    lines = line * batch
+    while True:
+        block = tuple(itertools.islice(values, batch * width))
+        start = time.perf_counter() if observe is not None else 0.0
+        if len(block) == batch * width:
+            sys.stdout.write(lines % block)
+        elif len(block) > 0:
+            sys.stdout.write(line * (len(block) // width) % block)
+        if observe is not None and len(block) > 0:
+            observe(len(block) // width, time.perf_counter() - start)
+        if len(block) < batch * width:
+            break
+
+def _write_keyed(
+    rows: Iterable[Tuple[str, float]],
+    delimiter: Optional[str],
+    stream: bool = False,
+    precision: Optional[str] = None,
+) -> None:
+    """Write rows of a key and an estimate, separated by `delimiter`, or a
+    tab if none is given.
+    """
+    separator = delimiter if delimiter is not None else "\t"
+    line = "%s" + separator.replace("%", "%%") + _value_format(precision)
+    _write_lines(
+        itertools.chain.from_iterable(rows),
+        line + "\n",
+        1 if stream else WRITE_BATCH,
+        2,
+        metrics.active.written if metrics.active is not None else None,
+    )
+
+def _write_report_rows(
+    rows: Iterable[Tuple[Sequence[float], Sequence[float]]],
+) -> None:
+    for measured, estimated in rows:
+        sys.stdout.write(
+            "  ".join(
+                "{0:8.4f}  {1:8.4f}".format(*pair)
+                for pair in zip(measured, estimated)
+            ) + "\n",
+        )
+
+def _write_timed_report(
+    rows: Iterable[Tuple[Any, ...]],
+) -> None:
+    """Write rows of time, measurement, and estimates, where estimates
+    predicted without a measurement have none.
+    """
+    for row in rows:
+        measured = "       -" if row[1] is None else "{0:8.4f}".format(row[1])
+        sys.stdout.write(
+            "  ".join(
+                ["{0:8.4f}".format(row[0]), measured]
+                + ["{0:8.4f}".format(value) for value in row[2:]]
+            ) + "\n",
+        )
 
 def _print_help() -> None:
     _msg = "Usage: filter METHOD [OPTIONS] DATA\n"
@@ -100,13 +763,92 @@ def _print_invalid_methodology(method: str) -> None:
     )
     sys.stderr.write("\n".join(_msg) + "\n")
 
+def _print_invalid_backend(backend: str) -> None:
+    _msg = "{0}: Invalid backend '{1}'\n".format(sys.argv[0], backend)
+    sys.stderr.write(_msg)
+
+def _print_missing_backend(backend: str) -> None:
+    _msg = "{0}: Backend '{1}' is not available; using 'python'\n".format(
+        sys.argv[0], backend,
+    )
+    sys.stderr.write(_msg)
+
+def _print_invalid_boundary(boundary: str) -> None:
+    _msg = "{0}: Invalid boundary '{1}'\n".format(sys.argv[0], boundary)
+    sys.stderr.write(_msg)
+
+def _print_invalid_state_boundary(boundary: str) -> None:
+    _msg = "{0}: Cannot save or load state with boundary '{1}'\n".format(
+        sys.argv[0], boundary,
+    )
+    sys.stderr.write(_msg)
+
+def _print_per_file_state() -> None:
+    _msg = "{0}: Cannot save or load state with --per-file\n".format(
+        sys.argv[0],
+    )
+    sys.stderr.write(_msg)
+
+def _print_incompatible_options(first: str, second: str) -> None:
+    _msg = "{0}: Cannot use {1} with {2}\n".format(sys.argv[0], first, second)
+    sys.stderr.write(_msg)
+
+def _print_invalid_engine(engine: str) -> None:
+    _msg = "{0}: Invalid engine '{1}'\n".format(sys.argv[0], engine)
+    sys.stderr.write(_msg)
+
+def _print_invalid_format(data_format: str) -> None:
+    _msg = "{0}: Invalid format '{1}'\n".format(sys.argv[0], data_format)
+    sys.stderr.write(_msg)
+
+def _print_invalid_encoding(filename: str, reason: str) -> None:
+    _msg = "{0}: Cannot decode file '{1}': {2}\n".format(
+        sys.argv[0], filename, reason,
+    )
+    sys.stderr.write(_msg)
+
+def _print_invalid_precision(precision: str) -> None:
+    _msg = "{0}: Invalid precision '{1}'\n".format(sys.argv[0], precision)
+    sys.stderr.write(_msg)
+
+def _print_invalid_grid(option: str, grid: str) -> None:
+    _msg = "{0}: Invalid grid '{1}' for {2}\n".format(
+        sys.argv[0], grid, option,
+    )
+    sys.stderr.write(_msg)
+
+def _print_invalid_lag(lag: int) -> None:
+    _msg = "{0}: Invalid lag '{1}' (expected a non-negative integer)\n".format(
+        sys.argv[0], lag,
+    )
+    sys.stderr.write(_msg)
+
+def _print_invalid_variance(variance: float) -> None:
+    _msg = "{0}: Invalid variance '{1}' (expected a positive number)\n".format(
+        sys.argv[0], variance,
+    )
+    sys.stderr.write(_msg)
+
 def _print_invalid_file(filename: str) -> None:
     _msg = "{0}: Invalid file '{1}'\n".format(sys.argv[0], filename)
     sys.stderr.write(_msg)
 
 def _print_invalid_data(line: str) -> None:
+    if metrics.active is not None:
+        metrics.active.parse_error()
     _msg = "{0}: Cannot convert '{1}' into numeric value\n".format(
         sys.argv[0], line,
     )
     sys.stderr.write(_msg)
 
+def _print_invalid_state(filename: str, reason: str) -> None:
+    _msg = "{0}: Invalid state file '{1}': {2}\n".format(
+        sys.argv[0], filename, reason,
+    )
+    sys.stderr.write(_msg)
+
+def _print_invalid_timestamp(data_time: float) -> None:
+    _msg = "{0}: Time '{1}' does not follow the last measurement\n".format(
+        sys.argv[0], data_time,
+    )
+    sys.stderr.write(_msg)
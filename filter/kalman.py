@@ -6,44 +6,436 @@ estimate data.
 
 Options:
   -d, --delta     initial velocity of state per time unit [Default: 0]
+  --delta-sigma S std. deviation of velocity, by which the variance of state
+                    grows S² per squared time unit at every step [Default: 0]
   -i, --inital    initial estimate of state [Default: 0]
   -s, --sigma     initial std. deviation of state distribution [Default: 1]
   -v, --variance  variance of data measurements [Default: 1]
+  --backend NAME  filter by NAME, where NAME is one of 'python' or 'numpy'
+                    [Default: python]
+  --engine ENGINE
+                  compute estimates by ENGINE, where ENGINE is one of 'direct'
+                    or 'gain' [Default: direct]
+  --input-format FORMAT
+                  read data as FORMAT, where FORMAT is one of 'text',
+                    'f64le', 'f32le', or 'npy' [Default: text]
+  --output-format FORMAT
+                  write estimates as FORMAT [Default: text]
+  --precision N   write estimates with N decimal places, or as the
+                    shortest exact representation if N is 'repr'
+                    [Default: 4]
+  --multi-column  filter each column of input as a separate series
+  --delimiter D   with --multi-column, columns are separated by D
+                    [Default: whitespace]
+  --per-file      filter each file as a separate series, in parallel
+  -j N, --jobs N  with --per-file, filter N files at once
+                    [Default: number of CPUs]
+  --output-suffix S
+                  with --per-file, write estimates of each file to a
+                    file of the same name with suffix S, rather than
+                    to stdout
+  --metrics FILE  write runtime metrics to FILE in the Prometheus text
+                    format
+  --metrics-interval T
+                  with --metrics, rewrite FILE every T milliseconds
+                    [Default: 10000]
+  --stream        filter each measurement as soon as it is read
+  --flush N       in stream mode, flush output every N estimates [Default: 1]
+  --flush-interval T
+                  in stream mode, flush output every T milliseconds
+  --timestamps    read each line as the time of a measurement and the
+                    measurement, and predict by the time elapsed since the
+                    last; estimates are written after their time
+  --interval T    with --timestamps, predict an estimate every T time
+                    units after the last, until a measurement arrives
+                    within T/2 of the next prediction
+  --load-state FILE
+                  continue filtering from the state saved in FILE, in place
+                    of the initial state
+  --save-state FILE
+                  save the state after the last measurement to FILE
+  --process-noise Q
+                  track position and velocity with full covariance, where
+                    acceleration is random with variance Q per time unit
+                    [Default: 0]
+  --keyed         read each line as a key and a measurement, and filter the
+                    measurements of each key as a separate track; estimates
+                    are written after their key
+  --auto-variance estimate the variance of data measurements by maximum
+                    likelihood, in place of --variance
+  --auto-sigma    with --auto-variance, also estimate the std. deviation of
+                    the initial state
+  --smooth        correct each estimate by all later measurements
+  --lag L         correct each estimate by the L measurements after it, and
+                    write it as soon as those are read
 
-Currently assumed that acceleration is 0, velocity is non-variate, and the time
-unit is 1.
+Currently assumed that acceleration is 0, velocity is non-variate unless
+--delta-sigma is given, and the time unit is 1, except with --process-noise or
+--keyed.
+
+The 'gain' engine precomputes the variance of each step, which does not
+depend on the measurements, and updates estimates by the same arithmetic as
+the 'direct' engine. With --delta-sigma, the variance converges to a steady
+state, after which the gain is held constant; the variances until then are
+cached within the process, so columns and files filtered by one process
+share them. Without it, the variance keeps shrinking, and each step is
+computed as by the 'direct' engine.
+
+The 'numpy' backend steps through time, as estimates must round exactly as
+those of the 'python' backend, and vectorizes across the columns of
+--multi-column input. A single series is filtered by the 'gain' engine.
+
+With --timestamps, the initial state is one interval, or without
+--interval one time unit, before the first measurement. Input of a binary
+format holds times and measurements as consecutive values. Timestamps
+cannot be used with --multi-column or state.
+
+With --interval T, estimates are predicted at T, 2T, and so on after the last
+measurement, for as long as the next measurement is more than T/2 after the
+prediction; it is otherwise taken as on time, despite jitter. For example,
+after a measurement at 5.5 and with T=1, a measurement at 9 is preceded by
+predictions at 6.5 and 7.5, but not 8.5.
+
+The state of the filter is the estimate and its variance after the last
+measurement. Filtering new measurements from a saved state gives the same
+estimates as filtering them after all earlier measurements. With either
+--load-state or --save-state, the 'direct' engine and 'python' backend are
+used, and the variance must be positive.
+
+With --process-noise or --keyed, all tracks are held by one bank of filters,
+which updates every track measured at the same time at once; with the
+'numpy' backend, by vectorized operations. Each column of --multi-column
+input is a track. Keyed input is text, and tracks are added as new keys are
+read. The bank cannot be used with --timestamps, an engine, state, or
+--delta-sigma.
+
+With --auto-variance, all data is read before any is filtered. The estimates
+maximize the likelihood of the residuals of the filter, which for
+non-variate velocity depends only on a few sums over the measurements, so
+--delta-sigma cannot be given; the variance is shared by every column of
+--multi-column input. An estimated std. deviation of 0 means that
+measurements are consistent with the initial estimate being exact.
+
+Smoothed estimates are those of a Rauch-Tung-Striebel smoother, which runs
+the 'gain' engine forward over all measurements and then corrects each
+estimate backward from the last. Only the estimates of the forward pass are
+held. With --lag, the correction of each estimate stops L measurements
+later, so input can be streamed; estimates are written L measurements behind
+input, until the last L at the end. Smoothing uses the 'python' backend, and
+the variance must be positive.
+
+Without --process-noise or --delta-sigma, velocity is non-variate, so the
+state never departs from a straight line of slope --delta, and the smoother
+recovers that line: each smoothed estimate is the final estimate less the
+drift since, and with --lag, the estimate L measurements later less the
+drift. With --delta-sigma, the state wanders and is smoothed by its
+variance. With --process-noise, each series is smoothed as a track of the
+bank, correcting position and velocity by their full covariance; the
+position, velocity, and covariance of every step of the forward pass are
+held.
 """
 
-__all__ = ['cli_wrapper', 'filter', 'report']
+from __future__ import annotations
+
+__all__ = [
+    'KalmanFilter', 'cli_wrapper', 'estimate_variance', 'filter',
+    'filter_gain', 'filter_timed', 'report', 'smooth', 'smooth_lagged',
+]
 
 import sys
-from typing import Callable, List, Dict, Iterator, Tuple
+import math
+import array
+import itertools
+import functools
+import collections
+from collections.abc import Sequence
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import (
+        Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional,
+        Tuple,
+    )
+
+from . import internals
 
-def cli_wrapper(**data: Dict):
+def cli_wrapper(**data: Any):
     """Handler for the Kalman filter. Checks and cleans given options,
     and performs optional reporting.
     """
     _raw = data["data_raw"]
+    if data["auto_variance"] and not isinstance(_raw, Sequence):
+        #NOTE: data is read once to estimate the variance, then filtered
+        _raw = list(_raw) if data["columns"] else array.array("d", _raw)
+    _measured = _raw
+    if data["report"] and not isinstance(_raw, Sequence):
+        _raw, _measured = itertools.tee(_raw)
     _variance = data["variance"] if data["variance"] is not None else 1
     _init_state_mu = data["initial_estimate"]
     _init_state_sigma = data["initial_std_deviation"]
     _init_velocity_mu = data["delta"] if data["delta"] is not None else 0
 
-    _init_velocity_sigma = 0 #non-variate velocity
+    _init_velocity_sigma = (
+        data["delta_sigma"] if data["delta_sigma"] is not None else 0
+    )
     _time = 1.0 #constant time unit
     _acceleration = lambda x: x #constant acceleration
 
+    if data["auto_variance"]:
+        _variance, _init_state_sigma = estimate_variance(
+            _raw,
+            _init_state_mu,
+            _init_state_sigma,
+            _init_velocity_mu,
+            _time,
+            fit_sigma=data["auto_sigma"],
+            columns=data["columns"],
+        )
+
+    _engine = data["engine"] if data["engine"] is not None else "direct"
+    if _engine not in ("direct", "gain"):
+        internals._print_invalid_engine(_engine)
+        sys.exit(1)
+
+    if data["timestamps"]:
+        _timed = filter_timed(
+            internals._timed_measurements(_raw, data["input_format"]),
+            _variance,
+            _init_state_mu,
+            _init_state_sigma,
+            _init_velocity_mu,
+            _init_velocity_sigma,
+            data["interval"],
+        )
+        if data["report"]:
+            sys.stdout.write(
+                report_header(
+                    _variance,
+                    _init_state_mu,
+                    _init_state_sigma,
+                    _init_velocity_mu,
+                    _init_velocity_sigma,
+                    _acceleration,
+                    _time,
+                    timed=True,
+                ),
+            )
+            internals._write_timed_report(_timed)
+        else:
+            internals._write_rows(
+                (
+                    (data_time, estimated)
+                    for data_time, _, estimated, _ in _timed
+                ),
+                data["delimiter"],
+                data["output_format"],
+                data["stream"],
+                data["precision"],
+            )
+        return
+
+    _bank = None
+    if data["bank"]:
+        from . import bank
+        try:
+            _bank = bank.KalmanBank(
+                variance=_variance,
+                process_noise=data["process_noise"] or 0.0,
+                init_state_mu=_init_state_mu,
+                init_state_sigma=_init_state_sigma,
+                init_velocity_mu=_init_velocity_mu,
+                init_velocity_sigma=_init_velocity_sigma,
+                time=_time,
+                vectorize=data["backend"] == "numpy",
+            )
+        except ValueError:
+            internals._print_invalid_variance(_variance)
+            sys.exit(1)
+
+    if data["keyed"] and _bank is not None:
+        _keyed = bank.filter_keyed(_raw, _bank)
+        if data["report"]:
+            sys.stdout.write(
+                report_header(
+                    _variance,
+                    _init_state_mu,
+                    _init_state_sigma,
+                    _init_velocity_mu,
+                    _init_velocity_sigma,
+                    _acceleration,
+                    _time,
+                    process_noise=data["process_noise"],
+                    keyed=True,
+                ),
+            )
+            for key, measured, estimated, variance in _keyed:
+                sys.stdout.write(
+                    "{0:8}  {1:8.4f}  {2:8.4f}  {3:8.4f}\n".format(
+                        key, measured, estimated, variance,
+                    ),
+                )
+        else:
+            internals._write_keyed(
+                ((key, estimated) for key, _, estimated, _ in _keyed),
+                data["delimiter"],
+                data["stream"],
+                data["precision"],
+            )
+        return
+
+    if data["smooth"] and not _variance > 0:
+        internals._print_invalid_variance(_variance)
+        sys.exit(1)
 
-    _filter = filter(
-        _raw,
-        _variance,
-        _init_state_mu,
-        _init_state_sigma,
-        _init_velocity_mu,
-        _init_velocity_sigma,
-        _acceleration,
-        _time,
+    _states = None
+    if data["load_state"] is not None:
+        _states = internals._load_state(data["load_state"], "kalman")
+        if _states is None:
+            sys.exit(1)
+    _filters: List[KalmanFilter] = list()
+    _stateful = (
+        data["load_state"] is not None or data["save_state"] is not None
     )
+    if _stateful and not _variance > 0:
+        internals._print_invalid_variance(_variance)
+        sys.exit(1)
+
+    _estimates: Optional[Iterable] = None
+
+    if _stateful:
+        #NOTE: state is carried by the direct engine in Python only
+        try:
+            _stateful_filter = internals._filter_stateful(
+                _raw,
+                functools.partial(
+                    KalmanFilter,
+                    _variance,
+                    _init_state_mu,
+                    _init_state_sigma,
+                    _init_velocity_mu,
+                    _init_velocity_sigma,
+                    _time,
+                ),
+                _states,
+                data["columns"],
+                data["stream"],
+                _filters,
+                update=_update_with_variance if data["report"] else None,
+            )
+        except ValueError as err:
+            internals._print_invalid_state(data["load_state"], str(err))
+            sys.exit(1)
+        if not data["report"]:
+            _estimates = _stateful_filter
+        elif data["columns"]:
+            _filter: Iterable[Tuple[Any, float]] = (
+                (tuple(estimated for estimated, _ in row), row[0][1])
+                for row in _stateful_filter
+            )
+        else:
+            _filter = _stateful_filter
+    elif data["smooth"]:
+        if _bank is not None:
+            #NOTE: each series is smoothed alone, as a track of the bank
+            _series_filter: Callable[..., Any] = functools.partial(
+                bank.smooth_lagged if data["lag"] is not None else bank.smooth,
+                process_noise=data["process_noise"] or 0.0,
+            )
+        elif data["lag"] is not None:
+            _series_filter = smooth_lagged
+        else:
+            _series_filter = smooth
+        if data["lag"] is not None:
+            _series_filter = functools.partial(
+                _series_filter, lag=data["lag"],
+            )
+        _series_filter = functools.partial(
+            _series_filter,
+            variance=_variance,
+            init_state_mu=_init_state_mu,
+            init_state_sigma=_init_state_sigma,
+            init_velocity_mu=_init_velocity_mu,
+            init_velocity_sigma=_init_velocity_sigma,
+            time=_time,
+        )
+        if data["columns"]:
+            _filter = (
+                (tuple(estimated for estimated, _ in row), row[0][1])
+                for row in internals._filter_columns(_raw, _series_filter)
+            )
+        else:
+            _filter = _series_filter(_raw)
+    elif _bank is not None:
+        #NOTE: the bank reads blocks of rows, each a measurement of all tracks
+        if data["report"]:
+            _raw, _measured = itertools.tee(_raw)
+            _measured = itertools.chain.from_iterable(_measured)
+            if not data["columns"]:
+                _measured = (row[0] for row in _measured)
+        _filter = bank.filter_columns(_raw, _bank)
+        if not data["columns"]:
+            _filter = (
+                (estimated[0], variance) for estimated, variance in _filter
+            )
+    elif data["backend"] == "numpy" and _variance != 0:
+        from . import vectorized
+        _estimated, _variances = vectorized.kalman_filter(
+            _raw,
+            _variance,
+            _init_state_mu,
+            _init_state_sigma,
+            _init_velocity_mu,
+            _init_velocity_sigma,
+            _time,
+        )
+        _filter = zip(_estimated, _variances)
+        _estimates = _estimated
+    elif data["columns"]:
+        if _engine == "gain" and _variance != 0:
+            _series_filter = functools.partial(
+                filter_gain,
+                time=_time,
+            )
+        else:
+            _series_filter = functools.partial(
+                filter,
+                acceleration=_acceleration,
+                time=_time,
+            )
+        _series_filter = functools.partial(
+            _series_filter,
+            variance=_variance,
+            init_state_mu=_init_state_mu,
+            init_state_sigma=_init_state_sigma,
+            init_velocity_mu=_init_velocity_mu,
+            init_velocity_sigma=_init_velocity_sigma,
+        )
+        #NOTE: variance of estimates is the same in every column
+        _filter = (
+            (tuple(estimated for estimated, _ in row), row[0][1])
+            for row in internals._filter_columns(_raw, _series_filter)
+        )
+    elif _engine == "gain" and _variance != 0:
+        _filter = filter_gain(
+            _raw,
+            _variance,
+            _init_state_mu,
+            _init_state_sigma,
+            _init_velocity_mu,
+            _init_velocity_sigma,
+            _time,
+        )
+    else:
+        _filter = filter(
+            _raw,
+            _variance,
+            _init_state_mu,
+            _init_state_sigma,
+            _init_velocity_mu,
+            _init_velocity_sigma,
+            _acceleration,
+            _time,
+        )
 
     if data["report"]:
         sys.stdout.write(
@@ -55,18 +447,48 @@ def cli_wrapper(**data: Dict):
                 _init_velocity_sigma,
                 _acceleration,
                 _time,
+                process_noise=data["process_noise"],
             ),
         )
-        for measured, filtered in zip(_raw, _filter):
+        for measured, filtered in zip(_measured, _filter):
             estimated, variance = filtered
-            sys.stdout.write(
-                "{0:8.4f}  {1:8.4f}  {2:8.4f}\n".format(
-                    measured, estimated, variance,
-                ),
-            )
+            if data["columns"]:
+                sys.stdout.write(
+                    "".join(
+                        "{0:8.4f}  {1:8.4f}  ".format(*pair)
+                        for pair in zip(measured, estimated)
+                    ) + "{0:8.4f}\n".format(variance),
+                )
+            else:
+                sys.stdout.write(
+                    "{0:8.4f}  {1:8.4f}  {2:8.4f}\n".format(
+                        measured, estimated, variance,
+                    ),
+                )
     else:
-        for estimated, _ in _filter:
-            sys.stdout.write("{0:.4f}\n".format(estimated))
+        if _estimates is None:
+            _estimates = (estimated for estimated, _ in _filter)
+        if data["columns"]:
+            internals._write_rows(
+                _estimates,
+                data["delimiter"],
+                data["output_format"],
+                data["stream"],
+                data["precision"],
+            )
+        else:
+            internals._write_values(
+                _estimates,
+                data["output_format"],
+                data["stream"],
+                data["precision"],
+            )
+
+    if data["save_state"] is not None and not internals._save_state(
+        data["save_state"], "kalman", _filters, _states,
+    ):
+        internals._print_invalid_file(data["save_state"])
+        sys.exit(1)
 
 def filter(
     data: List[float],
@@ -102,6 +524,407 @@ def filter(
 
         yield estimated
 
+def filter_gain(
+    data: Iterable[float],
+    variance: float,
+    init_state_mu: float,
+    init_state_sigma: float,
+    init_velocity_mu: float,
+    init_velocity_sigma: float,
+    time: float,
+) -> Iterator[Tuple[float,float]]:
+    """Iterate over data, passing it through a Kalman filter with constant
+    velocity. Equivalent to `filter`, computing each estimate by the same
+    arithmetic, but the variance of each step is computed independently of
+    the measurements.
+
+    Without variance in velocity, the variance of estimates is updated
+    alongside them, and estimates are exactly those of `filter`. Otherwise,
+    the prior variance of each step is computed in advance until it
+    converges to a steady state, and is then constant; from then on,
+    estimates may differ from those of `filter` in the last place.
+
+    Arguments:
+      data                 measurement from each time interval
+      variance             variance of measurements; must be non-zero
+      init_state_mu        initial estimate of state
+      init_state_sigma     std. deviation of state distribution
+      init_velocity_mu     initial estimate of velocity
+      init_velocity_sigma  std. deviation of velocity distribution
+      time                 time unit
+    """
+    posterior = init_state_sigma**2
+    process_variance = init_velocity_sigma**2 * time**2
+    drift = init_velocity_mu * time
+    estimated = init_state_mu
+    data = iter(data)
+
+    transient: Tuple[float, ...] = ()
+    steady: Optional[float] = None
+    if process_variance != 0:
+        transient, steady = _priors(variance, posterior, process_variance)
+    for prior, measurement in zip(transient, data):
+        denominator = prior + variance
+        estimated = (
+            ((estimated + drift) * variance) + (measurement * prior)
+        ) / denominator
+        posterior = (prior * variance) / denominator
+        yield estimated, posterior
+
+    if steady is not None:
+        prior = steady
+        denominator = prior + variance
+        posterior = (prior * variance) / denominator
+        for measurement in data:
+            estimated = (
+                ((estimated + drift) * variance) + (measurement * prior)
+            ) / denominator
+            yield estimated, posterior
+        return
+
+    for measurement in data:
+        prior = posterior + process_variance
+        denominator = prior + variance
+        estimated = (
+            ((estimated + drift) * variance) + (measurement * prior)
+        ) / denominator
+        posterior = (prior * variance) / denominator
+        yield estimated, posterior
+
+def smooth(
+    data: Iterable[float],
+    variance: float,
+    init_state_mu: float,
+    init_state_sigma: float,
+    init_velocity_mu: float,
+    init_velocity_sigma: float,
+    time: float,
+) -> Iterator[Tuple[float,float]]:
+    """Iterate over data, passing it through a Rauch-Tung-Striebel smoother:
+    the forward pass of `filter_gain`, then a backward pass that corrects
+    each estimate by all later measurements.
+
+    Variances of the forward pass do not depend on the measurements, so only
+    its estimates are held, and smoothed in place. Variances and gains are
+    recomputed in the backward pass from the gain schedule of `filter_gain`.
+
+    Arguments:
+      data                 measurement from each time interval
+      variance             variance of measurements; must be positive
+      init_state_mu        initial estimate of state
+      init_state_sigma     std. deviation of state distribution
+      init_velocity_mu     initial estimate of velocity
+      init_velocity_sigma  std. deviation of velocity distribution
+      time                 time unit
+    """
+    process_variance = (init_velocity_sigma * time)**2
+    drift = init_velocity_mu * time
+    gain = _gain_schedule(variance, init_state_sigma**2, process_variance)
+
+    estimates = array.array("d")
+    for estimated, _ in filter_gain(
+        data,
+        variance,
+        init_state_mu,
+        init_state_sigma,
+        init_velocity_mu,
+        init_velocity_sigma,
+        time,
+    ):
+        estimates.append(estimated)
+    if len(estimates) == 0:
+        return
+
+    variances = array.array("d", [0.0]) * len(estimates)
+    smoothed = (estimates[-1], gain(len(estimates)) * variance, )
+    variances[-1] = smoothed[1]
+    for index in range(len(estimates) - 2, -1, -1):
+        smoothed = _smooth_step(
+            (estimates[index], gain(index + 1) * variance, ),
+            smoothed,
+            process_variance,
+            drift,
+        )
+        estimates[index], variances[index] = smoothed
+    yield from zip(estimates, variances)
+
+def smooth_lagged(
+    data: Iterable[float],
+    variance: float,
+    init_state_mu: float,
+    init_state_sigma: float,
+    init_velocity_mu: float,
+    init_velocity_sigma: float,
+    time: float,
+    lag: int,
+) -> Iterator[Tuple[float,float]]:
+    """Iterate over data, passing it through a fixed-lag smoother: each
+    estimate of `filter_gain` is corrected by up to `lag` later measurements,
+    and yielded as soon as those are read. The last estimates are corrected by
+    the measurements that remain.
+
+    Arguments:
+      data                 measurement from each time interval
+      variance             variance of measurements; must be positive
+      init_state_mu        initial estimate of state
+      init_state_sigma     std. deviation of state distribution
+      init_velocity_mu     initial estimate of velocity
+      init_velocity_sigma  std. deviation of velocity distribution
+      time                 time unit
+      lag                  count of later measurements to smooth by
+    """
+    process_variance = (init_velocity_sigma * time)**2
+    drift = init_velocity_mu * time
+    window: Deque[Tuple[float, float]] = collections.deque(maxlen=lag + 1)
+
+    def smoothed() -> List[Tuple[float, float]]:
+        _window = reversed(window)
+        _smoothed = [next(_window)]
+        for filtered in _window:
+            _smoothed.append(
+                _smooth_step(
+                    filtered, _smoothed[-1], process_variance, drift,
+                ),
+            )
+        _smoothed.reverse()
+        return _smoothed
+
+    for filtered in filter_gain(
+        data,
+        variance,
+        init_state_mu,
+        init_state_sigma,
+        init_velocity_mu,
+        init_velocity_sigma,
+        time,
+    ):
+        window.append(filtered)
+        if len(window) > lag:
+            yield smoothed()[0]
+    if len(window) > lag:
+        #NOTE: the oldest estimate was yielded with the last measurement
+        yield from smoothed()[1:]
+    elif len(window) > 0:
+        yield from smoothed()
+
+def estimate_variance(
+    data: Iterable[Any],
+    init_state_mu: float,
+    init_state_sigma: float,
+    init_velocity_mu: float,
+    time: float,
+    fit_sigma: bool = False,
+    columns: bool = False,
+) -> Tuple[float, float]:
+    """Estimate the variance of measurements, and if `fit_sigma` is set the
+    std. deviation of the initial state, by maximum likelihood of the
+    residuals of a Kalman filter with non-variate velocity. Returns the
+    variance and the std. deviation.
+
+    With non-variate velocity, each measurement is the initial state plus
+    drift plus noise, so the log-likelihood of residuals depends on data only
+    through the count, mean, and sum of squared deviations of measurements
+    less drift. These are computed in one pass; each evaluation of the
+    likelihood is then constant time, and is maximized by golden-section
+    search over the logarithm of the variance.
+
+    Arguments:
+      data                 measurement from each time interval, or rows of
+                             measurements if `columns` is set
+      init_state_mu        initial estimate of state
+      init_state_sigma     std. deviation of state distribution, if not fit
+      init_velocity_mu     initial estimate of velocity
+      time                 time unit
+      fit_sigma            also estimate the std. deviation of state
+      columns              data are rows, with a series in each column,
+                             sharing the variance and std. deviation
+    """
+    series: Iterable[Iterable[float]] = [data] if not columns else zip(*data)
+    statistics = [
+        _measurement_statistics(column, init_state_mu, init_velocity_mu * time)
+        for column in series
+    ]
+    statistics = [stats for stats in statistics if stats[0] > 0]
+    if len(statistics) == 0:
+        return 1.0, init_state_sigma
+
+    count = sum(stats[0] for stats in statistics)
+    deviation = sum(stats[2] for stats in statistics)
+    offset = max(stats[1]**2 for stats in statistics)
+    scale = (
+        deviation / (count - len(statistics)) if count > len(statistics)
+        else offset or 1.0
+    ) or 1.0
+
+    def likelihood(variance: float, sigma: float) -> float:
+        total = 0.0
+        for _count, _offset, _deviation in statistics:
+            prior = sigma**2 + (variance / _count)
+            total -= (
+                ((_count - 1) * math.log(variance))
+                + (_deviation / variance)
+                + math.log(prior)
+                + ((_offset**2) / prior)
+            )
+        return total / 2
+
+    def profile(log_variance: float) -> Tuple[float, float]:
+        variance = math.exp(log_variance)
+        if not fit_sigma:
+            return likelihood(variance, init_state_sigma), init_state_sigma
+        sigma = _golden(
+            lambda _sigma: likelihood(variance, _sigma),
+            0.0,
+            2.0 * math.sqrt(offset + variance),
+        )
+        return likelihood(variance, sigma), sigma
+
+    log_variance = _golden(
+        lambda _log_variance: profile(_log_variance)[0],
+        math.log(scale) - (ESTIMATE_RANGE * math.log(10)),
+        math.log(scale) + (ESTIMATE_RANGE * math.log(10)),
+    )
+    return math.exp(log_variance), profile(log_variance)[1]
+
+def filter_timed(
+    data: Iterable[Tuple[float, float]],
+    variance: float,
+    init_state_mu: float,
+    init_state_sigma: float,
+    init_velocity_mu: float,
+    init_velocity_sigma: float,
+    interval: Optional[float] = None,
+) -> Iterator[Tuple[float, Optional[float], float, float]]:
+    """Iterate over timestamped data, passing it through a Kalman filter that
+    predicts by the time elapsed since the last measurement. Yields the time,
+    the measurement, the estimate, and its variance.
+
+    Given an interval, an estimate is also predicted at every interval
+    without a measurement, and yielded with no measurement.
+
+    Arguments:
+      data                 pairs of time and measurement, in increasing time
+      variance             variance of measurements
+      init_state_mu        initial estimate of state, one interval or one
+                             time unit before the first measurement
+      init_state_sigma     std. deviation of state distribution
+      init_velocity_mu     initial estimate of velocity
+      init_velocity_sigma  std. deviation of velocity distribution
+      interval             expected time between measurements
+    """
+    estimated = (init_state_mu, init_state_sigma**2, )
+    velocity = (init_velocity_mu, init_velocity_sigma**2, )
+    last_time: Optional[float] = None
+
+    for data_time, measurement in data:
+        if last_time is None:
+            elapsed = interval if interval is not None else 1.0
+        else:
+            for predicted_time in internals._missing_times(
+                last_time, data_time, interval,
+            ):
+                estimated = _add(
+                    estimated,
+                    _multiply(velocity, (predicted_time - last_time, 0, )),
+                )
+                last_time = predicted_time
+                yield (predicted_time, None) + estimated
+            elapsed = data_time - last_time
+
+        estimated = _add(estimated, _multiply(velocity, (elapsed, 0, )))
+        estimated = _multiply(estimated, (measurement, variance, ))
+        last_time = data_time
+        yield (data_time, measurement) + estimated
+
+class KalmanFilter:
+    """Kalman filter of one series with constant velocity, updated a
+    measurement at a time. Estimates are those of `filter`.
+
+    Arguments:
+      variance             variance of measurements; must be positive
+      init_state_mu        initial estimate of state
+      init_state_sigma     std. deviation of state distribution
+      init_velocity_mu     initial estimate of velocity
+      init_velocity_sigma  std. deviation of velocity distribution
+      time                 time unit
+
+    The variance of the latest estimate is kept as `estimate_variance`.
+    """
+
+    __slots__ = (
+        'variance', 'estimate', 'estimate_variance', 'drift',
+        'process_variance',
+    )
+
+    def __init__(
+        self,
+        variance: float = 1.0,
+        init_state_mu: float = 0.0,
+        init_state_sigma: float = 1.0,
+        init_velocity_mu: float = 0.0,
+        init_velocity_sigma: float = 0.0,
+        time: float = 1.0,
+    ) -> None:
+        if not variance > 0:
+            raise ValueError("variance of measurements must be positive")
+        self.variance = variance
+        self.estimate = init_state_mu
+        self.estimate_variance = init_state_sigma**2
+        self.drift = init_velocity_mu * time
+        self.process_variance = init_velocity_sigma**2 * time**2
+
+    def update(
+        self,
+        measured: float,
+    ) -> float:
+        """Correct the state by one measurement. Returns the estimate."""
+        estimated = self.estimate + self.drift
+        prior = self.estimate_variance + self.process_variance
+        _denom = prior + self.variance
+        self.estimate = (
+            ((estimated * self.variance) + (measured * prior)) / _denom
+        )
+        self.estimate_variance = (prior * self.variance) / _denom
+        return self.estimate
+
+    def update_batch(
+        self,
+        buffer: Any,
+    ) -> array.array:
+        """Correct the state by each measurement of a buffer in turn.
+        Returns the estimates.
+        """
+        estimates = internals._buffer_array(buffer)
+        variance, drift = self.variance, self.drift
+        process_variance = self.process_variance
+        estimated, posterior = self.estimate, self.estimate_variance
+        for index, measured in enumerate(estimates):
+            prior = posterior + process_variance
+            _denom = prior + variance
+            estimated = (
+                ((estimated + drift) * variance) + (measured * prior)
+            ) / _denom
+            posterior = (prior * variance) / _denom
+            estimates[index] = estimated
+        self.estimate, self.estimate_variance = estimated, posterior
+        return estimates
+
+    def get_state(self) -> Dict[str, Any]:
+        """Draw the state after the latest measurement, such that filtering
+        can continue from it by `set_state`.
+        """
+        return {
+            "estimate": self.estimate,
+            "estimate_variance": self.estimate_variance,
+        }
+
+    def set_state(
+        self,
+        state: Dict[str, Any],
+    ) -> None:
+        self.estimate = float(state["estimate"])
+        self.estimate_variance = float(state["estimate_variance"])
+
 def report_header(
     variance: float,
     init_state_mu: float,
@@ -110,6 +933,9 @@ def report_header(
     init_velocity_sigma: float,
     acceleration: Callable[[float], float],
     time: float,
+    timed: bool = False,
+    process_noise: Optional[float] = None,
+    keyed: bool = False,
 ) -> str:
     """Draw a report header summarizing the filter.
 
@@ -125,9 +951,11 @@ def report_header(
     ```
 
     The estimates and variances then should be printed alongside the raw
-    measurements.
+    measurements, and if `timed` or `keyed` is set, after the time or key of
+    each. Given `process_noise`, its variance is summarized as well.
     """
-    _msg = (
+    _column = "Time:     " if timed else "Key:      " if keyed else ""
+    _msg = [
         "Kalman filter",
         "  Distribution of estimated initial state: N({0},{1}²)".format(
             init_state_mu, init_state_sigma,
@@ -136,11 +964,143 @@ def report_header(
             init_velocity_mu, init_velocity_sigma,
         ),
         "  Variance of measurements: {0}".format(variance),
-        "Raw:      Est.:     Var.:",
-        "========  ========  ========",
-    )
+        _column + "Raw:      Est.:     Var.:",
+        ("========  " if _column else "") + "========  ========  ========",
+    ]
+    if process_noise is not None:
+        _msg.insert(
+            4,
+            "  Variance of acceleration per time unit: {0}".format(
+                process_noise,
+            ),
+        )
     return "\n".join(_msg) + "\n"
 
+def _update_with_variance(
+    kalman: KalmanFilter,
+) -> Callable[[float], Tuple[float, float]]:
+    """Update a filter by one measurement at a time, returning the estimate
+    alongside its variance.
+    """
+    def update(measured: float) -> Tuple[float, float]:
+        return kalman.update(measured), kalman.estimate_variance
+
+    return update
+
+#NOTE: variances are searched within this many orders of magnitude of the
+#      sample variance
+ESTIMATE_RANGE = 12
+
+def _measurement_statistics(
+    data: Iterable[float],
+    init_state_mu: float,
+    drift: float,
+) -> Tuple[int, float, float]:
+    """Compute the count of measurements less the drift of each step, the
+    difference of their mean from the initial estimate, and the sum of their
+    squared deviations from that mean.
+    """
+    values = array.array("d", data)
+    if drift != 0:
+        for index in range(len(values)):
+            values[index] -= (index + 1) * drift
+    if len(values) == 0:
+        return 0, 0.0, 0.0
+    mean = math.fsum(values) / len(values)
+    deviation = math.fsum((value - mean)**2 for value in values)
+    return len(values), mean - init_state_mu, deviation
+
+def _golden(
+    function: Callable[[float], float],
+    low: float,
+    high: float,
+    tolerance: float = 1e-10,
+) -> float:
+    """Find the maximum of a unimodal function between `low` and `high` by
+    golden-section search.
+    """
+    ratio = (math.sqrt(5.0) - 1.0) / 2.0
+    left = high - (ratio * (high - low))
+    right = low + (ratio * (high - low))
+    left_value, right_value = function(left), function(right)
+    while (high - low) > tolerance * max(1.0, abs(low) + abs(high)):
+        if left_value >= right_value:
+            high, right, right_value = right, left, left_value
+            left = high - (ratio * (high - low))
+            left_value = function(left)
+        else:
+            low, left, left_value = left, right, right_value
+            right = low + (ratio * (high - low))
+            right_value = function(right)
+    return (low + high) / 2
+
+def _smooth_step(
+    filtered: Tuple[float, float],
+    smoothed: Tuple[float, float],
+    process_variance: float,
+    drift: float,
+) -> Tuple[float, float]:
+    """Smooth a filtered estimate and its variance by the smoothed estimate
+    and variance of the next step. Where the prediction of the next step has
+    no variance, the filtered estimate is exact and kept as is.
+    """
+    estimated, posterior = filtered
+    prior = posterior + process_variance
+    gain = posterior / prior if prior > 0 else 0.0
+    return (
+        estimated + (gain * (smoothed[0] - estimated - drift)),
+        posterior + (gain * gain * (smoothed[1] - prior)),
+    )
+
+def _gain_schedule(
+    variance: float,
+    init_variance: float,
+    process_variance: float,
+) -> Callable[[int], float]:
+    """Create a function of the gain of each step of `filter_gain`, counted
+    from 1.
+    """
+    if process_variance == 0:
+        return lambda step: init_variance / (variance + (step * init_variance))
+    transient, steady = _priors(variance, init_variance, process_variance)
+    gains = [prior / (prior + variance) for prior in transient]
+    if steady is None:
+        #NOTE: gains past those computed change too little to matter
+        steady = transient[-1]
+    gain = steady / (steady + variance)
+    return lambda step: gains[step - 1] if step <= len(gains) else gain
+
+#NOTE: relative change of the variance of estimates below which it is held
+#      steady; a few units in the last place
+TOLERANCE = 1e-15
+
+@functools.lru_cache(maxsize=64)
+def _priors(
+    variance: float,
+    init_variance: float,
+    process_variance: float,
+    limit: int = 100000,
+) -> Tuple[Tuple[float, ...], Optional[float]]:
+    """Compute the prior variance of each step, as `filter` does, until the
+    variance of estimates changes by less than `TOLERANCE` relative to it.
+    Returns the transient variances and the steady-state variance, or None
+    if variances have not converged within `limit` steps.
+
+    Variances are cached by the variances they depend on for the life of the
+    process, so that each column of --multi-column input, or each series of
+    a library caller, reuses them.
+    """
+    transient: List[float] = list()
+    posterior = init_variance
+    while len(transient) < limit:
+        prior = posterior + process_variance
+        transient.append(prior)
+        _posterior = (prior * variance) / (prior + variance)
+        if abs(_posterior - posterior) <= TOLERANCE * abs(_posterior):
+            return tuple(transient), _posterior + process_variance
+        posterior = _posterior
+    return tuple(transient), None
+
 def _add(
     x: Tuple[float, float],
     y: Tuple[float, float],
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+
+"""Runtime metrics of a filter, written in the Prometheus text format.
+
+Metrics are:
+  filter_samples_read_total     measurements decoded from input
+  filter_samples_emitted_total  estimates written to output, excluding reports
+  filter_parse_errors_total     lines of input that could not be converted
+  filter_stage_seconds_total    time spent by stage, where the stage is one of
+                                  'read', 'parse', 'filter', or 'format'
+  filter_latency_seconds        histogram of the time from reading each
+                                  measurement to writing its estimate
+
+Collection is off unless `enable` is called. Instrumented code checks
+`active` once per block of values, so that disabled metrics cost next to
+nothing.
+
+Measurements are timestamped by block as they are decoded, and estimates are
+matched to measurements in order as they are written.
+"""
+
+from __future__ import annotations
+
+__all__ = [
+    'LATENCY_BUCKETS', 'Collector', 'Timing', 'active', 'decoder', 'enable',
+    'reset', 'timing',
+]
+
+import os
+import time
+import bisect
+import collections
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Any, Callable, Dict, Optional, Sequence
+
+LATENCY_BUCKETS = (
+    0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0,
+)
+
+class Collector:
+    """Counters of one process. Counters of other processes are added by
+    `merge`.
+    """
+
+    def __init__(
+        self,
+        filename: Optional[str],
+        interval: Optional[float],
+        method: str,
+    ) -> None:
+        self.filename = filename
+        self.interval = interval
+        self.method = method
+        self.read = 0
+        self.emitted = 0
+        self.errors = 0
+        self.seconds = {"busy": 0.0, "read": 0.0, "parse": 0.0, "format": 0.0}
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.latency = 0.0
+        self.pending: collections.deque = collections.deque()
+        self.deadline = time.monotonic() + (interval or 0)
+
+    def waited(
+        self,
+        seconds: float,
+    ) -> None:
+        """Count time spent reading, or waiting on, input."""
+        self.seconds["read"] += seconds
+
+    def decoded(
+        self,
+        count: int,
+        seconds: float,
+    ) -> None:
+        """Count measurements that took `seconds` to decode."""
+        self.read += count
+        self.seconds["parse"] += seconds
+        if count > 0:
+            self.pending.append([count, time.perf_counter()])
+        self._poll()
+
+    def written(
+        self,
+        count: int,
+        seconds: float,
+    ) -> None:
+        """Count estimates that took `seconds` to format and write, and
+        observe the latency of each since its measurement was decoded.
+        """
+        now = time.perf_counter()
+        self.emitted += count
+        self.seconds["format"] += seconds
+        while count > 0 and len(self.pending) > 0:
+            entry = self.pending[0]
+            taken = min(count, entry[0])
+            latency = now - entry[1]
+            self.buckets[bisect.bisect_left(LATENCY_BUCKETS, latency)] += taken
+            self.latency += latency * taken
+            count -= taken
+            entry[0] -= taken
+            if entry[0] == 0:
+                self.pending.popleft()
+        self._poll()
+
+    def parse_error(self) -> None:
+        self.errors += 1
+
+    def timing(self) -> Timing:
+        """Time reading, filtering, and writing one series. Whatever of that
+        time is not spent reading, parsing, or formatting is counted as
+        filtering.
+        """
+        return Timing(self)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "read": self.read,
+            "emitted": self.emitted,
+            "errors": self.errors,
+            "seconds": dict(self.seconds),
+            "buckets": list(self.buckets),
+            "latency": self.latency,
+        }
+
+    def merge(
+        self,
+        snapshot: Dict[str, Any],
+    ) -> None:
+        self.read += snapshot["read"]
+        self.emitted += snapshot["emitted"]
+        self.errors += snapshot["errors"]
+        for stage, seconds in snapshot["seconds"].items():
+            self.seconds[stage] += seconds
+        for index, count in enumerate(snapshot["buckets"]):
+            self.buckets[index] += count
+        self.latency += snapshot["latency"]
+        self._poll()
+
+    def render(self) -> str:
+        _label = 'method="{0}"'.format(self.method)
+        _stages = {
+            "read": self.seconds["read"],
+            "parse": self.seconds["parse"],
+            "filter": max(
+                0.0,
+                self.seconds["busy"] - self.seconds["read"]
+                - self.seconds["parse"] - self.seconds["format"],
+            ),
+            "format": self.seconds["format"],
+        }
+        _lines = [
+            "# HELP filter_samples_read_total Measurements decoded from"
+            " input.",
+            "# TYPE filter_samples_read_total counter",
+            "filter_samples_read_total{{{0}}} {1}".format(_label, self.read),
+            "# HELP filter_samples_emitted_total Estimates written to output.",
+            "# TYPE filter_samples_emitted_total counter",
+            "filter_samples_emitted_total{{{0}}} {1}".format(
+                _label, self.emitted,
+            ),
+            "# HELP filter_parse_errors_total Lines that could not be"
+            " converted.",
+            "# TYPE filter_parse_errors_total counter",
+            "filter_parse_errors_total{{{0}}} {1}".format(_label, self.errors),
+            "# HELP filter_stage_seconds_total Time spent by stage.",
+            "# TYPE filter_stage_seconds_total counter",
+        ]
+        for stage, seconds in _stages.items():
+            _lines.append(
+                'filter_stage_seconds_total{{{0},stage="{1}"}} {2!r}'.format(
+                    _label, stage, seconds,
+                )
+            )
+        _lines.extend((
+            "# HELP filter_latency_seconds Time from reading a measurement to"
+            " writing its estimate.",
+            "# TYPE filter_latency_seconds histogram",
+        ))
+        cumulative = 0
+        for bound, count in zip(LATENCY_BUCKETS + ("+Inf", ), self.buckets):
+            cumulative += count
+            _lines.append(
+                'filter_latency_seconds_bucket{{{0},le="{1}"}} {2}'.format(
+                    _label, bound, cumulative,
+                )
+            )
+        _lines.append("filter_latency_seconds_sum{{{0}}} {1!r}".format(
+            _label, self.latency,
+        ))
+        _lines.append("filter_latency_seconds_count{{{0}}} {1}".format(
+            _label, cumulative,
+        ))
+        return "\n".join(_lines) + "\n"
+
+    def write(self) -> bool:
+        """Replace the metrics file, such that readers never see a partial
+        file. Returns False if the file cannot be written.
+        """
+        if self.filename is None:
+            return True
+        partial = self.filename + ".partial"
+        try:
+            with open(partial, "w") as f:
+                f.write(self.render())
+            os.replace(partial, self.filename)
+        except OSError:
+            return False
+        return True
+
+    def _poll(self) -> None:
+        if self.interval is not None and time.monotonic() >= self.deadline:
+            self.write()
+            self.deadline = time.monotonic() + self.interval
+
+class Timing:
+    """Context of time spent by a collector, if any."""
+
+    def __init__(
+        self,
+        collector: Optional[Collector] = None,
+    ) -> None:
+        self.collector = collector
+        self.start = 0.0
+
+    def __enter__(self) -> None:
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        if self.collector is not None:
+            elapsed = time.perf_counter() - self.start
+            self.collector.seconds["busy"] += elapsed
+
+active: Optional[Collector] = None
+
+def enable(
+    filename: Optional[str],
+    interval: Optional[float] = None,
+    method: str = "",
+) -> Collector:
+    """Start collecting metrics in this process. Metrics are written to
+    `filename` every `interval` seconds, as counters are updated; and by the
+    caller when done. Without a filename, metrics are only collected.
+    """
+    global active
+    active = Collector(filename, interval, method)
+    return active
+
+def reset() -> None:
+    """Stop collecting metrics in this process."""
+    global active
+    active = None
+
+def timing() -> Timing:
+    """Time one series by the active collector, if any."""
+    return Timing(active)
+
+def decoder(
+    factory: Callable[[], Callable[[bytes], Sequence[Any]]],
+) -> Callable[[], Callable[[bytes], Sequence[Any]]]:
+    """Wrap a factory of decoders, such that decoding is counted and timed
+    by the active collector.
+    """
+    def create() -> Callable[[bytes], Sequence[Any]]:
+        decode = factory()
+
+        def timed(chunk: bytes) -> Sequence[Any]:
+            start = time.perf_counter()
+            values = decode(chunk)
+            if active is not None:
+                active.decoded(len(values), time.perf_counter() - start)
+            return values
+
+        return timed
+
+    return create
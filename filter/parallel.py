@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+
+"""Filter on a pool of processes, either many files at once or chunks of
+one long series.
+
+With many files, each file is read, filtered, and written by one process.
+Estimates are either written to a file named after the input, or gathered
+and written to stdout in the order that files were given.
+
+With one series, measurements and estimates are held in shared memory, so
+that each process reads and writes its chunk in place.
+"""
+
+from __future__ import annotations
+
+__all__ = ['filter_files', 'map_chunks']
+
+import io
+import os
+import sys
+import array
+import importlib
+import multiprocessing
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import (
+        Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple,
+    )
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:
+    shared_memory = None  # type: ignore
+
+from . import internals
+from . import metrics
+
+def filter_files(
+    module: str,
+    filenames: List[str],
+    data: Dict,
+    jobs: Optional[int] = None,
+    suffix: Optional[str] = None,
+) -> int:
+    """Pass each file through the filter of a module, as a separate series.
+    Returns the highest exit status of any file.
+
+    Arguments:
+      module     name of the module implementing the filter
+      filenames  files of data
+      data       options of the filter, excluding data
+      jobs       number of processes [Default: number of CPUs]
+      suffix     if given, estimates of each file are written to a file of
+                   the same name with suffix appended, rather than to stdout
+    """
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    #NOTE: processes of a pool cannot start pools of their own
+    data = dict(data, jobs=None)
+    tasks = [(module, filename, data, suffix) for filename in filenames]
+
+    sys.stdout.flush()
+    if jobs > 1 and len(tasks) > 1:
+        #NOTE: processes of a pool count metrics of their own, which are
+        #      merged into the metrics of this process
+        with multiprocessing.Pool(
+            min(jobs, len(tasks)), initializer=metrics.reset,
+        ) as pool:
+            return _write_results(pool.imap(_filter_file, tasks))
+    else:
+        return _write_results(map(_filter_file, tasks))
+
+def _write_results(
+    results: Iterable[Tuple[int, bytes, Optional[Dict]]],
+) -> int:
+    status = 0
+    for _status, output, snapshot in results:
+        sys.stdout.buffer.write(output)
+        status = max(status, _status)
+        if snapshot is not None and metrics.active is not None:
+            metrics.active.merge(snapshot)
+    sys.stdout.buffer.flush()
+    return status
+
+def _filter_file(
+    task: Tuple[str, str, Dict, Optional[str]],
+) -> Tuple[int, bytes, Optional[Dict]]:
+    """Filter one file, with stdout redirected to either the output file or
+    a buffer. Returns the exit status, the buffered output, and the metrics
+    counted by a process of a pool.
+    """
+    module, filename, data, suffix = task
+    implementation = importlib.import_module(module)
+
+    buffer: io.BufferedIOBase
+    if suffix is not None:
+        try:
+            buffer = open(filename + suffix, 'wb')
+        except OSError:
+            internals._print_invalid_file(filename + suffix)
+            return 1, b"", None
+    else:
+        buffer = io.BytesIO()
+
+    collector = None
+    if data["metrics"] is not None and metrics.active is None:
+        collector = metrics.enable(None, method=data["method"])
+
+    stdout = sys.stdout
+    sys.stdout = io.TextIOWrapper(buffer, encoding=stdout.encoding)
+    status = 0
+    try:
+        with metrics.timing():
+            data = dict(
+                data, data_raw=internals._get_data_raw([filename], data),
+            )
+            implementation.cli_wrapper(**data)  # type: ignore
+    except SystemExit as err:
+        if err.code is not None:
+            status = err.code if isinstance(err.code, int) else 1
+    finally:
+        sys.stdout.flush()
+        output = buffer.getvalue() if suffix is None else b""  # type: ignore
+        sys.stdout.close()
+        sys.stdout = stdout
+
+    snapshot = None
+    if collector is not None:
+        snapshot = collector.snapshot()
+        metrics.reset()
+    return status, output, snapshot
+
+CHUNK_SIZE = 1 << 14
+
+def map_chunks(
+    function: Callable[..., Sequence[float]],
+    data: Sequence[float],
+    count: int,
+    jobs: int,
+    args: Tuple = (),
+    chunk: int = CHUNK_SIZE,
+) -> Sequence[float]:
+    """Compute `count` estimates from data, in chunks of at least `chunk` on
+    `jobs` processes. `function(data, start, stop, *args)` must return the
+    estimates from `start` up to `stop`, and must be defined at the top level
+    of a module.
+
+    Data and estimates are copied to and from shared memory once, rather than
+    passed to each process. Without shared memory, or if there is only one
+    chunk, estimates are computed in this process.
+    """
+    if shared_memory is None or jobs < 2 or count <= chunk:
+        return function(data, 0, count, *args)
+
+    size = max(chunk, -(-count // (jobs * 4)))
+    source = shared_memory.SharedMemory(create=True, size=8 * len(data) or 1)
+    target = shared_memory.SharedMemory(create=True, size=8 * count)
+    try:
+        _buffer(source)[:len(data)] = _as_doubles(data)
+        tasks = [
+            (function, source.name, target.name, len(data), start,
+             min(start + size, count), args)
+            for start in range(0, count, size)
+        ]
+        with multiprocessing.Pool(min(jobs, len(tasks))) as pool:
+            pool.map(_map_chunk, tasks, chunksize=1)
+        estimated = array.array("d")
+        estimated.frombytes(target.buf[:8 * count])  # type: ignore
+        return estimated
+    finally:
+        for memory in (source, target):
+            memory.close()
+            memory.unlink()
+
+def _map_chunk(
+    task: Tuple[Callable, str, str, int, int, int, Tuple],
+) -> None:
+    """Compute one chunk of estimates, reading data from and writing
+    estimates to shared memory.
+    """
+    function, source_name, target_name, length, start, stop, args = task
+    source = shared_memory.SharedMemory(source_name)
+    target = shared_memory.SharedMemory(target_name)
+    data = _buffer(source)[:length]
+    estimated = _buffer(target)
+    try:
+        estimated[start:stop] = _as_doubles(function(data, start, stop, *args))
+    finally:
+        data.release()
+        estimated.release()
+        source.close()
+        target.close()
+
+def _buffer(memory: Any) -> memoryview:
+    return memory.buf.cast("d")
+
+def _as_doubles(values: Sequence[float]) -> memoryview:
+    try:
+        view = memoryview(values)  # type: ignore
+    except TypeError:
+        view = None
+    if view is None or view.format != "d" or not view.c_contiguous:
+        view = memoryview(array.array("d", values))
+    return view
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+
+"""filter sweep METHOD [OPTIONS] DATA
+Parameter sweep - Filter data by every combination of parameters from grids,
+and report the error of each, where METHOD is one of 'ab' or 'kalman'.
+
+Options:
+  -a, --alpha GRID
+                  with 'ab', corrections to estimated state [Default: 0.05]
+  -b, --beta GRID with 'ab', corrections to estimated velocity
+                    [Default: 0.005]
+  -v, --variance GRID
+                  with 'kalman', variances of data measurements [Default: 1]
+  -d, --delta     initial velocity of state per time unit [Default: 0]
+  --delta-sigma S with 'kalman', std. deviation of velocity [Default: 0]
+  -i, --initial   initial estimate of state, and with 'kalman' its std.
+                    deviation [Default: 0 1]
+  --backend NAME  filter by NAME, where NAME is one of 'python' or 'numpy'
+                    [Default: python]
+  -j N, --jobs N  filter configurations on N processes at once
+                    [Default: number of CPUs]
+  --input-format FORMAT
+                  read data as FORMAT, where FORMAT is one of 'text',
+                    'f64le', 'f32le', or 'npy' [Default: text]
+  --output-format FORMAT
+                  write results as FORMAT [Default: text]
+  --precision N   write results with N decimal places, or as the shortest
+                    exact representation if N is 'repr' [Default: 4]
+  --delimiter D   separate the values of each result by D [Default: tab]
+  -r, --report    report results as a table, followed by the configuration
+                    with the lowest error
+
+A GRID is a comma-separated list of values, each either a number or
+START:STOP:N for N evenly spaced numbers from START to STOP. Every
+combination of alpha and beta is filtered.
+
+Data is read once. Each configuration is scored by the root mean square of
+the residuals of its predictions one step ahead, which is written after the
+parameters of the configuration, in the order of the grids. Initial estimates
+count towards the error, so should be set near the data.
+
+With the 'numpy' backend, the configurations of each process are filtered
+at once by vectorized operations.
+"""
+
+from __future__ import annotations
+
+__all__ = ['cli_wrapper', 'grid', 'sweep']
+
+import os
+import sys
+import math
+import array
+import itertools
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Any, List, Sequence, Tuple
+
+from . import internals
+
+#NOTE: with NumPy, each step costs about the same for any number of
+#      configurations, so processes are only given many at once
+CHUNK_SIZE = 256
+
+def cli_wrapper(**data: Any):
+    """Handler for the parameter sweep. Checks and cleans given options,
+    and performs optional reporting.
+    """
+    _method = data["method"]
+    _grids = data["grid"]
+    if _method == "ab":
+        _names: Tuple[str, ...] = ("alpha", "beta")
+        _defaults: Tuple[List[float], ...] = ([0.05], [0.005])
+        _fixed: Tuple[float, ...] = (
+            data["initial_estimate"],
+            data["delta"] if data["delta"] is not None else 0,
+            1.0, #constant time unit
+        )
+    else:
+        _names = ("variance",)
+        _defaults = ([1.0],)
+        _fixed = (
+            data["initial_estimate"],
+            data["initial_std_deviation"],
+            data["delta"] if data["delta"] is not None else 0,
+            data["delta_sigma"] if data["delta_sigma"] is not None else 0,
+            1.0, #constant time unit
+        )
+    _configs = grid(*(
+        _grids.get(name) or default for name, default in zip(_names, _defaults)
+    ))
+    if _method == "kalman" and not all(
+        variance > 0 for variance, in _configs
+    ):
+        internals._print_invalid_variance(
+            min(variance for variance, in _configs),
+        )
+        sys.exit(1)
+
+    _raw = data["data_raw"]
+    if not isinstance(_raw, (array.array, memoryview)):
+        _raw = array.array("d", _raw)
+    _errors = sweep(
+        _raw,
+        _method,
+        _configs,
+        _fixed,
+        data["backend"] == "numpy",
+        data["jobs"] if data["jobs"] is not None else os.cpu_count() or 1,
+    )
+
+    if data["report"]:
+        sys.stdout.write(report_header(_method, _names, _fixed, len(_raw)))
+        for config, error in zip(_configs, _errors):
+            sys.stdout.write(
+                "  ".join(
+                    "{0:8.4f}".format(value) for value in config + (error,)
+                ) + "\n",
+            )
+        _best = min(
+            range(len(_configs)),
+            key=lambda index: (math.isnan(_errors[index]), _errors[index]),
+        )
+        sys.stdout.write(
+            "Lowest error: {0}\n".format(
+                ", ".join(
+                    "{0} {1:.4f}".format(name, value)
+                    for name, value in zip(_names, _configs[_best])
+                ),
+            ),
+        )
+    else:
+        internals._write_rows(
+            (config + (error,) for config, error in zip(_configs, _errors)),
+            data["delimiter"],
+            data["output_format"],
+            False,
+            data["precision"],
+        )
+
+def grid(
+    *values: Sequence[float],
+) -> List[Tuple[float, ...]]:
+    """List every combination of parameters, one from each sequence, with
+    the last varying fastest.
+    """
+    return list(itertools.product(*values))
+
+def sweep(
+    data: Sequence[float],
+    method: str,
+    configs: List[Tuple[float, ...]],
+    fixed: Tuple[float, ...],
+    vectorize: bool = False,
+    jobs: int = 1,
+) -> Sequence[float]:
+    """Pass data through a filter of each configuration, and compute the root
+    mean square of the residuals of each prediction one step ahead.
+    Configurations are split among `jobs` processes.
+
+    Arguments:
+      data       measurement from each time interval
+      method     'ab' or 'kalman'
+      configs    parameters of each filter: alpha and beta, or variance
+      fixed      arguments of every filter following its parameters, as in
+                   `ab.filter_iir` or `kalman.filter_gain`
+      vectorize  filter the configurations of each process with NumPy
+      jobs       number of processes
+    """
+    from . import parallel
+    return parallel.map_chunks(
+        _sweep_chunk,
+        data,
+        len(configs),
+        jobs,
+        (method, configs, fixed, vectorize),
+        chunk=CHUNK_SIZE if vectorize else 1,
+    )
+
+def _sweep_chunk(
+    data: Sequence[float],
+    start: int,
+    stop: int,
+    method: str,
+    configs: List[Tuple[float, ...]],
+    fixed: Tuple[float, ...],
+    vectorize: bool,
+) -> Sequence[float]:
+    """Compute the errors of configurations from `start` up to `stop`."""
+    configs = configs[start:stop]
+    if vectorize:
+        from . import vectorized
+        if method == "ab":
+            alpha, beta = zip(*configs)
+            return vectorized.ab_sweep(data, alpha, beta, *fixed).tolist()
+        variance, = zip(*configs)
+        return vectorized.kalman_sweep(data, variance, *fixed).tolist()
+    if method == "ab":
+        return [_ab_error(data, *config, *fixed) for config in configs]
+    return [_kalman_error(data, *config, *fixed) for config in configs]
+
+def _ab_error(
+    data: Sequence[float],
+    alpha: float,
+    beta: float,
+    init_state: float,
+    init_velocity: float,
+    time: float,
+) -> float:
+    """Compute the root mean square of the residuals of an alpha-beta filter,
+    whose estimates are those of `ab.filter`.
+    """
+    estimated = init_state
+    velocity = init_velocity
+    total = 0.0
+    for measured in data:
+        estimated += time * velocity
+        residual = measured - estimated
+        total += residual * residual
+        estimated += alpha * residual
+        velocity += (beta * residual) / time
+    return math.sqrt(total / len(data)) if len(data) else math.nan
+
+def _kalman_error(
+    data: Sequence[float],
+    variance: float,
+    init_state_mu: float,
+    init_state_sigma: float,
+    init_velocity_mu: float,
+    init_velocity_sigma: float,
+    time: float,
+) -> float:
+    """Compute the root mean square of the residuals of a Kalman filter,
+    whose estimates are those of `kalman.filter_gain`.
+    """
+    estimated = init_state_mu
+    posterior = init_state_sigma**2
+    process_variance = (init_velocity_sigma * time)**2
+    drift = init_velocity_mu * time
+    total = 0.0
+    for measured in data:
+        estimated += drift
+        prior = posterior + process_variance
+        residual = measured - estimated
+        total += residual * residual
+        gain = prior / (prior + variance)
+        estimated += gain * residual
+        posterior = gain * variance
+    return math.sqrt(total / len(data)) if len(data) else math.nan
+
+def report_header(
+    method: str,
+    names: Sequence[str],
+    fixed: Tuple[float, ...],
+    count: int,
+) -> str:
+    """Draw a report header summarizing the sweep.
+
+    Appears as:
+
+    ```
+    Alpha-beta filter sweep
+      Initial state: <init_state>
+      Initial velocity: <init_velocity>
+      Measurements: <count>
+    Alpha:    Beta:     RMS:
+    ========  ========  ========
+    ```
+
+    The parameters and error of each configuration then should be printed.
+    """
+    if method == "ab":
+        _msg = [
+            "Alpha-beta filter sweep",
+            "  Initial state: {0}".format(fixed[0]),
+            "  Initial velocity: {0}".format(fixed[1]),
+        ]
+    else:
+        _msg = [
+            "Kalman filter sweep",
+            "  Distribution of estimated initial state: N({0},{1}²)".format(
+                fixed[0], fixed[1],
+            ),
+            "  Distribution of expected change per time unit: N({0},{1}²)"
+            .format(fixed[2], fixed[3]),
+        ]
+    _msg.append("  Measurements: {0}".format(count))
+    _msg.append(
+        "".join("{0:10}".format(name.capitalize() + ":") for name in names)
+        + "RMS:",
+    )
+    _msg.append("========  " * len(names) + "========")
+    return "\n".join(_msg) + "\n"
@@ -0,0 +1,510 @@
+#!/usr/bin/env python3
+
+"""Vectorized implementations of the filters, evaluated over whole arrays
+with NumPy rather than one sample at a time. The Kalman filter steps through
+time, as its estimates must round exactly as those of the 'python' backend,
+and is vectorized over columns instead; a single series is left to the
+'gain' engine of `kalman`.
+
+Each function returns arrays with time along the first axis. NumPy is an
+optional dependency; check `available()` before calling into this module.
+"""
+
+from __future__ import annotations
+
+__all__ = [
+    'available', 'ab_filter', 'kalman_filter', 'convolve_filter', 'bank_state',
+    'bank_update', 'ab_sweep', 'kalman_sweep',
+]
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import List, Optional, Sequence, Tuple, Union
+
+try:
+    import numpy
+except ImportError:
+    numpy = None  # type: ignore
+
+def available() -> bool:
+    """Check if NumPy can be imported."""
+    return numpy is not None
+
+BLOCK_SIZE = 128
+
+def ab_filter(
+    data: List[float],
+    alpha: float,
+    beta: float,
+    init_state: float,
+    init_velocity: float,
+    time: float,
+    final_state: bool = False,
+) -> Union["numpy.ndarray", Tuple["numpy.ndarray", "numpy.ndarray"]]:
+    """Pass data through an alpha-beta filter with constant velocity. If
+    `final_state` is set, also returns the estimate and velocity after the
+    last measurement, so that filtering can continue from it.
+
+    The filter is the linear recurrence s[k] = A s[k-1] + B z[k] on the state
+    s = (estimate, velocity). Data is split into blocks; the response of each
+    block to its own measurements is a matrix product with the impulse
+    response, and only the state carried between blocks is iterated.
+
+    Arguments:
+      data           measurement from each time interval
+      alpha          correction to estimated state
+      beta           correction to estimated velocity
+      init_state     initial estimate of state
+      init_velocity  initial estimate of velocity
+      time           time unit
+      final_state    also return the state after the last measurement
+    """
+    _data = numpy.asarray(data, dtype=numpy.float64)
+    length = len(_data)
+    if length == 0:
+        if final_state:
+            state = numpy.empty((2,) + _data.shape[1:])
+            state[0], state[1] = init_state, init_velocity
+            return _data, state
+        return _data
+    size = BLOCK_SIZE
+    blocks = -(-length // size)
+
+    transition = numpy.array([
+        [1.0 - alpha, (1.0 - alpha) * time],
+        [-beta / time, 1.0 - beta],
+    ])
+    correction = numpy.array([alpha, beta / time])
+
+    #powers[k] is the transition matrix raised to k
+    powers = numpy.empty((size + 1, 2, 2))
+    powers[0] = numpy.eye(2)
+    for k in range(size):
+        powers[k + 1] = transition @ powers[k]
+
+    #response of estimates to a measurement k steps prior
+    impulse = powers[:size] @ correction
+    lag = numpy.subtract.outer(numpy.arange(size), numpy.arange(size))
+    response = numpy.where(lag >= 0, impulse[lag.clip(0), 0], 0.0)
+
+    #response of estimates to the state before the block
+    carried = powers[1:, 0, :]
+
+    #response of the state after the block to each measurement in the block
+    closing = impulse[::-1].T
+
+    padded = numpy.zeros((blocks * size,) + _data.shape[1:])
+    padded[:length] = _data
+    columns = padded[0].size
+    padded = padded.reshape((blocks, size, columns))
+    padded = padded.transpose(0, 2, 1).reshape((blocks * columns, size))
+
+    estimated = padded @ response.T
+
+    #state before each block, as a scan over the state after each block
+    initial = numpy.empty((columns, 2))
+    initial[:, 0] = numpy.ravel(init_state)
+    initial[:, 1] = numpy.ravel(init_velocity)
+    closed = (padded @ closing.T).reshape((blocks, columns, 2))
+    closed[0] += initial @ powers[size].T
+    p11, p12 = powers[size, 0]
+    p21, p22 = powers[size, 1]
+    shift = 1
+    while shift < blocks:
+        last_estimated = closed[:-shift, :, 0]
+        last_velocity = closed[:-shift, :, 1]
+        _estimated = (p11 * last_estimated) + (p12 * last_velocity)
+        _velocity = (p21 * last_estimated) + (p22 * last_velocity)
+        closed[shift:, :, 0] += _estimated
+        closed[shift:, :, 1] += _velocity
+        p11, p12, p21, p22 = (
+            (p11 * p11) + (p12 * p21),
+            (p11 * p12) + (p12 * p22),
+            (p21 * p11) + (p22 * p21),
+            (p21 * p12) + (p22 * p22),
+        )
+        shift *= 2
+    states = numpy.empty((blocks, columns, 2))
+    states[0] = initial
+    states[1:] = closed[:-1]
+    estimated += states.reshape((blocks * columns, 2)) @ carried.T
+
+    estimated = estimated.reshape((blocks, columns, size)).transpose(0, 2, 1)
+    estimated = estimated.reshape((blocks * size,) + _data.shape[1:])[:length]
+    if not final_state:
+        return estimated
+
+    #state after the last measurement, rather than after the padding
+    remainder = length - ((blocks - 1) * size)
+    last = padded[-columns:, :remainder]
+    state = powers[remainder] @ states[-1].T
+    state += impulse[remainder - 1::-1].T @ last.T
+    return estimated, state.reshape((2,) + _data.shape[1:])
+
+def kalman_filter(
+    data: List[float],
+    variance: float,
+    init_state_mu: float,
+    init_state_sigma: float,
+    init_velocity_mu: float,
+    init_velocity_sigma: float,
+    time: float,
+) -> Tuple["numpy.ndarray", "numpy.ndarray"]:
+    """Pass rows of data through a Kalman filter with constant velocity,
+    filtering each column as a separate series. Returns the estimates and
+    their variances.
+
+    Estimates are computed by the same arithmetic as `kalman.filter`, one
+    time interval at a time, updating every column of data at once. A prefix
+    scan over time rounds differently, and changes written estimates that
+    lie on a rounding tie. Variances do not depend on the measurements, so
+    are computed first. Stepping through time costs more per step than in
+    Python, so this is only faster for many columns; a single series is
+    filtered faster by `kalman.filter_gain`.
+
+    Arguments:
+      data                 rows of measurements from each time interval
+      variance             variance of measurements; must be non-zero
+      init_state_mu        initial estimate of state
+      init_state_sigma     std. deviation of state distribution
+      init_velocity_mu     initial estimate of velocity
+      init_velocity_sigma  std. deviation of velocity distribution
+      time                 time unit
+    """
+    _data = numpy.asarray(data, dtype=numpy.float64)
+    init_variance = init_state_sigma**2
+    process_variance = init_velocity_sigma**2 * time**2
+    drift = init_velocity_mu * time
+
+    prior = _prior_variances(
+        len(_data), variance, init_variance, process_variance,
+    )
+    denominator = prior + variance
+    posterior = (prior * variance) / denominator
+
+    estimated = numpy.empty_like(_data)
+    _estimated = numpy.full(
+        _data.shape[1:], init_state_mu, dtype=numpy.float64,
+    )
+    _weighted = numpy.empty_like(_estimated)
+    for index in range(len(_data)):
+        _estimated += drift
+        _estimated *= variance
+        numpy.multiply(_data[index], prior[index], out=_weighted)
+        _estimated += _weighted
+        _estimated /= denominator[index]
+        estimated[index] = _estimated
+    return estimated, posterior
+
+def _linear_recurrence(
+    factor: "numpy.ndarray",
+    offset: "numpy.ndarray",
+    initial: "numpy.ndarray",
+) -> "numpy.ndarray":
+    """Solve y[k] = factor[k] y[k-1] + offset[k] for every k, given y[-1].
+
+    The recurrence is solved as a prefix scan within fixed-size blocks, and
+    then as a prefix scan over the blocks.
+    """
+    length = len(offset)
+    if length == 0:
+        return offset
+    size = BLOCK_SIZE
+    blocks = -(-length // size)
+    shape = (blocks * size,) + offset.shape[1:]
+
+    factors = numpy.ones(shape)
+    factors[:length] = factor
+    factors = factors.reshape((blocks, size) + shape[1:])
+    offsets = numpy.zeros(shape)
+    offsets[:length] = offset
+    offsets = offsets.reshape((blocks, size) + shape[1:])
+
+    _scan(factors, offsets, axis=1)
+
+    #value before each block
+    closing_factors = factors[:, -1].copy()
+    closing_offsets = offsets[:, -1].copy()
+    _scan(closing_factors, closing_offsets, axis=0)
+    opening = numpy.empty_like(closing_offsets)
+    opening[0] = initial
+    opening[1:] = (closing_factors[:-1] * initial) + closing_offsets[:-1]
+
+    estimated = (factors * opening[:, numpy.newaxis]) + offsets
+    return estimated.reshape(shape)[:length]
+
+def _scan(
+    factor: "numpy.ndarray",
+    offset: "numpy.ndarray",
+    axis: int,
+) -> None:
+    """Compose the affine maps y -> factor[k] y + offset[k] along an axis, in
+    place, such that each element maps y[-1] to y[k].
+    """
+    prefix = (slice(None),) * axis
+    shift = 1
+    while shift < offset.shape[axis]:
+        head = prefix + (slice(None, -shift),)
+        tail = prefix + (slice(shift, None),)
+        offset[tail] += factor[tail] * offset[head]
+        factor[tail] *= factor[head]
+        shift *= 2
+
+def _prior_variances(
+    length: int,
+    variance: float,
+    init_variance: float,
+    process_variance: float,
+) -> "numpy.ndarray":
+    """Compute the variance of the predicted state for each time interval,
+    by the same arithmetic as `kalman.filter`.
+    """
+    prior = numpy.empty(length)
+    posterior = init_variance
+    for index in range(length):
+        _prior = posterior + process_variance
+        _posterior = (_prior * variance) / (_prior + variance)
+        prior[index] = _prior
+        if _posterior == posterior:
+            #converged to a steady state, which repeats exactly
+            prior[index:] = _prior
+            break
+        posterior = _posterior
+    return prior
+
+def convolve_filter(
+    data: List[float],
+    kernel: List[float],
+    boundary: str = "circular",
+    fft: bool = False,
+) -> "numpy.ndarray":
+    """Pass data through the kernel.
+
+    Arguments:
+      data      measurements
+      kernel    measurement adjustments
+      boundary  mode of extending data beyond its ends
+      fft       compute by FFT rather than by summing shifted arrays
+    """
+    _data = numpy.asarray(data, dtype=numpy.float64)
+    length = len(_data)
+    if length == 0:
+        return _data
+    taps = len(kernel)
+    offset = taps // 2
+
+    if fft and boundary == "circular":
+        #fold kernel onto the circle; output is then circular correlation
+        folded = numpy.zeros(length)
+        for index, factor in enumerate(kernel):
+            folded[(index - offset) % length] += factor
+        folded = folded.reshape((-1,) + (1,) * (_data.ndim - 1))
+        spectrum = numpy.fft.rfft(_data, axis=0)
+        spectrum *= numpy.conj(numpy.fft.rfft(folded, axis=0))
+        return numpy.fft.irfft(spectrum, n=length, axis=0)
+
+    extended = _extend(_data, taps, boundary)
+    count = len(extended) - taps + 1
+    if count <= 0:
+        return numpy.zeros((0,) + _data.shape[1:])
+
+    if fft:
+        size = len(extended)
+        factors = numpy.asarray(kernel, dtype=numpy.float64)
+        factors = factors.reshape((-1,) + (1,) * (_data.ndim - 1))
+        spectrum = numpy.fft.rfft(extended, axis=0)
+        spectrum *= numpy.conj(numpy.fft.rfft(factors, n=size, axis=0))
+        return numpy.fft.irfft(spectrum, n=size, axis=0)[:count]
+
+    estimated = numpy.zeros((count,) + _data.shape[1:])
+    for index, factor in enumerate(kernel):
+        estimated += factor * extended[index:index + count]
+    return estimated
+
+def _extend(
+    data: "numpy.ndarray",
+    taps: int,
+    boundary: str,
+) -> "numpy.ndarray":
+    """Extend data beyond each end as needed for a kernel of `taps` factors,
+    such that output[i] is the dot product of extended[i:i+taps] and kernel.
+    """
+    if boundary == "valid":
+        return data
+    elif boundary == "causal":
+        before, after = taps - 1, 0
+    else:
+        before = taps // 2
+        after = taps - 1 - before
+
+    if boundary == "circular":
+        indices = numpy.arange(-before, len(data) + after)
+        return numpy.take(data, indices, axis=0, mode='wrap')
+
+    mode = {
+        "reflect": "reflect",
+        "nearest": "edge",
+        "causal": "edge",
+        "zero": "constant",
+    }[boundary]
+    if mode == "reflect" and len(data) == 1:
+        mode = "edge"
+    widths = [(before, after)] + [(0, 0)] * (data.ndim - 1)
+    return numpy.pad(data, widths, mode=mode)  # type: ignore
+
+def bank_state(
+    initial: Sequence[float],
+    tracks: int,
+    state: Optional["numpy.ndarray"] = None,
+) -> "numpy.ndarray":
+    """Lay out the state of a bank of tracks as one row per quantity, such
+    that each quantity of every track is contiguous. Tracks beyond those of
+    `state` start from `initial`.
+    """
+    _state = numpy.empty((len(initial), tracks))
+    _state[:] = numpy.reshape(initial, (-1, 1))
+    if state is not None:
+        _state[:, :state.shape[1]] = state
+    return _state
+
+def bank_update(
+    state: "numpy.ndarray",
+    measured: Sequence[float],
+    tracks: Optional[Sequence[int]],
+    variance: float,
+    noise: Tuple[float, float, float],
+    time: float,
+) -> Tuple["numpy.ndarray", "numpy.ndarray"]:
+    """Predict and correct tracks of a bank by one measurement each, in
+    place. Tracks are all of them in order, or those indexed by `tracks`,
+    each at most once. Returns the estimates and their variances.
+
+    State is laid out by `bank_state` as position, velocity, and the
+    covariances p00, p01, and p11 of position and velocity.
+    """
+    _measured = numpy.asarray(measured, dtype=numpy.float64)
+    if tracks is None:
+        _state = state
+    else:
+        _tracks = numpy.asarray(tracks, dtype=numpy.intp)
+        _state = state[:, _tracks]
+    position, velocity, p00, p01, p11 = _state
+    q00, q01, q11 = noise
+
+    #predict
+    position += time * velocity
+    p00 += (time * ((2.0 * p01) + (time * p11))) + q00
+    p01 += (time * p11) + q01
+    p11 += q11
+
+    #correct by the residual
+    gain0 = p00 / (p00 + variance)
+    gain1 = p01 / (p00 + variance)
+    residual = _measured - position
+    position += gain0 * residual
+    velocity += gain1 * residual
+    p11 -= gain1 * p01
+    p01 *= 1.0 - gain0
+    p00 *= 1.0 - gain0
+
+    if tracks is not None:
+        state[:, _tracks] = _state
+    return position.copy(), p00.copy()
+
+SWEEP_SIZE = 1 << 20
+
+def ab_sweep(
+    data: Sequence[float],
+    alpha: Sequence[float],
+    beta: Sequence[float],
+    init_state: float,
+    init_velocity: float,
+    time: float,
+) -> "numpy.ndarray":
+    """Pass data through an alpha-beta filter of each pair of `alpha` and
+    `beta` at once. Returns the root mean square of the residuals of each
+    prediction one step ahead.
+
+    Each step updates the state of every pair by one vectorized operation.
+    """
+    _alpha = numpy.asarray(alpha, dtype=numpy.float64)
+    gain = numpy.asarray(beta, dtype=numpy.float64) / time
+    estimated = numpy.full(_alpha.shape, init_state, dtype=numpy.float64)
+    velocity = numpy.full(_alpha.shape, init_velocity, dtype=numpy.float64)
+    residual = numpy.empty_like(estimated)
+    total = numpy.zeros_like(estimated)
+    _data = numpy.asarray(data, dtype=numpy.float64)
+
+    for measured in _data.tolist():
+        estimated += time * velocity
+        numpy.subtract(measured, estimated, out=residual)
+        total += residual * residual
+        estimated += _alpha * residual
+        velocity += gain * residual
+    return numpy.sqrt(total / len(_data)) if len(_data) else total + numpy.nan
+
+def kalman_sweep(
+    data: Sequence[float],
+    variance: Sequence[float],
+    init_state_mu: float,
+    init_state_sigma: float,
+    init_velocity_mu: float,
+    init_velocity_sigma: float,
+    time: float,
+) -> "numpy.ndarray":
+    """Pass data through a Kalman filter of each measurement variance at
+    once. Returns the root mean square of the residuals of each prediction
+    one step ahead.
+
+    Estimates of every variance are solved together, as the linear
+    recurrence x[k] = (1 - K[k]) (x[k-1] + v) + K[k] z[k] with variances
+    along the second axis, over blocks of data of about `SWEEP_SIZE` values
+    in all.
+    """
+    _data = numpy.asarray(data, dtype=numpy.float64)
+    _variance = numpy.asarray(variance, dtype=numpy.float64)
+    init_variance = init_state_sigma**2
+    process_variance = (init_velocity_sigma * time)**2
+    drift = init_velocity_mu * time
+
+    #prior variances until all have converged, after which the last repeats
+    transient = None
+    if process_variance != 0:
+        rows: List["numpy.ndarray"] = list()
+        posterior = numpy.full(_variance.shape, init_variance)
+        while len(rows) < len(_data):
+            prior = posterior + process_variance
+            rows.append(prior)
+            _posterior = (prior * _variance) / (prior + _variance)
+            if numpy.array_equal(_posterior, posterior):
+                break
+            posterior = _posterior
+        transient = numpy.array(rows)
+
+    last = numpy.full(_variance.shape, init_state_mu, dtype=numpy.float64)
+    total = numpy.zeros_like(last)
+    size = max(BLOCK_SIZE, SWEEP_SIZE // max(len(_variance), 1))
+    for start in range(0, len(_data), size):
+        block = _data[start:start + size, numpy.newaxis]
+        steps = numpy.arange(start, start + len(block), dtype=numpy.float64)
+        if transient is not None:
+            index = numpy.minimum(steps.astype(numpy.intp), len(transient) - 1)
+            prior = transient[index]
+        elif init_variance == 0:
+            prior = numpy.zeros((len(block), len(_variance)))
+        else:
+            prior = 1.0 / (
+                (1.0 / init_variance) + (steps[:, numpy.newaxis] / _variance)
+            )
+        gain = prior / (prior + _variance)
+        factor = 1.0 - gain
+        offset = (factor * drift) + (gain * block)
+        estimated = _linear_recurrence(factor, offset, last)
+
+        predicted = numpy.empty_like(estimated)
+        predicted[0] = last
+        predicted[1:] = estimated[:-1]
+        residual = block - (predicted + drift)
+        total += (residual * residual).sum(axis=0)
+        last = estimated[-1]
+    return numpy.sqrt(total / len(_data)) if len(_data) else total + numpy.nan
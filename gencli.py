@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+
+"""python gencli.py CONFIG
+Generate a command line parser from a TOML file of options, and write it to
+stdout.
+
+Each option is a table, keyed by the long name of the option:
+  number        count of values taken; 0 for a flag, 1 for a single value
+  minimum,      alternatively, the range of values taken as a list; without
+    maximum       a maximum, values are taken up to `--` or the end
+  alternatives  short names of the option
+
+The parser behaves as one generated by `gap`, but looks options up in a table
+rather than matching a regular expression, so that neither `re` nor the table
+must be compiled at startup.
+
+TOML is read by `tomllib` on Python 3.11 and later, or by the `tomli` package
+on earlier versions. Generated parsers have no dependencies.
+"""
+
+import sys
+
+try:
+    import tomllib
+except ImportError:
+    import tomli as tomllib  # type: ignore
+
+PARSER = '''
+def main(arguments):
+	config=dict()
+	positional=[]
+	consuming,needing,wanting=None,0,0
+	while len(arguments) and arguments[0]!="--":
+		if consuming is not None:
+			if config[consuming] is None:
+				config[consuming]=arguments.pop(0)
+			else:
+				config[consuming].append(arguments.pop(0))
+			needing-=1
+			if wanting is not None:
+				wanting-=1
+			if wanting==0:
+				consuming,needing,wanting=None,0,0
+		elif arguments[0].split("=",1)[0] in OPTIONS:
+			option,_,attached_value=arguments.pop(0).partition("=")
+			if not _:
+				attached_value=None
+			name,number=OPTIONS[option]
+			if number==0:
+				if attached_value is not None:
+					message=(
+						f'unexpected value while parsing "{name}"'
+						' (expected 0 values)'
+					)
+					raise ValueError(message) from None
+				config[name]=True
+			elif number==1:
+				config[name]=attached_value
+				if attached_value is None:
+					consuming,needing,wanting=name,1,1
+				else:
+					consuming,needing,wanting=None,0,0
+			else:
+				minimum,maximum=number
+				if attached_value is not None:
+					config[name]=[attached_value]
+					if maximum is not None:
+						maximum-=1
+					consuming,needing,wanting=name,minimum-1,maximum
+				else:
+					config[name]=[]
+					consuming,needing,wanting=name,minimum,maximum
+		else:
+			positional.append(arguments.pop(0))
+	if needing>0:
+		message=(
+			f'unexpected end while parsing "{consuming}"'
+			f' (expected {needing} values)'
+		)
+		raise ValueError(message) from None
+	for argument in arguments[1:]:
+		positional.append(argument)
+	return config,positional
+
+if __name__=="__main__":
+	import sys
+	cfg,pos = main(sys.argv[1:])
+	cfg = {k:v for k,v in cfg.items() if v is not None}
+	if len(cfg):
+		print("Options:")
+		for k,v in cfg.items():
+			print(f"{k:20} = {v}")
+	if len(pos):
+		print("Positional arguments:", ", ".join(pos))
+'''
+
+def generate(options):
+    """Draw the parser of options, mapping each option string to the name of
+    the option and the count of values it takes.
+    """
+    table = []
+    for name in sorted(options):
+        spec = options[name]
+        if "number" in spec and spec["number"] in (0, 1):
+            number = repr(spec["number"])
+        else:
+            number = repr((
+                spec.get("minimum", spec.get("number")),
+                spec.get("maximum", spec.get("number")),
+            ))
+        strings = ["--" + name]
+        strings.extend("-" + short for short in spec.get("alternatives", []))
+        for string in strings:
+            table.append('\t"{0}":("{1}",{2}),\n'.format(string, name, number))
+    return (
+        "#!/usr/bin/env python3\n\nOPTIONS={\n" + "".join(table) + "}\n"
+        + PARSER
+    )
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        sys.stderr.write(__doc__.splitlines()[0] + "\n")
+        sys.exit(1)
+    with open(sys.argv[1], "rb") as f:
+        sys.stdout.write(generate(tomllib.load(f)))
@@ -3,6 +3,7 @@
 import sys
 
 from . import cli
+from . import formats
 from . import internals
 
 def main():
@@ -26,14 +27,21 @@ def main():
         sys.exit(1)
 
     _data = {
+        "backend": _config.get("backend", "python"),
+        "columns": internals._try_get_int(_config, "columns"),
         "delta": internals._try_get_float(_config, "delta"),
         "distribution": _dist,
         "initial": internals._try_get_float(_config, "initial"),
+        "jobs": internals._try_get_int(_config, "jobs"),
         "mu": internals._try_get_float(_config, "mu"),
         "number": internals._try_get_int(_config, "number"),
         "offset": internals._try_get_float(_config, "offset"),
+        "output_format": _config.get("output-format", "text"),
+        "precision": _config.get("precision", None),
         "report": "report" in _config.keys(),
+        "seed": internals._try_get_int(_config, "seed"),
         "sigma": internals._try_get_float(_config, "sigma"),
+        "skip": internals._try_get_int(_config, "skip"),
     }
 
     if _dist == "uniform":
@@ -50,6 +58,34 @@ def main():
         sys.stdout.write(implementation.__doc__)
         sys.exit(0)
 
+    if _data["output_format"] not in formats.FORMATS:
+        internals._print_invalid_format(_data["output_format"])
+        sys.exit(1)
+    if _data["precision"] not in (None, "repr"):
+        if not _data["precision"].isdigit():
+            internals._print_invalid_precision(_data["precision"])
+            sys.exit(1)
+    if _data["backend"] == "numpy":
+        from . import vectorized
+        if not vectorized.available():
+            internals._print_missing_backend(_data["backend"])
+            _data["backend"] = "python"
+    elif _data["backend"] != "python":
+        internals._print_invalid_backend(_data["backend"])
+        sys.exit(1)
+    if _data["columns"] is not None and _data["columns"] < 1:
+        internals._print_invalid_columns(_data["columns"])
+        sys.exit(1)
+    if _data["seed"] is not None and _data["seed"] < 0:
+        internals._print_invalid_seed(_data["seed"])
+        sys.exit(1)
+    if _data["skip"] is not None and _data["skip"] < 0:
+        internals._print_invalid_skip(_data["skip"])
+        sys.exit(1)
+    if _data["report"]:
+        #NOTE: reports are always text
+        _data["output_format"] = "text"
+
     implementation.cli_wrapper(**_data)
 
     sys.exit(0)
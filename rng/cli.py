@@ -1,13 +1,42 @@
 #!/usr/bin/env python3
 
-import re
+OPTIONS={
+	"--backend":("backend",1),
+	"--columns":("columns",1),
+	"--delta":("delta",1),
+	"-d":("delta",1),
+	"--distribution":("distribution",1),
+	"--help":("help",0),
+	"-h":("help",0),
+	"-x":("help",0),
+	"--initial":("initial",1),
+	"-i":("initial",1),
+	"--jobs":("jobs",1),
+	"-j":("jobs",1),
+	"--list-distributions":("list-distributions",0),
+	"--mu":("mu",1),
+	"-m":("mu",1),
+	"--number":("number",1),
+	"-n":("number",1),
+	"--offset":("offset",1),
+	"-o":("offset",1),
+	"--output-format":("output-format",1),
+	"--precision":("precision",1),
+	"--report":("report",0),
+	"-r":("report",0),
+	"--seed":("seed",1),
+	"--sigma":("sigma",1),
+	"-s":("sigma",1),
+	"--skip":("skip",1),
+	"--version":("version",0),
+	"-v":("version",0),
+	"-V":("version",0),
+}
 
 def main(arguments):
 	config=dict()
 	positional=[]
-	pattern=re.compile(r"(?:-(?:d|h|x|i|m|n|o|r|s|v|V)|--(?:delta|distribution|help|initial|list-distributions|mu|number|offset|report|sigma|version))(?:=.*)?$")
 	consuming,needing,wanting=None,0,0
-	attached_value=None
 	while len(arguments) and arguments[0]!="--":
 		if consuming is not None:
 			if config[consuming] is None:
@@ -15,189 +44,39 @@ def main(arguments):
 			else:
 				config[consuming].append(arguments.pop(0))
 			needing-=1
-			wanting-=1
+			if wanting is not None:
+				wanting-=1
 			if wanting==0:
 				consuming,needing,wanting=None,0,0
-		elif pattern.match(arguments[0]):
-			option = arguments.pop(0).lstrip('-')
-			if '=' in option:
-				option,attached_value=option.split('=',1)
-			if option=="delta":
-				if attached_value is not None:
-					config["delta"]=attached_value
-					attached_value=None
-					consuming,needing,wanting=None,0,0
-				else:
-					config["delta"]=None
-					consuming,needing,wanting="delta",1,1
-			elif option=="distribution":
-				if attached_value is not None:
-					config["distribution"]=attached_value
-					attached_value=None
-					consuming,needing,wanting=None,0,0
-				else:
-					config["distribution"]=None
-					consuming,needing,wanting="distribution",1,1
-			elif option=="help":
-				if attached_value is not None:
-					message=(
-						'unexpected value while parsing "help"'
-						' (expected 0 values)'
-					)
-					raise ValueError(message) from None
-				config["help"]=True
-			elif option=="initial":
-				if attached_value is not None:
-					config["initial"]=attached_value
-					attached_value=None
-					consuming,needing,wanting=None,0,0
-				else:
-					config["initial"]=None
-					consuming,needing,wanting="initial",1,1
-			elif option=="list-distributions":
-				if attached_value is not None:
-					message=(
-						'unexpected value while parsing "list-distributions"'
-						' (expected 0 values)'
-					)
-					raise ValueError(message) from None
-				config["list-distributions"]=True
-			elif option=="mu":
-				if attached_value is not None:
-					config["mu"]=attached_value
-					attached_value=None
-					consuming,needing,wanting=None,0,0
-				else:
-					config["mu"]=None
-					consuming,needing,wanting="mu",1,1
-			elif option=="number":
-				if attached_value is not None:
-					config["number"]=attached_value
-					attached_value=None
-					consuming,needing,wanting=None,0,0
-				else:
-					config["number"]=None
-					consuming,needing,wanting="number",1,1
-			elif option=="offset":
-				if attached_value is not None:
-					config["offset"]=attached_value
-					attached_value=None
-					consuming,needing,wanting=None,0,0
-				else:
-					config["offset"]=None
-					consuming,needing,wanting="offset",1,1
-			elif option=="report":
-				if attached_value is not None:
-					message=(
-						'unexpected value while parsing "report"'
-						' (expected 0 values)'
-					)
-					raise ValueError(message) from None
-				config["report"]=True
-			elif option=="sigma":
-				if attached_value is not None:
-					config["sigma"]=attached_value
-					attached_value=None
-					consuming,needing,wanting=None,0,0
-				else:
-					config["sigma"]=None
-					consuming,needing,wanting="sigma",1,1
-			elif option=="version":
-				if attached_value is not None:
-					message=(
-						'unexpected value while parsing "version"'
-						' (expected 0 values)'
-					)
-					raise ValueError(message) from None
-				config["version"]=True
-			elif option=="d":
-				if attached_value is not None:
-					config["delta"]=attached_value
-					attached_value=None
-					consuming,needing,wanting=None,0,0
-				else:
-					config["delta"]=None
-					consuming,needing,wanting="delta",1,1
-			elif option=="h":
+		elif arguments[0].split("=",1)[0] in OPTIONS:
+			option,_,attached_value=arguments.pop(0).partition("=")
+			if not _:
+				attached_value=None
+			name,number=OPTIONS[option]
+			if number==0:
 				if attached_value is not None:
 					message=(
-						'unexpected value while parsing "help"'
+						f'unexpected value while parsing "{name}"'
 						' (expected 0 values)'
 					)
 					raise ValueError(message) from None
-				config["help"]=True
-			elif option=="x":
-				if attached_value is not None:
-					message=(
-						'unexpected value while parsing "help"'
-						' (expected 0 values)'
-					)
-					raise ValueError(message) from None
-				config["help"]=True
-			elif option=="i":
-				if attached_value is not None:
-					config["initial"]=attached_value
-					attached_value=None
-					consuming,needing,wanting=None,0,0
-				else:
-					config["initial"]=None
-					consuming,needing,wanting="initial",1,1
-			elif option=="m":
-				if attached_value is not None:
-					config["mu"]=attached_value
-					attached_value=None
-					consuming,needing,wanting=None,0,0
-				else:
-					config["mu"]=None
-					consuming,needing,wanting="mu",1,1
-			elif option=="n":
-				if attached_value is not None:
-					config["number"]=attached_value
-					attached_value=None
-					consuming,needing,wanting=None,0,0
+				config[name]=True
+			elif number==1:
+				config[name]=attached_value
+				if attached_value is None:
+					consuming,needing,wanting=name,1,1
 				else:
-					config["number"]=None
-					consuming,needing,wanting="number",1,1
-			elif option=="o":
-				if attached_value is not None:
-					config["offset"]=attached_value
-					attached_value=None
 					consuming,needing,wanting=None,0,0
-				else:
-					config["offset"]=None
-					consuming,needing,wanting="offset",1,1
-			elif option=="r":
-				if attached_value is not None:
-					message=(
-						'unexpected value while parsing "report"'
-						' (expected 0 values)'
-					)
-					raise ValueError(message) from None
-				config["report"]=True
-			elif option=="s":
+			else:
+				minimum,maximum=number
 				if attached_value is not None:
-					config["sigma"]=attached_value
-					attached_value=None
-					consuming,needing,wanting=None,0,0
+					config[name]=[attached_value]
+					if maximum is not None:
+						maximum-=1
+					consuming,needing,wanting=name,minimum-1,maximum
 				else:
-					config["sigma"]=None
-					consuming,needing,wanting="sigma",1,1
-			elif option=="v":
-				if attached_value is not None:
-					message=(
-						'unexpected value while parsing "version"'
-						' (expected 0 values)'
-					)
-					raise ValueError(message) from None
-				config["version"]=True
-			elif option=="V":
-				if attached_value is not None:
-					message=(
-						'unexpected value while parsing "version"'
-						' (expected 0 values)'
-					)
-					raise ValueError(message) from None
-				config["version"]=True
+					config[name]=[]
+					consuming,needing,wanting=name,minimum,maximum
 		else:
 			positional.append(arguments.pop(0))
 	if needing>0:
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+
+"""Binary formats of generated data.
+
+Formats are:
+  text   one value per line
+  f64le  little-endian 64-bit floats
+  f32le  little-endian 32-bit floats
+  npy    NumPy array file of 64-bit or 32-bit floats
+
+Binary formats are converted in bulk through the buffer protocol of
+`array.array`, so NumPy is not required.
+"""
+
+from __future__ import annotations
+
+__all__ = ['FORMATS', 'encode', 'header', 'write']
+
+import sys
+import array
+import itertools
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Any, BinaryIO, Iterable, Iterator, Optional, Tuple
+
+FORMATS = ("text", "f64le", "f32le", "npy")
+
+NPY_MAGIC = b"\x93NUMPY"
+
+_TYPECODES = {"f64le": "d", "f32le": "f", "npy": "d"}
+_DESCRIPTIONS = {"d": "f8", "f": "f4"}
+
+def write(
+    stream: BinaryIO,
+    values: Iterable[Any],
+    output_format: str,
+    batch: int = 1 << 16,
+) -> None:
+    """Write values in a binary format. Values are floats or rows of floats,
+    or an object that exports 64-bit floats through the buffer protocol.
+
+    Values are packed and written `batch` at a time. The npy format requires
+    the count of values in its header, so is written only after all values.
+    """
+    typecode = _TYPECODES[output_format]
+    swap = sys.byteorder != "little"
+
+    try:
+        view: Optional[memoryview] = memoryview(values)  # type: ignore
+    except TypeError:
+        view = None
+    if view is not None and view.format == "d" and view.ndim in (1, 2):
+        width = view.shape[1] if view.ndim == 2 else 1  # type: ignore
+        packed = array.array("d")
+        packed.frombytes(view.tobytes())
+        blocks: Iterable[array.array] = [packed]
+    else:
+        values = iter(values)
+        first = next(values, None)
+        width = 1
+        if first is not None:
+            values = itertools.chain([first], values)
+            if not isinstance(first, (int, float)):
+                width = len(first)
+                values = itertools.chain.from_iterable(values)
+        blocks = _batches(values, batch * width)
+
+    if output_format == "npy":
+        collected = array.array(typecode)
+        for block in blocks:
+            collected.extend(_convert(block, typecode))
+        shape: Tuple[int, ...] = (len(collected) // width, )
+        if width > 1:
+            shape += (width, )
+        stream.write(_npy_header(typecode, shape))
+        blocks = [collected]
+
+    for block in blocks:
+        block = _convert(block, typecode)
+        if swap:
+            block.byteswap()
+        stream.write(block.tobytes())
+
+def header(
+    output_format: str,
+    shape: Tuple[int, ...],
+) -> bytes:
+    """Encode the header of values of a known shape, which only the npy
+    format has.
+    """
+    if output_format == "npy":
+        return _npy_header(_TYPECODES[output_format], shape)
+    return b""
+
+def encode(
+    block: Any,
+    output_format: str,
+) -> bytes:
+    """Encode a block of 64-bit floats in a binary format, without a header.
+    A block is an array or an object that exports 64-bit floats through the
+    buffer protocol.
+    """
+    if not isinstance(block, array.array):
+        packed = array.array("d")
+        packed.frombytes(memoryview(block).cast("B"))
+        block = packed
+    block = _convert(block, _TYPECODES[output_format])
+    if sys.byteorder != "little":
+        block.byteswap()
+    return block.tobytes()
+
+def _batches(
+    values: Iterable[float],
+    size: int,
+) -> Iterator[array.array]:
+    values = iter(values)
+    while True:
+        block = array.array("d", itertools.islice(values, size))
+        if len(block) == 0:
+            break
+        yield block
+
+def _convert(
+    values: array.array,
+    typecode: str,
+) -> array.array:
+    if values.typecode == typecode:
+        return values
+    return array.array(typecode, values)
+
+def _npy_header(
+    typecode: str,
+    shape: Tuple[int, ...],
+) -> bytes:
+    """Draw a version 1.0 npy header, padded such that data is aligned to 64
+    bytes.
+    """
+    header = "{{'descr': '<{0}', 'fortran_order': False, 'shape': {1}, }}"
+    header = header.format(_DESCRIPTIONS[typecode], repr(shape))
+    header += " " * (-(len(header) + 11) % 64) + "\n"
+    return NPY_MAGIC + b"\x01\x00" + len(header).to_bytes(2, "little") + (
+        header.encode("latin1")
+    )
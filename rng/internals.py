@@ -1,7 +1,17 @@
 #!/usr/bin/env python3
 
+from __future__ import annotations
+
 import sys
-from typing import *
+import random
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import (
+        Callable, Dict, Iterator, Optional, Sequence, Tuple,
+    )
+
+from . import formats
 
 VERSION = (1,0,3,)
 
@@ -27,6 +37,133 @@ def _try_get_int(
     else:
         return default
 
+WRITE_BATCH = 1 << 12
+
+def _value_format(
+    precision: Optional[str] = None,
+) -> str:
+    """Draw the printf-style format of a value with `precision` decimal
+    places, or of its shortest representation that converts back exactly if
+    `precision` is 'repr'.
+    """
+    if precision is None:
+        return "%.4f"
+    elif precision == "repr":
+        return "%r"
+    else:
+        return "%.{0}f".format(int(precision))
+
+BLOCK_SIZE = 1 << 16
+
+def _block_rows(
+    columns: int = 1,
+) -> int:
+    """Count the rows of each block, of about `BLOCK_SIZE` values."""
+    return max(1, BLOCK_SIZE // columns)
+
+def _entropy_seed() -> int:
+    """Draw a seed from the operating system, shared by every block."""
+    return random.SystemRandom().getrandbits(64)
+
+def _substream(
+    seed: int,
+    index: int,
+) -> random.Random:
+    """Create the generator of block `index`, independent of the others."""
+    return random.Random((seed << 64) | index)
+
+def _block_bounds(
+    number: int,
+    columns: int = 1,
+    skip: int = 0,
+) -> Iterator[Tuple[int, int, int]]:
+    """Split rows `skip` up to `skip + number` along the boundaries of
+    blocks, yielding the index of each block, the first row of it to keep,
+    and the row after its last. Blocks are numbered from the first row, so
+    the rows of a block are the same for any skip.
+    """
+    size = _block_rows(columns)
+    start = skip
+    while start < skip + number:
+        index = start // size
+        stop = min((index + 1) * size, skip + number)
+        yield index, start, stop
+        start = stop
+
+def _encode_block(
+    block: Sequence[float],
+    columns: int,
+    output_format: str = "text",
+    precision: Optional[str] = None,
+) -> bytes:
+    """Encode a block of values row after row, with `columns` values to a
+    line or packed in a binary format. Text is formatted `WRITE_BATCH` lines
+    at a time.
+    """
+    if output_format != "text":
+        return formats.encode(block, output_format)
+    line = "\t".join([_value_format(precision)] * columns) + "\n"
+    lines = line * WRITE_BATCH
+    size = WRITE_BATCH * columns
+    values = block.tolist()  # type: ignore
+    text = list()
+    for start in range(0, len(values), size):
+        batch = tuple(values[start:start + size])
+        if len(batch) == size:
+            text.append(lines % batch)
+        else:
+            text.append(line * (len(batch) // columns) % batch)
+    return "".join(text).encode()
+
+def _generate_block(
+    task: Tuple,
+) -> bytes:
+    """Generate and encode one block. Defined at the top level of this
+    module, so that it can be passed to processes of a pool.
+    """
+    function, index, start, stop, columns, args, *encoding = task
+    return _encode_block(
+        function(index, start, stop, columns, *args), columns, *encoding,
+    )
+
+def _write_blocks(
+    function: Callable[..., Sequence[float]],
+    args: Tuple,
+    number: int,
+    columns: int = 1,
+    output_format: str = "text",
+    precision: Optional[str] = None,
+    skip: int = 0,
+    jobs: Optional[int] = None,
+) -> None:
+    """Write rows `skip` up to `skip + number` of data, generated a block at
+    a time by `function(index, start, stop, columns, *args)`, on `jobs`
+    processes if more than one.
+    """
+    tasks = [
+        (function, index, start, stop, columns, args, output_format,
+         precision)
+        for index, start, stop in _block_bounds(number, columns, skip)
+    ]
+    sys.stdout.flush()
+    stream = sys.stdout.buffer
+    stream.write(
+        formats.header(
+            output_format,
+            (number, columns) if columns > 1 else (number, ),
+        ),
+    )
+    if jobs is not None and jobs > 1 and len(tasks) > 1:
+        from . import parallel
+        encoded = parallel.map_ordered(
+            _generate_block, tasks, min(jobs, len(tasks)),
+        )
+    else:
+        encoded = map(_generate_block, tasks)
+    for block in encoded:
+        stream.write(block)
+    stream.flush()
+
 def _print_help() -> None:
     _msg = "Usage: rng DISTRIBUTION [OPTIONS]\n"
     sys.stdout.write(_msg)
@@ -53,3 +190,35 @@ def _print_invalid_distribution(dist: str) -> None:
     )
     sys.stderr.write("\n".join(_msg) + "\n")
 
+def _print_invalid_precision(precision: str) -> None:
+    _msg = "{0}: Invalid precision '{1}'\n".format(sys.argv[0], precision)
+    sys.stderr.write(_msg)
+
+def _print_invalid_backend(backend: str) -> None:
+    _msg = "{0}: Invalid backend '{1}'\n".format(sys.argv[0], backend)
+    sys.stderr.write(_msg)
+
+def _print_missing_backend(backend: str) -> None:
+    _msg = "{0}: Backend '{1}' is not available; using 'python'\n".format(
+        sys.argv[0], backend,
+    )
+    sys.stderr.write(_msg)
+
+def _print_invalid_columns(columns: int) -> None:
+    _msg = "{0}: Invalid columns '{1}' (expected a positive integer)\n".format(
+        sys.argv[0], columns,
+    )
+    sys.stderr.write(_msg)
+
+def _print_invalid_seed(seed: int) -> None:
+    _msg = "{0}: Invalid seed '{1}' (expected a non-negative integer)\n"
+    sys.stderr.write(_msg.format(sys.argv[0], seed))
+
+def _print_invalid_skip(skip: int) -> None:
+    _msg = "{0}: Invalid skip '{1}' (expected a non-negative integer)\n"
+    sys.stderr.write(_msg.format(sys.argv[0], skip))
+
+def _print_invalid_format(data_format: str) -> None:
+    _msg = "{0}: Invalid format '{1}'\n".format(sys.argv[0], data_format)
+    sys.stderr.write(_msg)
+
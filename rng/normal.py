@@ -6,18 +6,47 @@ Uniform distribution - Generate random data from a normal distribution.
 Options:
   -d, --delta   velocity of average per time unit [Default: 0]
   -m, --mu      average of distribution [Default: 0]
-  -n, --number  number of random data points to generate [Default: 10]
+  -n, --number  number of rows of random data to generate [Default: 10]
   -s, --sigma   standard deviation of distribution [Default: 1]
+  --backend NAME
+                generate data by NAME, where NAME is one of 'python' or
+                  'numpy' [Default: python]
+  --columns M   generate M data points per row, sharing the average of
+                  their time unit [Default: 1]
+  -j N, --jobs N
+                generate blocks of rows on N processes at once [Default: 1]
+  --seed S      seed the random number generator by the non-negative
+                  integer S
+  --skip K      skip the first K rows, writing rows K up to K + number
+  --output-format FORMAT
+                write data as FORMAT, where FORMAT is one of 'text',
+                  'f64le', 'f32le', or 'npy' [Default: text]
+  --precision N
+                write data with N decimal places, or as the shortest exact
+                  representation if N is 'repr' [Default: 4]
 
 Currently assumed that sigma is constant over time.
+
+Data is generated a block of rows at a time, computing the average of each
+row directly from its time unit. Each block is drawn from a substream of the
+seed of its own, so a seed reproduces the same data of one backend for any
+number of jobs, and rows written with a skip are the same as those of a
+single run.
 """
 
+from __future__ import annotations
+
 import sys
+import array
 import random
-import itertools
-from typing import Callable, List, Dict, Iterator
 
-def cli_wrapper(**data: Dict):
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Any, Callable, Iterator, Optional, Sequence
+
+from . import internals
+
+def cli_wrapper(**data: Any):
     """Handler for the uniform distribution. Checks and cleans given options,
     and performs optional reporting.
     """
@@ -26,21 +55,34 @@ def cli_wrapper(**data: Dict):
     _sigma = data["sigma"] if data["sigma"] is not None else 1.0
     _init_velocity = data["delta"] if data["delta"] is not None else 0.0
     _acceleration = lambda x: x #constant acceleration
+    _columns = data["columns"] if data["columns"] is not None else 1
 
-    _distribution = distribution(
-        _init_mu,
-        _sigma,
-        _init_velocity,
-        _acceleration,
-    )
+    _skip = data["skip"] if data["skip"] is not None else 0
+    _seed = data["seed"]
+    if _seed is None:
+        _seed = internals._entropy_seed()
 
     if data["report"]:
         sys.stdout.write(
             report_header(_init_mu, _sigma, _init_velocity, _acceleration)
         )
     if _number > 0:
-        for number in itertools.islice(_distribution, _number):
-            sys.stdout.write("{0:.4f}\n".format(number))
+        internals._write_blocks(
+            block,
+            (
+                _init_mu,
+                _sigma,
+                _init_velocity,
+                _seed,
+                data["backend"] == "numpy",
+            ),
+            _number,
+            _columns,
+            data["output_format"],
+            data["precision"],
+            _skip,
+            data["jobs"],
+        )
 
 def distribution(
     init_mu: float,
@@ -63,6 +105,106 @@ def distribution(
         mu += velocity
         velocity = acceleration(velocity)
 
+def blocks(
+    number: int,
+    init_mu: float,
+    sigma: float,
+    init_velocity: float,
+    columns: int = 1,
+    seed: Optional[int] = None,
+    vectorize: bool = False,
+    skip: int = 0,
+) -> Iterator[Sequence[float]]:
+    """Generate rows of random data in blocks, each a flat sequence of
+    values row after row. The average of each row is the initial average
+    plus the velocity times its index.
+
+    Arguments:
+      number         number of rows
+      init_mu        initial average of distribution
+      sigma          sigma of distribution
+      init_velocity  velocity of average per row
+      columns        number of values per row
+      seed           seed of the random number generator
+      vectorize      generate each block with NumPy
+      skip           number of rows to skip before the first
+    """
+    if seed is None:
+        seed = internals._entropy_seed()
+    for index, start, stop in internals._block_bounds(number, columns, skip):
+        yield block(
+            index,
+            start,
+            stop,
+            columns,
+            init_mu,
+            sigma,
+            init_velocity,
+            seed,
+            vectorize,
+        )
+
+def block(
+    index: int,
+    start: int,
+    stop: int,
+    columns: int,
+    init_mu: float,
+    sigma: float,
+    init_velocity: float,
+    seed: int,
+    vectorize: bool = False,
+) -> Sequence[float]:
+    """Draw rows `start` up to `stop`, which lie in block `index`. Each
+    block is drawn from a substream of its own, so is the same whichever
+    blocks are drawn before it.
+    """
+    first = index * internals._block_rows(columns)
+    if vectorize:
+        from . import vectorized
+        values: Sequence[float] = vectorized.normal_block(  # type: ignore
+            vectorized.generator(seed, index),
+            first,
+            stop,
+            columns,
+            init_mu,
+            sigma,
+            init_velocity,
+        )
+    else:
+        values = _normal_block(
+            internals._substream(seed, index),
+            first,
+            stop,
+            columns,
+            init_mu,
+            sigma,
+            init_velocity,
+        )
+    if start > first:
+        return values[(start - first) * columns:]
+    return values
+
+def _normal_block(
+    generator: random.Random,
+    start: int,
+    stop: int,
+    columns: int,
+    init_mu: float,
+    sigma: float,
+    init_velocity: float,
+) -> array.array:
+    """Draw the values of rows `start` up to `stop`."""
+    gauss = generator.gauss
+    averages = [
+        init_mu + (step * init_velocity) for step in range(start, stop)
+    ]
+    if columns == 1:
+        return array.array("d", [gauss(mu, sigma) for mu in averages])
+    return array.array("d", [
+        gauss(mu, sigma) for mu in averages for _ in range(columns)
+    ])
+
 def report_header(
     init_mu: float,
     sigma: float,
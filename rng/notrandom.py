@@ -6,14 +6,38 @@ Generate non-random data.
 Options:
   -d, --delta    velocity of state per time unit [Default: 0]
   -i, --initial  initial state [Default: 0]
-  -n, --number   number of data points to generate [Default: 10]
+  -n, --number   number of rows of data to generate [Default: 10]
+  --backend NAME
+                 generate data by NAME, where NAME is one of 'python' or
+                   'numpy' [Default: python]
+  --columns M    repeat each data point M times per row [Default: 1]
+  -j N, --jobs N
+                 generate blocks of rows on N processes at once
+                   [Default: 1]
+  --skip K       skip the first K rows, writing rows K up to K + number
+  --output-format FORMAT
+                 write data as FORMAT, where FORMAT is one of 'text',
+                   'f64le', 'f32le', or 'npy' [Default: text]
+  --precision N  write data with N decimal places, or as the shortest
+                   exact representation if N is 'repr' [Default: 4]
+
+Data is generated a block of rows at a time, computing the state of each row
+directly from its time unit, so any rows are computed without the rows they
+skip.
 """
 
+from __future__ import annotations
+
 import sys
-import itertools
-from typing import Callable, List, Dict, Iterator
+import array
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Any, Callable, Iterator, Sequence
 
-def cli_wrapper(**data: Dict):
+from . import internals
+
+def cli_wrapper(**data: Any):
     """Handler for the uniform distribution. Checks and cleans given options,
     and performs optional reporting.
     """
@@ -21,20 +45,25 @@ def cli_wrapper(**data: Dict):
     _init_state = data["initial"] if data["initial"] is not None else 0.0
     _init_velocity = data["delta"] if data["delta"] is not None else 0.0
     _acceleration = lambda x: x #constant acceleration
+    _columns = data["columns"] if data["columns"] is not None else 1
 
-    _distribution = distribution(
-        _init_state,
-        _init_velocity,
-        _acceleration,
-    )
+    _skip = data["skip"] if data["skip"] is not None else 0
 
     if data["report"]:
         sys.stdout.write(
             report_header(_init_state, _init_velocity, _acceleration)
         )
     if _number > 0:
-        for number in itertools.islice(_distribution, _number):
-            sys.stdout.write("{0:.4f}\n".format(number))
+        internals._write_blocks(
+            block,
+            (_init_state, _init_velocity, data["backend"] == "numpy"),
+            _number,
+            _columns,
+            data["output_format"],
+            data["precision"],
+            _skip,
+            data["jobs"],
+        )
 
 def distribution(
     init_state: float,
@@ -56,6 +85,57 @@ def distribution(
         state += velocity
         velocity = acceleration(velocity)
 
+def blocks(
+    number: int,
+    init_state: float,
+    init_velocity: float,
+    columns: int = 1,
+    vectorize: bool = False,
+    skip: int = 0,
+) -> Iterator[Sequence[float]]:
+    """Generate rows of non-random data in blocks, each a flat sequence of
+    values row after row. The state of each row is the initial state plus the
+    velocity times its index.
+
+    Arguments:
+      number         number of rows
+      init_state     initial value
+      init_velocity  velocity of state per row
+      columns        number of values per row
+      vectorize      generate each block with NumPy
+      skip           number of rows to skip before the first
+    """
+    for index, start, stop in internals._block_bounds(number, columns, skip):
+        yield block(
+            index, start, stop, columns, init_state, init_velocity, vectorize,
+        )
+
+def block(
+    index: int,
+    start: int,
+    stop: int,
+    columns: int,
+    init_state: float,
+    init_velocity: float,
+    vectorize: bool = False,
+) -> Sequence[float]:
+    """Compute rows `start` up to `stop`. The state is in closed form, so
+    any rows are computed directly, whichever block they lie in.
+    """
+    if vectorize:
+        from . import vectorized
+        return vectorized.notrandom_block(  # type: ignore
+            start, stop, columns, init_state, init_velocity,
+        )
+    states = array.array("d", [
+        init_state + (step * init_velocity) for step in range(start, stop)
+    ])
+    if columns == 1:
+        return states
+    return array.array("d", [
+        state for state in states for _ in range(columns)
+    ])
+
 def report_header(
     init_state: float,
     init_velocity: float,
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+
+"""Generate on a pool of processes, one block of rows per task.
+
+Each block is generated and encoded by a process of the pool, and blocks are
+gathered in order, so output is the same for any number of processes. Only
+a few blocks per process are pending at once, so memory stays bounded when
+output is written slower than it is generated.
+"""
+
+from __future__ import annotations
+
+__all__ = ['map_ordered']
+
+import collections
+import multiprocessing
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Any, Callable, Deque, Iterable, Iterator
+
+#NOTE: enough pending blocks per process to keep each busy while the
+#      oldest is written
+PENDING = 4
+
+def map_ordered(
+    function: Callable[[Any], bytes],
+    tasks: Iterable[Any],
+    jobs: int,
+) -> Iterator[bytes]:
+    """Apply `function` to each task on `jobs` processes, yielding results
+    in the order of tasks. `function` must be defined at the top level of a
+    module.
+    """
+    with multiprocessing.Pool(jobs) as pool:
+        pending: Deque[Any] = collections.deque()
+        for task in tasks:
+            pending.append(pool.apply_async(function, (task, )))
+            if len(pending) >= jobs * PENDING:
+                yield pending.popleft().get()
+        while pending:
+            yield pending.popleft().get()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+
+"""Vectorized generation of data, a block of rows at a time with NumPy
+rather than one sample at a time.
+
+Each function returns the values of rows `start` up to `stop` as a flat
+array, row after row. NumPy is an optional dependency; check `available()`
+before calling into this module.
+"""
+
+from __future__ import annotations
+
+__all__ = [
+    'available', 'generator', 'normal_block', 'uniform_block',
+    'notrandom_block',
+]
+
+try:
+    import numpy
+except ImportError:
+    numpy = None  # type: ignore
+
+def available() -> bool:
+    """Check if NumPy can be imported."""
+    return numpy is not None
+
+def generator(
+    seed: int,
+    index: int = 0,
+) -> "numpy.random.Generator":
+    """Create the generator of block `index`, from a child of the seed that
+    is independent of the others.
+    """
+    return numpy.random.default_rng(
+        numpy.random.SeedSequence(seed, spawn_key=(index, )),
+    )
+
+def _averages(
+    start: int,
+    stop: int,
+    init_mu: float,
+    init_velocity: float,
+) -> "numpy.ndarray":
+    """Compute the average of each row in closed form, as a column."""
+    steps = numpy.arange(start, stop, dtype=numpy.float64)
+    return (init_mu + (steps * init_velocity))[:, numpy.newaxis]
+
+def normal_block(
+    random: "numpy.random.Generator",
+    start: int,
+    stop: int,
+    columns: int,
+    init_mu: float,
+    sigma: float,
+    init_velocity: float,
+) -> "numpy.ndarray":
+    """Draw rows from a normal distribution whose average moves by
+    `init_velocity` per row.
+    """
+    values = random.normal(0.0, sigma, (stop - start, columns))
+    values += _averages(start, stop, init_mu, init_velocity)
+    return values.ravel()
+
+def uniform_block(
+    random: "numpy.random.Generator",
+    start: int,
+    stop: int,
+    columns: int,
+    init_mu: float,
+    offset: float,
+    init_velocity: float,
+) -> "numpy.ndarray":
+    """Draw rows from a uniform distribution whose average moves by
+    `init_velocity` per row.
+    """
+    values = random.uniform(-offset, offset, (stop - start, columns))
+    values += _averages(start, stop, init_mu, init_velocity)
+    return values.ravel()
+
+def notrandom_block(
+    start: int,
+    stop: int,
+    columns: int,
+    init_state: float,
+    init_velocity: float,
+) -> "numpy.ndarray":
+    """Compute rows of a state that moves by `init_velocity` per row."""
+    values = numpy.empty((stop - start, columns))
+    values[:] = _averages(start, stop, init_state, init_velocity)
+    return values.ravel()